@@ -13,6 +13,10 @@ from pydantic import BaseModel
 from core.database import get_db
 from models.database_models import User, UserRole, School, Cluster, Manual, Module
 from api.auth import get_current_user
+from core.http_transport import get_http_transport
+from core.resilience import breaker_states
+from services.llm_gateway import get_llm_gateway
+from services.model_router import get_model_router
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -440,4 +444,34 @@ async def get_school_stats(
         active_teachers=active_teachers,
         total_modules=0,  # Not available without school_id in Cluster
         approved_modules=0  # Not available without school_id in Cluster
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/llm/stats")
+def get_llm_stats(current_user: User = Depends(require_admin)):
+    """
+    LLM usage statistics for this deployment
+    Response cache hit rate and tokens saved across all workers, plus this
+    worker's per-task model routing latency, validity and shadow comparisons
+    """
+    return {**get_llm_gateway().get_stats(), "routing": get_model_router().get_stats()}
+
+
+@router.get("/http/stats")
+def get_http_stats(current_user: User = Depends(require_admin)):
+    """
+    Outbound HTTP statistics for this worker, per host (Groq, Google Translate)
+    A connection_reuse_rate near 1 means requests ride kept-alive connections
+    and TLS handshakes are off the hot path
+    """
+    return get_http_transport().get_stats()
+
+
+@router.get("/resilience/stats")
+def get_resilience_stats(current_user: User = Depends(require_admin)):
+    """
+    Circuit breaker state per provider (groq, google) for this worker
+    An open breaker fails calls fast until its probe succeeds; transitions
+    lists the most recent state changes and why they happened
+    """
+    return breaker_states()
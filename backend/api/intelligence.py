@@ -40,7 +40,7 @@ async def analyze_cluster_needs(
     
     # Perform analysis
     try:
-        analysis = intelligence_service.analyze_cluster_needs(db, cluster_id=cluster_id)
+        analysis = await intelligence_service.analyze_cluster_needs(db, cluster_id=cluster_id)
         
         if not analysis:
             raise HTTPException(status_code=404, detail="No analysis data available")
@@ -71,7 +71,7 @@ async def analyze_all_clusters(
     Returns ranked list by priority
     """
     try:
-        analyses = intelligence_service.analyze_cluster_needs(db)
+        analyses = await intelligence_service.analyze_cluster_needs(db)
         
         # Save all recommendations
         for analysis in analyses:
@@ -105,7 +105,7 @@ async def get_macro_insights(
         )
     
     try:
-        insights = intelligence_service.get_macro_insights(db)
+        insights = await intelligence_service.get_macro_insights(db)
         
         return {
             "success": True,
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
 from core.database import get_db
 from models.database_models import Manual, Module, Feedback, ExportedPDF
-from schemas.api_schemas import ManualCreate, ManualResponse
+from schemas.api_schemas import ManualCreate, ManualResponse, ManualSearchResponse
 from services.pdf_processor import PDFProcessor
-from services.rag_engine import RAGEngine
+from services.rag_engine import get_rag_engine
 from services.manual_adapter import get_manual_adapter_service
+from services.manual_search import get_manual_search_service, InvalidCursorError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,7 +16,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/manuals", tags=["Manuals"])
 
 pdf_processor = PDFProcessor()
-rag_engine = RAGEngine()
+rag_engine = get_rag_engine()
+search_service = get_manual_search_service()
 
 @router.post("/upload", response_model=ManualResponse, status_code=status.HTTP_201_CREATED)
 async def upload_manual(
@@ -96,7 +98,7 @@ async def index_manual(manual_id: int, db: Session = Depends(get_db)):
         
         # Extract text from PDF
         logger.info(f"Extracting text from: {manual.file_path}")
-        text = pdf_processor.extract_text(manual.file_path)
+        text, page_starts = pdf_processor.extract_text_with_pages(manual.file_path)
         
         if not text or len(text.strip()) < 100:
             raise HTTPException(
@@ -120,12 +122,13 @@ async def index_manual(manual_id: int, db: Session = Depends(get_db)):
         manual.key_points = adaptation_result["key_points"]
         
         # Chunk the text for RAG indexing
-        chunks = pdf_processor.chunk_text(text)
+        chunks = pdf_processor.chunk_text(text, page_starts=page_starts)
         
         # Index in RAG engine
         success = rag_engine.index_manual(manual.id, chunks)
         
         if success:
+            search_service.invalidate()
             manual.indexed = True
             manual.processed = "completed"
             db.commit()
@@ -158,6 +161,36 @@ async def list_manuals(skip: int = 0, limit: int = 100, db: Session = Depends(ge
     manuals = db.query(Manual).order_by(Manual.pinned.desc(), Manual.upload_date.desc()).offset(skip).limit(limit).all()
     return manuals
 
+@router.get("/search", response_model=ManualSearchResponse)
+def search_manuals(
+    q: str = Query(..., min_length=2, max_length=300, description="Search text"),
+    manual_ids: Optional[List[int]] = Query(None, description="Restrict to these manuals"),
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db)
+):
+    """
+    Semantic + keyword search across indexed manuals
+    Returns highlighted snippets with the manual and page they came from.
+    Defined as a sync route so the vector search runs in the threadpool.
+    """
+    try:
+        page = search_service.search(q, manual_ids=manual_ids, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    found_ids = {hit["manual_id"] for hit in page["results"] if hit["manual_id"] is not None}
+    titles = dict(db.query(Manual.id, Manual.title).filter(Manual.id.in_(found_ids)).all()) if found_ids else {}
+    for hit in page["results"]:
+        hit["manual_title"] = titles.get(hit["manual_id"])
+    
+    return page
+
+@router.get("/search/stats")
+def manual_search_stats():
+    """Cache hit rate and latency percentiles for manual search"""
+    return search_service.get_stats()
+
 @router.get("/{manual_id}", response_model=ManualResponse)
 async def get_manual(manual_id: int, db: Session = Depends(get_db)):
     """Get a specific manual by ID"""
@@ -183,6 +216,7 @@ async def delete_manual(manual_id: int, db: Session = Depends(get_db)):
     if manual.indexed:
         try:
             rag_engine.delete_manual(manual.id)
+            search_service.invalidate()
         except Exception as e:
             logger.warning(f"Failed to delete manual {manual.id} from RAG engine: {e}")
     
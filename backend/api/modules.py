@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Dict, List
-from core.database import get_db
+from typing import Dict, List, Optional
+from core.database import get_db, SessionLocal
 from models.database_models import Module, Manual, Cluster, ExportedPDF, Feedback
-from schemas.api_schemas import ModuleResponse, GenerateModuleRequest, FeedbackCreate, FeedbackResponse
-from services.rag_engine import RAGEngine
+from schemas.api_schemas import ModuleResponse, GenerateModuleRequest, BatchGenerateRequest, FeedbackCreate, FeedbackResponse
+from services.rag_engine import get_rag_engine
+from services.context_packer import PackedContext
+from services.generation_jobs import get_generation_job_registry
+from services.pretranslation import get_pretranslation_queue, pretranslation_languages
 from services.ai_engine import AIAdaptationEngine
+from services.llm_gateway import cancel_on_disconnect, ClientDisconnected
+from services.llm_scheduler import Priority, SchedulerBusy
+from core.config import settings
+from core.resilience import OPEN, CircuitOpen
+import asyncio
 import logging
 import json
 from datetime import datetime, timedelta
@@ -20,25 +31,22 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/modules", tags=["Modules"])
 
-rag_engine = RAGEngine()
+rag_engine = get_rag_engine()
 ai_engine = AIAdaptationEngine()
+job_registry = get_generation_job_registry()
+pretranslation_queue = get_pretranslation_queue()
 
-# Keep prompts small enough to avoid Groq TPM/token-limit errors
-MAX_SOURCE_CHARS_FOR_AI = 2800
+# Number of ranked chunks considered when packing source context
+RAG_CANDIDATE_CHUNKS = 8
 
-@router.post("/generate", response_model=ModuleResponse, status_code=status.HTTP_201_CREATED)
-async def generate_module(
-    request: GenerateModuleRequest,
-    db: Session = Depends(get_db)
-):
-    """Generate an adapted training module for a specific cluster"""
-    
+def _load_generation_inputs(manual_id: int, cluster_id: int, db: Session):
+    """Fetch and validate the manual and cluster for module generation"""
     # Validate manual exists and is indexed
-    manual = db.query(Manual).filter(Manual.id == request.manual_id).first()
+    manual = db.query(Manual).filter(Manual.id == manual_id).first()
     if not manual:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Manual with ID {request.manual_id} not found"
+            detail=f"Manual with ID {manual_id} not found"
         )
     
     if not manual.indexed:
@@ -48,73 +56,137 @@ async def generate_module(
         )
     
     # Validate cluster exists
-    cluster = db.query(Cluster).filter(Cluster.id == request.cluster_id).first()
+    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Cluster with ID {request.cluster_id} not found"
+            detail=f"Cluster with ID {cluster_id} not found"
         )
     
-    try:
-        # Step 1: Retrieve relevant content from manual using RAG
-        logger.info(f"Retrieving context for topic: {request.topic}")
-        original_content = rag_engine.get_context_for_topic(
-            topic=request.topic,
-            manual_id=request.manual_id,
-            max_chunks=3
+    return manual, cluster
+
+
+def _cluster_profile(cluster: Cluster) -> Dict:
+    """Build cluster profile dict using correct field names"""
+    return {
+        "name": cluster.name,
+        "region_type": cluster.geographic_type,
+        "language": cluster.primary_language,
+        "infrastructure_constraints": cluster.infrastructure_level or "Not specified",
+        "key_issues": cluster.specific_challenges or "None specified",
+        "grade_range": "Not specified",
+    }
+
+
+def _target_language(requested: Optional[str], cluster: Cluster) -> str:
+    return (
+        (requested or "").strip().lower()
+        or cluster.primary_language.strip().lower()
+        or "english"
+    )
+
+
+async def _retrieve_source(topic: str, manual_id: int, token_budget: int) -> PackedContext:
+    """
+    Retrieve relevant content from the manual using RAG, packed to whatever
+    the prompt leaves of the model's request limit
+    """
+    logger.info(f"Retrieving context for topic: {topic}")
+    packed = await run_in_threadpool(
+        rag_engine.pack_context,
+        topic=topic,
+        manual_id=manual_id,
+        token_budget=token_budget,
+        candidates=RAG_CANDIDATE_CHUNKS
+    )
+    
+    if not packed.text:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No relevant content found for topic '{topic}' in manual"
         )
-        
-        if not original_content:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No relevant content found for topic '{request.topic}' in manual"
-            )
-        
-        logger.info(f"Retrieved {len(original_content)} characters of source content")
-        logger.info(f"Source content preview: {original_content[:200]}...")
-        
-        # Step 2: Build cluster profile dict using correct field names
-        cluster_profile = {
-            "name": cluster.name,
-            "region_type": cluster.geographic_type,
-            "language": cluster.primary_language,
-            "infrastructure_constraints": cluster.infrastructure_level or "Not specified",
-            "key_issues": cluster.specific_challenges or "None specified",
-            "grade_range": "Not specified",
-        }
+    
+    logger.info(f"Retrieved {len(packed.text)} characters of source content")
+    logger.info(f"Source content preview: {packed.text[:200]}...")
+    return packed
+
+
+def _adapt(**kwargs):
+    """Module generation in the configured mode (one structured call or three plain ones)"""
+    if settings.structured_generation:
+        return ai_engine.adapt_content_structured(**kwargs)
+    return ai_engine.adapt_content(**kwargs)
+
+
+def _module_metadata(adaptation_result: Dict) -> Optional[str]:
+    """Safety verdict and competency tags from structured generation, as stored on the module"""
+    if "competency_tags" not in adaptation_result:
+        return None
+    return json.dumps({
+        "competency_tags": adaptation_result["competency_tags"],
+        "safety": adaptation_result["safety"],
+    }, ensure_ascii=False)
 
-        target_language = (
-            (request.target_language or "").strip().lower()
-            or cluster.primary_language.strip().lower()
-            or "english"
+
+def _busy_response(e: SchedulerBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "message": "Module generation is busy, please retry shortly",
+            "queue_position": e.queue_position,
+            "estimated_wait_seconds": round(e.estimated_wait, 1)
+        },
+        headers={"Retry-After": str(max(1, int(e.estimated_wait + 0.5)))}
+    )
+
+
+def _unavailable_response(e: CircuitOpen) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "message": "The AI provider is failing, please retry shortly",
+            "provider": e.name,
+            "retry_after_seconds": round(e.retry_after, 1)
+        },
+        headers={"Retry-After": str(max(1, int(e.retry_after + 0.5)))}
+    )
+
+
+@router.post("/generate", response_model=ModuleResponse, status_code=status.HTTP_201_CREATED)
+async def generate_module(
+    request: GenerateModuleRequest,
+    http_request: Request,
+    db: Session = Depends(get_db)
+):
+    """Generate an adapted training module for a specific cluster"""
+    
+    manual, cluster = _load_generation_inputs(request.manual_id, request.cluster_id, db)
+    
+    try:
+        # Step 1: Build cluster profile and output language
+        cluster_profile = _cluster_profile(cluster)
+        target_language = _target_language(request.target_language, cluster)
+        
+        # Step 2: Retrieve relevant content from manual using RAG
+        token_budget = ai_engine.source_token_budget(
+            cluster_profile, request.topic,
+            structured=settings.structured_generation, target_language=target_language
         )
+        packed = await _retrieve_source(request.topic, request.manual_id, token_budget)
+        original_content = packed.text
         
-        # Step 3: Generate adapted content using AI (truncate context to control token usage)
-        source_for_ai = original_content
-        if source_for_ai and len(source_for_ai) > MAX_SOURCE_CHARS_FOR_AI:
-            source_for_ai = source_for_ai[:MAX_SOURCE_CHARS_FOR_AI] + "\n\n[Excerpt truncated for token limits]"
-
+        # Step 3: Generate adapted content using AI
         logger.info(f"Generating adapted content for cluster: {cluster.name}")
-        try:
-            adaptation_result = await ai_engine.adapt_content(
-                source_content=source_for_ai,
-                cluster_profile=cluster_profile,
-                topic=request.topic,
-                target_language=target_language,
-            )
-        except Exception as e:
-            # If Groq rejects due to token limits, retry once with a smaller excerpt.
-            msg = str(e)
-            if "Request too large" in msg or "tokens per minute" in msg or "rate_limit_exceeded" in msg:
-                smaller = (original_content or "")[:1200] + "\n\n[Excerpt truncated further due to token limits]"
-                adaptation_result = await ai_engine.adapt_content(
-                    source_content=smaller,
-                    cluster_profile=cluster_profile,
-                    topic=request.topic,
-                    target_language=target_language,
-                )
-            else:
-                raise
+        # The LLM scheduler queues the call behind other interactive requests
+        # and answers 429 with a wait estimate when the queue is too long
+        adaptation_result = await cancel_on_disconnect(http_request, _adapt(
+            source_content=original_content,
+            cluster_profile=cluster_profile,
+            topic=request.topic,
+            target_language=target_language,
+            priority=Priority.INTERACTIVE,
+            max_wait=settings.llm_interactive_max_wait_seconds,
+        ))
         
         # Step 4: Create module record with valid fields only
         module = Module(
@@ -124,6 +196,7 @@ async def generate_module(
             original_content=original_content[:5000],  # Store first 5000 chars
             adapted_content=adaptation_result['adapted_content'],
             language=adaptation_result.get("output_language") or target_language,
+            module_metadata=_module_metadata(adaptation_result),
             approved=False,
         )
         
@@ -137,6 +210,17 @@ async def generate_module(
     except HTTPException:
         raise
 
+    except SchedulerBusy as e:
+        raise _busy_response(e)
+
+    except CircuitOpen as e:
+        raise _unavailable_response(e)
+
+    except ClientDisconnected:
+        # Nobody is waiting for the response; 499 is the conventional log status
+        logger.info(f"Module generation for '{request.topic}' abandoned by client")
+        raise HTTPException(status_code=499, detail="Client closed request")
+
     except Exception as e:
         logger.exception("Error generating module")
         raise HTTPException(
@@ -145,6 +229,216 @@ async def generate_module(
         )
 
 
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/generate/stream")
+async def generate_module_stream(
+    request: GenerateModuleRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate an adapted module, streaming the text as Server-Sent Events
+    
+    Events: `meta` (output language), `delta` ({"text": ...}, appended in
+    order), `module` (the saved ModuleResponse) and `error` ({"detail": ...}).
+    Non-English output arrives one translated paragraph at a time.
+    """
+    manual, cluster = _load_generation_inputs(request.manual_id, request.cluster_id, db)
+    cluster_profile = _cluster_profile(cluster)
+    target_language = _target_language(request.target_language, cluster)
+    token_budget = ai_engine.source_token_budget(cluster_profile, request.topic, target_language=target_language)
+    packed = await _retrieve_source(request.topic, request.manual_id, token_budget)
+    
+    # Fail before the stream starts so clients get a normal 429 response
+    position, wait = ai_engine.llm.estimate_wait(ai_engine.max_output_tokens, Priority.INTERACTIVE)
+    if wait > settings.llm_interactive_max_wait_seconds:
+        raise _busy_response(SchedulerBusy(position, wait))
+    breaker = ai_engine.llm.breaker
+    if breaker is not None and breaker.state == OPEN:
+        raise _unavailable_response(CircuitOpen(breaker.name, breaker.get_stats()["retry_in"]))
+    
+    async def events():
+        yield _sse("meta", {"output_language": target_language, "topic": request.topic})
+        try:
+            result = None
+            async for event in ai_engine.stream_adaptation(
+                source_content=packed.text,
+                cluster_profile=cluster_profile,
+                topic=request.topic,
+                target_language=target_language,
+            ):
+                if event["type"] == "delta":
+                    yield _sse("delta", {"text": event["text"]})
+                else:
+                    result = event
+            
+            # Saved like /generate and /generate/batch, off the event loop and with
+            # sessions owned by the stream (the request's may not outlive the response)
+            module_id = await run_in_threadpool(
+                _save_module, request.topic, request.manual_id, request.cluster_id,
+                packed.text, result, target_language
+            )
+            payload = await run_in_threadpool(_module_payload, module_id)
+            
+            logger.info(f"Streamed module generated with ID: {payload['id']}")
+            yield _sse("module", payload)
+        
+        except Exception as e:
+            logger.exception("Error streaming module generation")
+            yield _sse("error", {"detail": f"Error generating module: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _save_module(topic: str, manual_id: int, cluster_id: int, original_content: str, adaptation_result: Dict, language: str) -> int:
+    """Write a generated module with its own session (for background work)"""
+    session = SessionLocal()
+    try:
+        module = Module(
+            title=topic,
+            manual_id=manual_id,
+            cluster_id=cluster_id,
+            original_content=original_content[:5000],
+            adapted_content=adaptation_result["adapted_content"],
+            language=adaptation_result.get("output_language") or language,
+            module_metadata=_module_metadata(adaptation_result),
+            approved=False,
+        )
+        session.add(module)
+        session.commit()
+        return module.id
+    finally:
+        session.close()
+
+
+def _module_payload(module_id: int) -> Dict:
+    """A saved module as its ModuleResponse JSON, read with its own session"""
+    session = SessionLocal()
+    try:
+        module = session.query(Module).filter(Module.id == module_id).first()
+        return ModuleResponse.model_validate(module).model_dump(mode="json")
+    finally:
+        session.close()
+
+
+@router.post("/generate/batch", status_code=status.HTTP_202_ACCEPTED)
+async def generate_modules_batch(
+    request: BatchGenerateRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Adapt one manual topic for many clusters in the background
+    
+    Source content is retrieved once and the adaptations run concurrently at
+    batch priority. Poll `status_url` or follow `events_url` (Server-Sent
+    Events, one `result` per cluster as it finishes, then `done`).
+    """
+    manual = db.query(Manual).filter(Manual.id == request.manual_id).first()
+    if not manual:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Manual with ID {request.manual_id} not found"
+        )
+    if not manual.indexed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Manual must be indexed before generating modules"
+        )
+    
+    clusters = {c.id: c for c in db.query(Cluster).filter(Cluster.id.in_(request.cluster_ids)).all()}
+    missing = [cluster_id for cluster_id in request.cluster_ids if cluster_id not in clusters]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Clusters not found: {missing}"
+        )
+    
+    # Plain values only: the request's session is gone when the job runs
+    profiles = {cluster_id: _cluster_profile(cluster) for cluster_id, cluster in clusters.items()}
+    languages = {
+        cluster_id: _target_language(request.target_language, cluster)
+        for cluster_id, cluster in clusters.items()
+    }
+    
+    # One retrieval for every cluster, sized for the longest prompt scaffold
+    token_budget = min(
+        ai_engine.source_token_budget(
+            profiles[cluster_id], request.topic,
+            structured=settings.structured_generation, target_language=languages[cluster_id]
+        )
+        for cluster_id in profiles
+    )
+    packed = await _retrieve_source(request.topic, request.manual_id, token_budget)
+    
+    async def generate(cluster_id: int) -> Dict:
+        result = await _adapt(
+            source_content=packed.text,
+            cluster_profile=profiles[cluster_id],
+            topic=request.topic,
+            target_language=languages[cluster_id],
+            priority=Priority.BATCH,
+        )
+        module_id = await run_in_threadpool(
+            _save_module, request.topic, request.manual_id, cluster_id,
+            packed.text, result, languages[cluster_id]
+        )
+        return {
+            "module_id": module_id,
+            "cluster_name": profiles[cluster_id]["name"],
+            "language": result.get("output_language"),
+            "tokens_used": result.get("tokens_used", 0),
+        }
+    
+    job = job_registry.start(request.manual_id, request.topic, request.cluster_ids, generate)
+    logger.info(f"Started batch job {job.id} for '{request.topic}' across {len(job.cluster_ids)} clusters")
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": len(job.cluster_ids),
+        "status_url": f"/api/modules/jobs/{job.id}",
+        "events_url": f"/api/modules/jobs/{job.id}/events",
+    }
+
+
+def _get_job(job_id: str):
+    job = job_registry.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Generation job {job_id} not found"
+        )
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_generation_job(job_id: str):
+    """Progress and per-cluster results of a batch generation job"""
+    return _get_job(job_id).snapshot()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(job_id: str):
+    """Follow a batch generation job as Server-Sent Events"""
+    job = _get_job(job_id)
+    
+    async def events():
+        async for event in job_registry.follow(job):
+            yield _sse(event["event"], event["data"])
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/languages", response_model=Dict[str, str])
 async def get_supported_languages():
     """Return supported output languages for module generation."""
@@ -212,20 +506,185 @@ async def approve_module(
         module_id=module.id,
         filename=pdf_result["filename"],
         file_path=pdf_result["file_path"],
-        language=module.language,
+        language=_module_language(module),
     )
     db.add(pdf_record)
 
     db.commit()
     db.refresh(pdf_record)
 
-    # Step 5: Return approval + PDF info, including pdf_id
+    # Step 5: Pre-translate for clusters with similar profiles in the background
+    pretranslation = _start_pretranslation(module, db)
+
+    # Step 6: Return approval + PDF info, including pdf_id
     return {
         "status": "success",
         "message": "Module approved and PDF generated successfully",
         "module_id": module.id,
         "language": module.language,
         "pdf_id": pdf_record.id,
+        "pretranslation_languages": pretranslation,
+    }
+
+
+def _module_language(module: Module) -> str:
+    return (module.language or "english").strip().lower()
+
+
+class ModuleDeleted(LookupError):
+    """The module was deleted while its PDF was being prepared"""
+
+
+def _save_localized_pdf(module_id: int, language: str, title: str, content: str) -> Optional[int]:
+    """Render a module's PDF in one language and record it with its own session (None: module deleted)"""
+    pdf_result = pdf_service.generate_module_pdf(module_title=title, module_content=content, language=language)
+    session = SessionLocal()
+    try:
+        if session.query(Module.id).filter(Module.id == module_id).first() is None:
+            os.remove(pdf_result["file_path"])
+            return None
+        pdf_record = ExportedPDF(
+            module_id=module_id,
+            filename=pdf_result["filename"],
+            file_path=pdf_result["file_path"],
+            language=language,
+        )
+        session.add(pdf_record)
+        session.commit()
+        return pdf_record.id
+    finally:
+        session.close()
+
+
+async def _localize_module(module_id: int, title: str, content: str, source_language: str, language: str) -> Dict:
+    """Translate a module into language and render its PDF"""
+    # Unknown module languages are detected from the text
+    if not ai_engine.translation_service.is_language_supported(source_language):
+        source_language = "auto"
+    translated_title, translated_content = await asyncio.to_thread(
+        ai_engine.translate_module, title, content, language, source_language
+    )
+    pdf_id = await asyncio.to_thread(_save_localized_pdf, module_id, language, translated_title, translated_content)
+    if pdf_id is None:
+        raise ModuleDeleted(f"Module {module_id} was deleted")
+    return {"pdf_id": pdf_id}
+
+
+def _start_pretranslation(module: Module, db: Session) -> List[str]:
+    """Queue localized PDFs for the languages of similar clusters; returns the languages"""
+    if not settings.pretranslation_enabled:
+        return []
+    cluster = db.query(Cluster).filter(Cluster.id == module.cluster_id).first()
+    if cluster is None:
+        return []
+    languages = pretranslation_languages(
+        cluster,
+        db.query(Cluster).all(),
+        module_language=_module_language(module),
+        # Modules are not translated back into English
+        supported=[lang for lang in ai_engine.translation_service.supported_languages if lang != "english"],
+        min_similarity=settings.pretranslation_min_similarity,
+        max_languages=settings.pretranslation_max_languages,
+    )
+    module_id, title, content, source_language = module.id, module.title, module.adapted_content, _module_language(module)
+    pretranslation_queue.start(
+        module_id,
+        languages,
+        lambda language: _localize_module(module_id, title, content, source_language, language)
+    )
+    if languages:
+        logger.info(f"Pre-translating module {module_id} into: {', '.join(languages)}")
+    return languages
+
+
+def _latest_pdf(db: Session, module_id: int, language: str) -> Optional[ExportedPDF]:
+    # Older rows (and /api/exports) store the module language as written, e.g. "Hindi"
+    pdfs = (
+        db.query(ExportedPDF)
+        .filter(ExportedPDF.module_id == module_id, func.lower(func.trim(ExportedPDF.language)) == language)
+        .order_by(ExportedPDF.id.desc())
+        .all()
+    )
+    return next((pdf for pdf in pdfs if pdf.file_path and os.path.exists(pdf.file_path)), None)
+
+
+@router.get("/{module_id}/pdf")
+async def get_module_pdf(
+    module_id: int,
+    language: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Download a module's PDF in a language (default: the module's own)
+    
+    Pre-rendered PDFs are served straight away. A pre-translation still in
+    progress is waited for; any other language is translated and rendered
+    on demand and kept for the next request.
+    """
+    module = db.query(Module).filter(Module.id == module_id).first()
+    if not module:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Module with ID {module_id} not found"
+        )
+    own_language = _module_language(module)
+    language = (language or own_language).strip().lower()
+    if language != own_language and not ai_engine.translation_service.is_language_supported(language):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Language '{language}' is not supported"
+        )
+    
+    pdf = _latest_pdf(db, module_id, language)
+    if pdf is None and await pretranslation_queue.wait(module_id, language):
+        pdf = _latest_pdf(db, module_id, language)
+    if pdf is None:
+        try:
+            if language == own_language:
+                pdf_id = await asyncio.to_thread(
+                    _save_localized_pdf, module.id, language, module.title, module.adapted_content
+                )
+                if pdf_id is None:
+                    raise ModuleDeleted(f"Module {module_id} was deleted")
+            else:
+                pdf_id = (await _localize_module(module.id, module.title, module.adapted_content, own_language, language))["pdf_id"]
+        except ModuleDeleted:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Module with ID {module_id} not found"
+            )
+        except CircuitOpen as e:
+            raise _unavailable_response(e)
+        except Exception as e:
+            logger.exception(f"Error preparing {language} PDF for module {module_id}")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Could not prepare the {language} PDF: {e}"
+            )
+        pdf = db.query(ExportedPDF).filter(ExportedPDF.id == pdf_id).first()
+    
+    return FileResponse(
+        path=pdf.file_path,
+        filename=pdf.filename,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{pdf.filename}"'}
+    )
+
+
+@router.get("/{module_id}/translations")
+async def get_module_translations(module_id: int, db: Session = Depends(get_db)):
+    """Pre-translation progress and the latest PDF per language for a module"""
+    pdfs = (
+        db.query(ExportedPDF)
+        .filter(ExportedPDF.module_id == module_id)
+        .order_by(ExportedPDF.id)
+        .all()
+    )
+    job = pretranslation_queue.get(module_id)
+    return {
+        "module_id": module_id,
+        "pretranslation": job.snapshot() if job else None,
+        "pdfs": {pdf.language.strip().lower(): pdf.id for pdf in pdfs if pdf.language},
     }
 
 
@@ -251,6 +710,8 @@ async def delete_module(module_id: int, db: Session = Depends(get_db)):
             detail=f"Module with ID {module_id} not found"
         )
     
+    pretranslation_queue.cancel(module_id)
+
     # Clean up dependent records/files first to avoid FK constraint issues.
     pdfs = db.query(ExportedPDF).filter(ExportedPDF.module_id == module_id).all()
     for pdf in pdfs:
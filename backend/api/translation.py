@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List
 from services.translation_service import get_translation_service
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,8 @@ class BatchTranslateRequest(BaseModel):
 class BatchTranslateResponse(BaseModel):
     translations: List[str]
     target_language: str
+    # Per text: translated, cached, unchanged or failed (original text kept)
+    statuses: List[str] = []
 
 @router.post("/translate", response_model=TranslateResponse)
 async def translate_text(request: TranslateRequest):
@@ -48,7 +53,8 @@ async def translate_text(request: TranslateRequest):
                        f"Supported: {', '.join(supported_langs)}"
             )
         
-        translated_text = translation_service.translate(
+        translated_text = await run_in_threadpool(
+            translation_service.translate,
             text=request.text,
             target_language=request.target_language,
             source_language=request.source_language
@@ -70,27 +76,37 @@ async def translate_text(request: TranslateRequest):
             detail=f"Translation failed: {str(e)}"
         )
 
+def _check_batch_language(target_language: str):
+    if not get_translation_service().is_language_supported(target_language):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Language '{target_language}' is not supported"
+        )
+
 @router.post("/translate/batch", response_model=BatchTranslateResponse)
 async def translate_batch(request: BatchTranslateRequest):
-    """Translate multiple texts in batch"""
+    """
+    Translate multiple texts in batch
+    Duplicates are translated once, and misses in the translation memory are
+    translated concurrently in chunks of about one provider request.
+    For large batches use /translate/batch/stream.
+    """
     try:
         translation_service = get_translation_service()
+        _check_batch_language(request.target_language)
         
-        if not translation_service.is_language_supported(request.target_language):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Language '{request.target_language}' is not supported"
-            )
-        
-        translations = translation_service.batch_translate(
-            texts=request.texts,
-            target_language=request.target_language,
-            source_language=request.source_language
+        items = await run_in_threadpool(
+            lambda: list(translation_service.iter_batch_translate(
+                texts=request.texts,
+                target_language=request.target_language,
+                source_language=request.source_language
+            ))
         )
         
         return BatchTranslateResponse(
-            translations=translations,
-            target_language=request.target_language
+            translations=[item["text"] for item in items],
+            target_language=request.target_language,
+            statuses=[item["status"] for item in items]
         )
         
     except HTTPException:
@@ -102,6 +118,43 @@ async def translate_batch(request: BatchTranslateRequest):
             detail=f"Batch translation failed: {str(e)}"
         )
 
+@router.post("/translate/batch/stream")
+async def translate_batch_stream(request: BatchTranslateRequest):
+    """
+    Translate multiple texts, streaming results as NDJSON in input order
+    
+    One line per text as soon as it and every text before it are ready:
+    {"index", "translated_text", "status"}, where status is translated,
+    cached, unchanged or failed (translated_text is then the original).
+    A last {"done": true, "counts": {...}} line ends a complete stream;
+    {"error": ...} ends one that broke off.
+    """
+    translation_service = get_translation_service()
+    _check_batch_language(request.target_language)
+    
+    def lines():
+        counts: Dict[str, int] = {}
+        try:
+            for item in translation_service.iter_batch_translate(
+                texts=request.texts,
+                target_language=request.target_language,
+                source_language=request.source_language
+            ):
+                counts[item["status"]] = counts.get(item["status"], 0) + 1
+                line = {"index": item["index"], "translated_text": item["text"], "status": item["status"]}
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+            yield json.dumps({"done": True, "counts": counts}) + "\n"
+        except Exception as e:
+            logger.error(f"Streamed batch translation error: {str(e)}")
+            yield json.dumps({"error": f"Batch translation failed: {str(e)}"}) + "\n"
+    
+    # A plain generator is iterated in the threadpool, off the event loop
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/languages")
 async def get_supported_languages():
     """Get list of supported languages for translation"""
@@ -111,5 +164,21 @@ async def get_supported_languages():
         "languages": list(lang_codes.keys()),
         "language_codes": lang_codes,
         "model": "Google Translate",
+        "backends": list(translation_service.backends),
         "description": "Translation service for Indian languages"
     }
+
+@router.get("/memory/stats")
+async def get_translation_memory_stats():
+    """Translation memory size and hit rates per language pair"""
+    translation_service = get_translation_service()
+    if translation_service.memory is None:
+        return {"enabled": False}
+    stats = await run_in_threadpool(translation_service.memory.get_stats)
+    return {"enabled": True, **stats}
+
+@router.get("/stats")
+async def get_translation_stats():
+    """Segment and request counts per backend, and provider concurrency, throttling, hedging and breaker state"""
+    translation_service = get_translation_service()
+    return {**translation_service.stats, "routes": translation_service.routes}
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 
 # Get the backend directory path
@@ -14,6 +14,94 @@ class Settings(BaseSettings):
     # provided `backend/chroma_db/chroma.sqlite3` file reliably regardless
     # of the current working directory when the app is started.
     chroma_persist_directory: str = str(BACKEND_DIR / "chroma_db")
+    # Optional single-writer vector service (Unix socket path). When set, API
+    # workers talk to `python -m core.vector_service` instead of opening Chroma.
+    vector_service_socket: Optional[str] = None
+    vector_service_batch_window_ms: int = 5
+    # Fuse BM25 keyword matches with vector results (helps Hindi/Marathi terms)
+    hybrid_search_enabled: bool = True
+    # Cosine distance above which retrieved chunks are left out of module prompts
+    rag_max_distance: Optional[float] = 0.75
+    # Per-request token limit of the Groq generation model (prompt + completion)
+    groq_request_token_limit: int = 6000
+    # Generate module, safety verdict and competency tags in one JSON call
+    # (falls back to separate calls when the response does not validate)
+    structured_generation: bool = True
+    # Generate non-English modules directly in the cluster language; paragraphs
+    # with less than this share of letters in the target script get translated
+    native_language_generation: bool = True
+    native_min_script_share: float = 0.5
+    # Llama 3 tokenizer.json for exact prompt token counts (estimated per script when unset)
+    llm_tokenizer_path: Optional[str] = None
+    # Model tiers: long-form generation runs on the large model, classification-
+    # style calls (safety verdicts, tags, JSON recommendations) on the small one
+    llm_large_model: str = "llama-3.3-70b-versatile"
+    llm_small_model: str = "llama-3.1-8b-instant"
+    # Per-task tier overrides, e.g. {"safety_check": "large"}
+    llm_task_tiers: Dict[str, str] = {}
+    # Share of calls replayed on the other tier to compare latency and answers
+    llm_shadow_fraction: float = 0.0
+    llm_shadow_tasks: List[str] = ["safety_check", "competency_tagging", "cluster_recommendations"]
+    # Async LLM gateway: per-call timeout and shared connection pool size
+    groq_timeout_seconds: float = 60.0
+    groq_max_connections: int = 20
+    # Shared outbound HTTP transport (core.http_transport): keep-alive pools,
+    # HTTP/2 when h2 is installed, retries of connection failures and 502-504
+    # responses, and a cap on concurrent requests per host ({"api.groq.com": 20})
+    http_max_connections: int = 50
+    http_keepalive_seconds: float = 60.0
+    http2_enabled: bool = True
+    http_max_retries: int = 2
+    http_host_concurrency: int = 16
+    http_host_limits: Dict[str, int] = {}
+    # Circuit breakers per provider (core.resilience): this many consecutive
+    # failures fail calls fast for reset_seconds, then one probe call decides
+    circuit_breaker_failures: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+    # Rate budgets enforced before calling Groq (per worker process)
+    groq_requests_per_minute: int = 30
+    groq_tokens_per_minute: int = 12000
+    # Interactive requests fail fast with a 429 + wait estimate beyond this
+    llm_interactive_max_wait_seconds: float = 30.0
+    # Adaptations in flight at once per batch generation job
+    batch_generation_concurrency: int = 4
+    # Approved modules are translated into the languages of clusters with a
+    # similar profile (see services.pretranslation) and their PDFs pre-rendered
+    pretranslation_enabled: bool = True
+    pretranslation_min_similarity: float = 0.5
+    pretranslation_max_languages: int = 4
+    pretranslation_concurrency: int = 2
+    # Content-addressed LLM response cache (shared SQLite file)
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = str(BACKEND_DIR / "llm_cache.sqlite3")
+    llm_cache_ttl_hours: float = 168
+    llm_cache_max_mb: int = 64
+    # Translation memory: segment translations per language pair (shared SQLite
+    # file) with an in-process LRU of this many entries in front
+    translation_memory_enabled: bool = True
+    translation_memory_path: str = str(BACKEND_DIR / "translation_memory.sqlite3")
+    translation_memory_lru_size: int = 10000
+    # Translation provider limits (per worker process): requests in flight,
+    # sustained requests per second, and retries after a throttling response
+    translation_max_concurrency: int = 4
+    translation_requests_per_second: float = 5.0
+    translation_max_retries: int = 3
+    # Translation calls slower than this count as breaker failures; requests
+    # not answered within the provider's p95 latency (at least hedge_min) are
+    # sent a second time and the first answer wins
+    translation_slow_call_seconds: float = 10.0
+    translation_hedging: bool = True
+    translation_hedge_min_seconds: float = 0.5
+    # Translation backend per language pair: keys are "en-hi", a target code
+    # ("hi") or "*"; values are "google", "local" or "dictionary" (test stub).
+    # Segments the routed backend fails on are retried on the others.
+    translation_routes: Dict[str, str] = {}
+    # Local IndicTrans2 backend (CPU, works offline) loaded from indictrans2_model_dir
+    local_translation_enabled: bool = False
+    indictrans2_model_name: str = "ai4bharat/indictrans2-en-indic-1B"
+    local_translation_threads: int = 2
+    local_translation_batch_size: int = 16
+    local_translation_batch_window_ms: int = 20
     environment: str = "development"
     debug: bool = True
     
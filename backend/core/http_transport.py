@@ -0,0 +1,412 @@
+"""
+Shared outbound HTTP transport
+Outbound clients (the Groq LLM gateway, Google Translate) are built here, so
+connections are pooled and kept alive per process instead of being opened,
+and TLS-handshaked, per call. On top of httpx's connection pool it adds:
+
+- HTTP/2 when the h2 package is installed (requests share one connection)
+- retries with exponential backoff and full jitter for connection failures
+  and retryable statuses, honouring Retry-After
+- a cap on concurrent requests per host
+- per-host metrics: requests, new connections and TLS handshakes versus
+  reused connections, HTTP/2 share, retries and errors
+
+Sync clients share one pool. Async pools are bound to the event loop that
+created them, so each async client gets its own (owners cache them per loop).
+"""
+
+import asyncio
+import importlib.util
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Union
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: the server is temporarily unavailable
+RETRY_STATUSES = frozenset({502, 503, 504})
+# Methods that are safe to send twice (connection failures are retried for all)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before resending a request
+
+    Args:
+        max_retries: Retries after the first attempt
+        backoff_seconds: Upper bound of the first delay; doubles per retry
+        max_backoff_seconds: Cap on any delay, including Retry-After
+        retry_statuses: Response statuses that are retried
+        retry_methods: Methods retried after the request was sent (read
+            timeouts, dropped connections); requests that never reached
+            the server are retried for every method
+        status_retry_methods: Methods retried on retry_statuses (the server
+            answered that it did not handle the request)
+    """
+    max_retries: int = 2
+    backoff_seconds: float = 0.5
+    max_backoff_seconds: float = 8.0
+    retry_statuses: FrozenSet[int] = RETRY_STATUSES
+    retry_methods: FrozenSet[str] = IDEMPOTENT_METHODS
+    status_retry_methods: FrozenSet[str] = IDEMPOTENT_METHODS
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number attempt + 1 (full jitter)"""
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+    def retries_error(self, request: httpx.Request, error: Exception) -> bool:
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        return isinstance(error, httpx.TransportError) and request.method in self.retry_methods
+
+    def retries_response(self, request: httpx.Request, response: httpx.Response) -> bool:
+        return response.status_code in self.retry_statuses and request.method in self.status_retry_methods
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+class TransportMetrics:
+    """Per-host request and connection counters"""
+
+    FIELDS = ("requests", "new_connections", "tls_handshakes", "reused_connections",
+              "http2_requests", "retries", "errors", "in_flight", "peak_in_flight")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def _host(self, host: str) -> Dict[str, int]:
+        return self._hosts.setdefault(host, dict.fromkeys(self.FIELDS, 0))
+
+    def started(self, host: str):
+        with self._lock:
+            counts = self._host(host)
+            counts["in_flight"] += 1
+            counts["peak_in_flight"] = max(counts["peak_in_flight"], counts["in_flight"])
+
+    def finished(self, host: str, trace: Dict[str, bool], response: Optional[httpx.Response] = None):
+        """Record one attempt; trace holds the connection events seen while sending it"""
+        with self._lock:
+            counts = self._host(host)
+            counts["in_flight"] -= 1
+            if response is None:
+                counts["errors"] += 1
+                return
+            counts["requests"] += 1
+            if trace.get("connect"):
+                counts["new_connections"] += 1
+            else:
+                counts["reused_connections"] += 1
+            if trace.get("tls"):
+                counts["tls_handshakes"] += 1
+            if response.extensions.get("http_version") == b"HTTP/2":
+                counts["http2_requests"] += 1
+
+    def retried(self, host: str):
+        with self._lock:
+            self._host(host)["retries"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = {host: dict(counts) for host, counts in self._hosts.items()}
+        for counts in hosts.values():
+            requests = counts["requests"]
+            counts["connection_reuse_rate"] = round(counts["reused_connections"] / requests, 3) if requests else None
+        return hosts
+
+
+def _tracer(trace: Dict[str, bool]) -> Callable[[str, Dict], None]:
+    # httpcore emits these only when a request has to open a connection
+    def on_event(name: str, info: Dict):
+        if name == "connection.connect_tcp.complete":
+            trace["connect"] = True
+        elif name == "connection.start_tls.complete":
+            trace["tls"] = True
+    return on_event
+
+
+def _async_tracer(trace: Dict[str, bool]):
+    on_event = _tracer(trace)
+
+    async def on_event_async(name: str, info: Dict):
+        on_event(name, info)
+    return on_event_async
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that frees the host slot when it is closed"""
+
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if self._release is not None:
+                release, self._release = self._release, None
+                release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                release, self._release = self._release, None
+                release()
+
+
+class _PolicyTransport(httpx.BaseTransport):
+    """Retries, host caps and metrics around the shared sync connection pool"""
+
+    def __init__(self, owner: "HttpTransport", pool: httpx.BaseTransport, retry: RetryPolicy):
+        self._owner = owner
+        self._pool = pool
+        self._retry = retry
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slot = self._owner._sync_slot(host)
+        metrics = self._owner.metrics
+        for attempt in range(self._retry.max_retries + 1):
+            trace: Dict[str, bool] = {}
+            request.extensions["trace"] = _tracer(trace)
+            slot.acquire()
+            metrics.started(host)
+            try:
+                response = self._pool.handle_request(request)
+            except BaseException as e:
+                slot.release()
+                metrics.finished(host, trace)
+                if (
+                    not isinstance(e, httpx.TransportError)
+                    or attempt == self._retry.max_retries
+                    or not self._retry.retries_error(request, e)
+                ):
+                    raise
+                delay = self._retry.delay(attempt)
+            else:
+                metrics.finished(host, trace, response)
+                if attempt == self._retry.max_retries or not self._retry.retries_response(request, response):
+                    return httpx.Response(
+                        status_code=response.status_code,
+                        headers=response.headers,
+                        stream=_ReleasingStream(response.stream, slot.release),
+                        extensions=response.extensions,
+                    )
+                response.close()
+                slot.release()
+                delay = self._retry.delay(attempt, _retry_after(response))
+            metrics.retried(host)
+            logger.warning(f"Retrying {request.method} {host} in {delay:.2f}s (attempt {attempt + 2})")
+            time.sleep(delay)
+
+    def close(self):
+        # The pool is shared; HttpTransport.close() closes it
+        pass
+
+
+class _AsyncPolicyTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of _PolicyTransport, owning its own pool"""
+
+    def __init__(self, owner: "HttpTransport", pool: httpx.AsyncBaseTransport, retry: RetryPolicy):
+        self._owner = owner
+        self._pool = pool
+        self._retry = retry
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slot = self._slots.setdefault(host, asyncio.Semaphore(self._owner.host_limit(host)))
+        metrics = self._owner.metrics
+        for attempt in range(self._retry.max_retries + 1):
+            trace: Dict[str, bool] = {}
+            request.extensions["trace"] = _async_tracer(trace)
+            await slot.acquire()
+            metrics.started(host)
+            try:
+                response = await self._pool.handle_async_request(request)
+            except BaseException as e:
+                slot.release()
+                metrics.finished(host, trace)
+                if (
+                    not isinstance(e, httpx.TransportError)
+                    or attempt == self._retry.max_retries
+                    or not self._retry.retries_error(request, e)
+                ):
+                    raise
+                delay = self._retry.delay(attempt)
+            else:
+                metrics.finished(host, trace, response)
+                if attempt == self._retry.max_retries or not self._retry.retries_response(request, response):
+                    return httpx.Response(
+                        status_code=response.status_code,
+                        headers=response.headers,
+                        stream=_AsyncReleasingStream(response.stream, slot.release),
+                        extensions=response.extensions,
+                    )
+                await response.aclose()
+                slot.release()
+                delay = self._retry.delay(attempt, _retry_after(response))
+            metrics.retried(host)
+            logger.warning(f"Retrying {request.method} {host} in {delay:.2f}s (attempt {attempt + 2})")
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._pool.aclose()
+
+
+class HttpTransport:
+    """
+    Factory for outbound HTTP clients sharing pools, policies and metrics
+
+    Args:
+        max_connections: Connections per pool
+        keepalive_expiry: Seconds an idle connection stays open for reuse
+        http2: Use HTTP/2 where the server supports it (needs the h2 package)
+        host_concurrency: Default cap on concurrent requests per host
+        host_limits: Per-host caps overriding host_concurrency
+        retry: Default retry policy
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        keepalive_expiry: float = 60.0,
+        http2: bool = True,
+        host_concurrency: int = 16,
+        host_limits: Optional[Dict[str, int]] = None,
+        retry: Optional[RetryPolicy] = None
+    ):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.info("h2 package not installed; outbound HTTP uses HTTP/1.1 keep-alive")
+        self.host_concurrency = host_concurrency
+        self.host_limits = host_limits or {}
+        self.retry = retry or RetryPolicy()
+        self.metrics = TransportMetrics()
+        self._lock = threading.Lock()
+        self._sync_pool: Optional[httpx.HTTPTransport] = None
+        self._sync_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+    def host_limit(self, host: str) -> int:
+        return self.host_limits.get(host, self.host_concurrency)
+
+    def _limits(self, max_connections: Optional[int] = None) -> httpx.Limits:
+        connections = max_connections or self.max_connections
+        return httpx.Limits(
+            max_connections=connections,
+            max_keepalive_connections=connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def _sync_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._sync_slots:
+                self._sync_slots[host] = threading.BoundedSemaphore(self.host_limit(host))
+            return self._sync_slots[host]
+
+    def client(
+        self,
+        timeout: Union[httpx.Timeout, float] = 30.0,
+        retry: Optional[RetryPolicy] = None,
+        **kwargs: Any
+    ) -> httpx.Client:
+        """
+        Blocking client on the process-wide connection pool
+
+        Args:
+            timeout: Timeouts for this client's requests
+            retry: Retry policy (defaults to the transport's)
+            **kwargs: Other httpx.Client options (headers, base_url, ...)
+        """
+        with self._lock:
+            if self._sync_pool is None:
+                self._sync_pool = httpx.HTTPTransport(http2=self.http2, limits=self._limits())
+        transport = _PolicyTransport(self, self._sync_pool, retry or self.retry)
+        return httpx.Client(transport=transport, timeout=timeout, **kwargs)
+
+    def async_client(
+        self,
+        timeout: Union[httpx.Timeout, float] = 30.0,
+        retry: Optional[RetryPolicy] = None,
+        max_connections: Optional[int] = None,
+        **kwargs: Any
+    ) -> httpx.AsyncClient:
+        """
+        Async client with its own pool for the running event loop
+
+        Args:
+            timeout: Timeouts for this client's requests
+            retry: Retry policy (defaults to the transport's)
+            max_connections: Pool size (defaults to the transport's)
+            **kwargs: Other httpx.AsyncClient options
+        """
+        pool = httpx.AsyncHTTPTransport(http2=self.http2, limits=self._limits(max_connections))
+        transport = _AsyncPolicyTransport(self, pool, retry or self.retry)
+        return httpx.AsyncClient(transport=transport, timeout=timeout, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "keepalive_expiry": self.keepalive_expiry,
+            "hosts": self.metrics.snapshot(),
+        }
+
+    def close(self):
+        """Close the shared sync pool (application shutdown)"""
+        with self._lock:
+            if self._sync_pool is not None:
+                self._sync_pool.close()
+                self._sync_pool = None
+
+
+# Service instance
+_http_transport = None
+_transport_lock = threading.Lock()
+
+def get_http_transport() -> HttpTransport:
+    """Get singleton instance of the shared outbound HTTP transport"""
+    global _http_transport
+    with _transport_lock:
+        if _http_transport is None:
+            from core.config import settings
+            _http_transport = HttpTransport(
+                max_connections=settings.http_max_connections,
+                keepalive_expiry=settings.http_keepalive_seconds,
+                http2=settings.http2_enabled,
+                host_concurrency=settings.http_host_concurrency,
+                host_limits=settings.http_host_limits,
+                retry=RetryPolicy(max_retries=settings.http_max_retries)
+            )
+        return _http_transport
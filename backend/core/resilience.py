@@ -0,0 +1,267 @@
+"""
+Circuit breakers and hedged requests for outbound providers
+A provider that keeps failing (or answering too slowly) trips its breaker:
+calls then fail fast with CircuitOpen instead of each waiting out a timeout,
+and callers fall back (another translation backend, a 503 with Retry-After).
+After reset_seconds one probe call is let through; its outcome closes the
+breaker again or re-opens it.
+
+Hedging bounds tail latency of idempotent calls: when a call has not answered
+within the provider's recent p95 latency, the same request is sent once more
+and whichever answer arrives first is used.
+
+Breakers are shared per provider name within a worker process; their state
+and transitions are exposed through breaker_states().
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, TimeoutError as FutureTimeout, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Recent transitions kept per breaker for the stats endpoint
+TRANSITION_HISTORY = 20
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open); retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker for one provider
+
+    Args:
+        name: Provider name (logs and stats)
+        failure_threshold: Consecutive failures that open the breaker
+        reset_seconds: How long it stays open before a probe is allowed
+        slow_call_seconds: Successful calls slower than this count as failures
+        half_open_probes: Calls let through at once while half-open
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        slow_call_seconds: Optional[float] = None,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._transitions: Deque[Dict[str, Any]] = deque(maxlen=TRANSITION_HISTORY)
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._transition(HALF_OPEN, "reset timeout elapsed")
+        return self._state
+
+    def _transition(self, state: str, reason: str):
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.stats["opened"] += 1
+        if state != HALF_OPEN:
+            self._probes = 0
+        self._transitions.append({"at": time.time(), "from": previous, "to": state, "reason": reason})
+        log = logger.info if state == CLOSED else logger.warning
+        log(f"Circuit breaker {self.name}: {previous} -> {state} ({reason})")
+
+    def allow(self):
+        """
+        Admit a call or fail fast
+
+        Raises:
+            CircuitOpen: While open, or half-open with the probe already out
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return
+            self.stats["rejected"] += 1
+            retry_after = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpen(self.name, retry_after)
+
+    def record_success(self, seconds: float = 0.0):
+        with self._lock:
+            self.stats["calls"] += 1
+            if self.slow_call_seconds is not None and seconds > self.slow_call_seconds:
+                self.stats["slow_calls"] += 1
+                self._failed(f"call took {seconds:.1f}s")
+                return
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED, "probe succeeded")
+
+    def record_failure(self, error: Optional[Exception] = None):
+        with self._lock:
+            self.stats["calls"] += 1
+            self._failed(type(error).__name__ if error is not None else "failure")
+
+    def release(self):
+        """End a call whose outcome says nothing about provider health (throttled, cancelled)"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _failed(self, reason: str):
+        self.stats["failures"] += 1
+        self._failures += 1
+        if self._state == HALF_OPEN:
+            self._transition(OPEN, f"probe failed: {reason}")
+        elif self._state == CLOSED and self._failures >= self.failure_threshold:
+            self._transition(OPEN, f"{self._failures} consecutive failures, last: {reason}")
+
+    def call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a blocking call through the breaker"""
+        self.allow()
+        started = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success(time.perf_counter() - started)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_in": round(max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at)), 1)
+                if state == OPEN else 0.0,
+                **self.stats,
+                "transitions": list(self._transitions),
+            }
+
+
+class LatencyWindow:
+    """
+    Recent latencies of one provider, for hedging delays
+
+    Args:
+        size: Latencies kept
+        min_samples: Latencies needed before a percentile is trusted
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def hedged_call(
+    pool: Executor,
+    fn: Callable[..., T],
+    args: tuple,
+    delay: Optional[float],
+    may_hedge: Callable[[], bool] = lambda: True,
+    on_hedge: Optional[Callable[[Any, Any], None]] = None
+) -> T:
+    """
+    Run an idempotent blocking call, sending it a second time if slow
+
+    Args:
+        pool: Threads to run the attempts on
+        fn: The call (must be safe to send twice)
+        args: Arguments for fn
+        delay: Seconds to wait before hedging (None: never hedge)
+        may_hedge: Checked when the delay passes; False skips the hedge
+            (e.g. no spare request slot or rate budget)
+        on_hedge: Called with the primary's and the hedge's futures once
+            the hedge is sent
+
+    Returns:
+        The first successful result (the slower attempt is left to finish
+        and ignored); raises if every attempt failed
+    """
+    if delay is None:
+        return fn(*args)
+    primary = pool.submit(fn, *args)
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    if not may_hedge():
+        return primary.result()
+    hedge = pool.submit(fn, *args)
+    if on_hedge is not None:
+        on_hedge(primary, hedge)
+    pending: List = [primary, hedge]
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            if future.exception() is None or not pending:
+                return future.result()
+    raise RuntimeError("unreachable")
+
+
+# Service instance
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str, slow_call_seconds: Optional[float] = None) -> CircuitBreaker:
+    """Get the shared breaker for a provider (created on first use)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            from core.config import settings
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_breaker_failures,
+                reset_seconds=settings.circuit_breaker_reset_seconds,
+                slow_call_seconds=slow_call_seconds
+            )
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State, counters and recent transitions of every provider breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_stats() for breaker in breakers}
@@ -0,0 +1,347 @@
+"""
+Single-writer vector service
+One process owns the vector index; API workers talk to it over a Unix socket.
+This lets uvicorn run several workers without several processes writing the
+same SQLite-backed Chroma directory.
+
+Run (from the backend root directory):
+    python -m core.vector_service
+
+Wire protocol: each message is a 4-byte big-endian length followed by a UTF-8
+JSON object. Requests are {"op": ..., "args": {...}}, responses are
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+# Operations the service exposes; each maps to a method on the owned store
+READ_OPS = {"search", "get_collection_size", "get_all_documents", "get_documents", "get_records_page"}
+WRITE_OPS = {"add_documents", "delete_collection", "import_records"}
+
+
+class VectorServiceError(Exception):
+    """Raised by the client when the service reports an error"""
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _LENGTH.pack(len(body)) + body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Vector service closed the connection")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+class VectorServiceServer:
+    """
+    Owns a vector store and serves it over a Unix socket
+
+    Requests from all connections go through one queue. A batcher drains the
+    queue in short windows and executes the batch on a single worker thread, so
+    the underlying index only ever sees one writer. Adjacent searches with the
+    same parameters are merged into one query call and adjacent adds into one
+    insert, while the arrival order of reads and writes is preserved.
+    """
+
+    def __init__(
+        self,
+        store,
+        socket_path: str,
+        batch_window_ms: int = 5,
+        max_batch: int = 64
+    ):
+        self.store = store
+        self.socket_path = socket_path
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-writer")
+        self._queue: Optional[asyncio.Queue] = None
+        self.stats = {"requests": 0, "batches": 0, "merged_queries": 0}
+
+    async def serve_forever(self):
+        self._queue = asyncio.Queue()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        batcher = asyncio.create_task(self._batch_loop())
+        logger.info(f"Vector service listening on {self.socket_path}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._executor.shutdown(wait=True)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_LENGTH.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (length,) = _LENGTH.unpack(header)
+                if length > MAX_MESSAGE_BYTES:
+                    logger.error(f"Rejecting oversized vector service message ({length} bytes)")
+                    break
+
+                request = json.loads(await reader.readexactly(length))
+                future = loop.create_future()
+                await self._queue.put((request, future))
+                response = await future
+
+                writer.write(_encode(response))
+                await writer.drain()
+        except Exception as e:
+            logger.error(f"Vector service connection error: {e}")
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            requests = [request for request, _ in batch]
+            responses = await loop.run_in_executor(self._executor, self._execute_batch, requests)
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+
+    def _execute_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute a batch on the writer thread, merging adjacent compatible requests"""
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        index = 0
+
+        while index < len(requests):
+            op = requests[index].get("op")
+            key = self._merge_key(requests[index])
+
+            end = index + 1
+            if key is not None:
+                while end < len(requests) and self._merge_key(requests[end]) == key:
+                    end += 1
+
+            group = list(range(index, end))
+            try:
+                if op == "search" and len(group) > 1:
+                    results = self._merged_search(requests, group)
+                    self.stats["merged_queries"] += len(group)
+                elif op == "add_documents" and len(group) > 1:
+                    results = self._merged_add(requests, group)
+                else:
+                    results = [self._execute_one(requests[i]) for i in group]
+
+                for i, result in zip(group, results):
+                    responses[i] = {"ok": True, "result": result}
+            except Exception as e:
+                logger.error(f"Vector service {op} failed: {e}")
+                for i in group:
+                    responses[i] = {"ok": False, "error": str(e)}
+
+            index = end
+
+        return responses
+
+    @staticmethod
+    def _merge_key(request: Dict[str, Any]) -> Optional[Tuple]:
+        op = request.get("op")
+        args = request.get("args", {})
+        if op == "search":
+            return (op, args.get("n_results", 5), json.dumps(args.get("filter_metadata"), sort_keys=True))
+        if op == "add_documents":
+            return (op,)
+        return None
+
+    def _merged_search(self, requests, group) -> List[Any]:
+        args = requests[group[0]]["args"]
+        return self.store.search_many(
+            [requests[i]["args"]["query"] for i in group],
+            n_results=args.get("n_results", 5),
+            filter_metadata=args.get("filter_metadata")
+        )
+
+    def _merged_add(self, requests, group) -> List[Any]:
+        texts, metadatas, ids = [], [], []
+        for i in group:
+            args = requests[i]["args"]
+            texts.extend(args["texts"])
+            metadatas.extend(args["metadatas"])
+            ids.extend(args["ids"])
+        self.store.add_documents(texts=texts, metadatas=metadatas, ids=ids)
+        return [None] * len(group)
+
+    def _execute_one(self, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op not in READ_OPS and op not in WRITE_OPS:
+            raise ValueError(f"Unknown vector service operation: {op}")
+        return getattr(self.store, op)(**request.get("args", {}))
+
+
+class RemoteVectorStore:
+    """
+    Client for the vector service with the same interface as ChromaVectorStore
+    Each thread keeps its own persistent socket connection.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sockets = set()
+        self._sockets_lock = threading.Lock()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+            with self._sockets_lock:
+                self._sockets.add(sock)
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            with self._sockets_lock:
+                self._sockets.discard(sock)
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def close(self):
+        """Close the connections opened by every thread"""
+        with self._sockets_lock:
+            sockets, self._sockets = self._sockets, set()
+        for sock in sockets:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _call(self, op: str, **args) -> Any:
+        payload = _encode({"op": op, "args": args})
+
+        # One reconnect attempt covers a restarted service or a stale socket
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(payload)
+                (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+                response = json.loads(_recv_exact(sock, length))
+                break
+            except (OSError, ConnectionError) as e:
+                self._reset()
+                if attempt == 1:
+                    raise VectorServiceError(f"Vector service unreachable at {self.socket_path}: {e}")
+
+        if not response.get("ok"):
+            raise VectorServiceError(response.get("error", "Unknown vector service error"))
+        return response.get("result")
+
+    def add_documents(self, texts: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
+        cleaned = [t.decode('utf-8', errors='replace') if isinstance(t, bytes) else str(t) for t in texts]
+        return self._call("add_documents", texts=cleaned, metadatas=metadatas, ids=ids)
+
+    def search(self, query: str, n_results: int = 5, filter_metadata: Optional[Dict[str, Any]] = None) -> Dict[str, List]:
+        return self._call("search", query=query, n_results=n_results, filter_metadata=filter_metadata)
+
+    def delete_collection(self, manual_id: str):
+        return self._call("delete_collection", manual_id=manual_id)
+
+    def get_collection_size(self) -> int:
+        return self._call("get_collection_size")
+
+    def get_all_documents(self, limit: int = 100) -> Dict[str, List]:
+        return self._call("get_all_documents", limit=limit)
+
+    def get_documents(self, ids: List[str]) -> Dict[str, List]:
+        return self._call("get_documents", ids=ids)
+
+    def get_records_page(self, offset: int = 0, limit: int = 500) -> Dict[str, List]:
+        return self._call("get_records_page", offset=offset, limit=limit)
+
+    def export_records(self, batch_size: int = 500) -> Iterator[Dict[str, List]]:
+        offset = 0
+        while True:
+            page = self.get_records_page(offset=offset, limit=batch_size)
+            if not page['ids']:
+                break
+            yield page
+            if len(page['ids']) < batch_size:
+                break
+            offset += batch_size
+
+    def import_records(self, ids, documents, metadatas, embeddings):
+        return self._call(
+            "import_records", ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings
+        )
+
+
+def main():
+    from core.config import settings
+    from core.vector_store import ChromaVectorStore
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    if not settings.vector_service_socket:
+        raise SystemExit("Set VECTOR_SERVICE_SOCKET in .env to run the vector service")
+
+    store = ChromaVectorStore(persist_directory=settings.chroma_persist_directory)
+    server = VectorServiceServer(
+        store,
+        socket_path=settings.vector_service_socket,
+        batch_window_ms=settings.vector_service_batch_window_ms
+    )
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Vector service stopped")
+
+
+if __name__ == "__main__":
+    main()
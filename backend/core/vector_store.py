@@ -15,7 +15,7 @@ except ImportError as e:
     print("RAG functionality will be limited. Install chromadb with Python 3.10-3.12 for full functionality.")
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -108,34 +108,62 @@ class ChromaVectorStore:
             filter_metadata: Optional metadata filter
         
         Returns:
-            Dictionary with documents, metadatas, and distances
+            Dictionary with ids, documents, metadatas, and distances
         """
+        return self.search_many([query], n_results=n_results, filter_metadata=filter_metadata)[0]
+    
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, List]]:
+        """
+        Run several queries with the same parameters in one ChromaDB call
+        
+        Args:
+            queries: Search queries
+            n_results: Number of results to return per query
+            filter_metadata: Optional metadata filter applied to every query
+        
+        Returns:
+            One result dictionary (ids, documents, metadatas, distances) per query
+        """
+        empty = {'ids': [[]], 'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        
         if not CHROMADB_AVAILABLE or not self.collection:
             logger.warning("ChromaDB not available - returning empty search results")
-            return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+            return [dict(empty) for _ in queries]
             
         if self.collection.count() == 0:
-            return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+            return [dict(empty) for _ in queries]
         
-        # Ensure query is clean string
-        if isinstance(query, bytes):
-            query = query.decode('utf-8', errors='replace')
-        elif not isinstance(query, str):
-            query = str(query)
+        # Ensure queries are clean strings
+        cleaned_queries = []
+        for query in queries:
+            if isinstance(query, bytes):
+                query = query.decode('utf-8', errors='replace')
+            elif not isinstance(query, str):
+                query = str(query)
+            cleaned_queries.append(query)
         
         # Query ChromaDB
         results = self.collection.query(
-            query_texts=[query],
+            query_texts=cleaned_queries,
             n_results=n_results,
             where=filter_metadata  # ChromaDB where filter
         )
         
-        # Return in consistent format
-        return {
-            'documents': results['documents'],
-            'metadatas': results['metadatas'],
-            'distances': results['distances']
-        }
+        # Return in consistent format, one entry per query
+        return [
+            {
+                'ids': [results['ids'][i]],
+                'documents': [results['documents'][i]],
+                'metadatas': [results['metadatas'][i]],
+                'distances': [results['distances'][i]]
+            }
+            for i in range(len(cleaned_queries))
+        ]
     
     def delete_collection(self, manual_id: str):
         """
@@ -183,3 +211,116 @@ class ChromaVectorStore:
         except Exception as e:
             logger.error(f"Error getting documents: {e}")
             return {'documents': [], 'metadatas': [], 'ids': []}
+
+    def get_documents(self, ids: List[str]) -> Dict[str, List]:
+        """
+        Fetch documents by ID
+        
+        Args:
+            ids: Document IDs
+        
+        Returns:
+            Dictionary with ids, documents and metadatas (order follows the store)
+        """
+        if not CHROMADB_AVAILABLE or not self.collection or not ids:
+            return {'ids': [], 'documents': [], 'metadatas': []}
+        
+        results = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        return {
+            'ids': results['ids'],
+            'documents': results['documents'],
+            'metadatas': results['metadatas']
+        }
+    
+    def get_records_page(self, offset: int = 0, limit: int = 500) -> Dict[str, List]:
+        """
+        Get one page of stored records including embeddings
+        
+        Args:
+            offset: Number of records to skip
+            limit: Maximum number of records to return
+        
+        Returns:
+            Dictionary with ids, documents, metadatas and embeddings
+        """
+        if not CHROMADB_AVAILABLE or not self.collection:
+            return {'ids': [], 'documents': [], 'metadatas': [], 'embeddings': []}
+        
+        results = self.collection.get(
+            limit=limit,
+            offset=offset,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        return {
+            'ids': results['ids'],
+            'documents': results['documents'],
+            'metadatas': results['metadatas'],
+            'embeddings': [list(map(float, e)) for e in results['embeddings']]
+        }
+    
+    def export_records(self, batch_size: int = 500) -> Iterator[Dict[str, List]]:
+        """
+        Page through every stored record including its embedding
+        
+        Args:
+            batch_size: Number of records fetched per call
+        
+        Yields:
+            Dictionaries with ids, documents, metadatas and embeddings
+        """
+        offset = 0
+        while True:
+            page = self.get_records_page(offset=offset, limit=batch_size)
+            if not page['ids']:
+                break
+            
+            yield page
+            
+            if len(page['ids']) < batch_size:
+                break
+            offset += batch_size
+    
+    def import_records(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ):
+        """
+        Bulk-load records with precomputed embeddings (no re-embedding)
+        
+        Args:
+            ids: Document IDs
+            documents: Document texts
+            metadatas: Metadata dictionaries
+            embeddings: One embedding vector per document
+        """
+        if not CHROMADB_AVAILABLE or not self.collection:
+            logger.warning("ChromaDB not available - skipping record import")
+            return
+        
+        self.collection.upsert(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            embeddings=embeddings
+        )
+
+
+def create_vector_store():
+    """
+    Create the vector store for this process
+    
+    When VECTOR_SERVICE_SOCKET is configured, the index is owned by a separate
+    vector service process and this returns a client for it; otherwise ChromaDB
+    is opened in-process.
+    """
+    from core.config import settings
+    
+    if settings.vector_service_socket:
+        from core.vector_service import RemoteVectorStore
+        logger.info(f"Using vector service at {settings.vector_service_socket}")
+        return RemoteVectorStore(settings.vector_service_socket)
+    
+    return ChromaVectorStore(persist_directory=settings.chroma_persist_directory)
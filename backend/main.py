@@ -1,6 +1,7 @@
 import sys
 from pathlib import Path
 from contextlib import asynccontextmanager
+import asyncio
 
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent
@@ -18,6 +19,11 @@ import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from services.file_cleanup_service import FileCleanupService
 from core.database import SessionLocal
+from core.http_transport import get_http_transport
+from services.llm_gateway import get_llm_gateway
+from services.translation_service import get_translation_service
+from services.translation_memory import get_translation_memory
+from core.config import settings
 
 scheduler = BackgroundScheduler()
 cleanup_service = FileCleanupService()
@@ -72,12 +78,21 @@ async def lifespan(app: FastAPI):
     scheduler.start()
     logger.info("Started PDF cleanup scheduler")
     
+    if settings.local_translation_enabled:
+        # Load the local translation model in the background; it stays resident
+        translation_service = get_translation_service()
+        asyncio.get_running_loop().run_in_executor(None, translation_service.backends["local"].load)
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application...")
     scheduler.shutdown()
     logger.info("Stopped PDF cleanup scheduler")
+    await get_llm_gateway().aclose()
+    if settings.translation_memory_enabled:
+        get_translation_memory().flush()
+    get_http_transport().close()
 
 app = FastAPI(
     title="Shiksha-Setu API",
@@ -65,6 +65,25 @@ class ManualResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ManualSearchHit(BaseModel):
+    chunk_id: Optional[str] = None
+    manual_id: Optional[int] = None
+    manual_title: Optional[str] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    snippet: str
+    score: Optional[float] = None
+    distance: Optional[float] = None
+    match: str = "vector"
+
+class ManualSearchResponse(BaseModel):
+    query: str
+    results: List[ManualSearchHit]
+    total: int
+    next_cursor: Optional[str] = None
+    cached: bool = False
+    took_ms: float
+
 class ModuleBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     manual_id: int
@@ -117,3 +136,9 @@ class GenerateModuleRequest(BaseModel):
     cluster_id: int
     topic: str = Field(..., min_length=2, max_length=200, description="Topic to generate content for")
     target_language: Optional[str] = None
+
+class BatchGenerateRequest(BaseModel):
+    manual_id: int
+    topic: str = Field(..., min_length=2, max_length=200, description="Topic to generate content for")
+    cluster_ids: List[int] = Field(..., min_length=1, max_length=100)
+    target_language: Optional[str] = Field(None, description="Defaults to each cluster's primary language")
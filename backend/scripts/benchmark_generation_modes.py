@@ -0,0 +1,101 @@
+"""
+Module Generation Benchmark
+Compares end-to-end latency of native-language generation against English
+generation followed by translation, on the same source text and cluster.
+
+Usage (from the backend root directory; calls Groq and Google Translate):
+    python scripts/benchmark_generation_modes.py --source excerpt.txt --topic "Reading circles" --language hindi
+    python scripts/benchmark_generation_modes.py --source excerpt.txt --topic "Fractions" --language tamil --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import settings
+from services.ai_engine import AIAdaptationEngine, script_share
+from services.prompt_budget import trim_to_tokens
+
+
+async def run_mode(engine, native, source, profile, topic, language, runs):
+    settings.native_language_generation = native
+    stats = engine.translation_service.stats
+    timings, tokens, shares = [], [], []
+    for run in range(runs):
+        requests_before = stats["requests"]
+        started = time.perf_counter()
+        result = await engine.adapt_content(source, profile, topic, target_language=language)
+        timings.append(time.perf_counter() - started)
+        tokens.append(result["tokens_used"])
+        shares.append(script_share(result["adapted_content"], language) or 0.0)
+        print(
+            f"  run {run + 1}: {timings[-1]:.1f}s, {result['tokens_used']} tokens, "
+            f"{stats['requests'] - requests_before} translation requests, {shares[-1]:.0%} in target script"
+        )
+
+    return {
+        "p50": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "tokens": statistics.mean(tokens),
+        "script_share": statistics.mean(shares),
+    }
+
+
+async def benchmark(args):
+    with open(args.source, encoding="utf-8") as f:
+        source = f.read()
+    profile = {
+        "region_type": args.region,
+        "language": args.language.title(),
+        "infrastructure_constraints": args.infrastructure,
+        "key_issues": "Multi-grade classrooms, low attendance",
+        "grade_range": "1-5",
+    }
+    engine = AIAdaptationEngine()
+    # Keep the source the same size in both modes
+    budget = min(
+        engine.source_token_budget(profile, args.topic, target_language=args.language),
+        engine.source_token_budget(profile, args.topic, target_language="english"),
+    )
+    source = trim_to_tokens(source, budget)
+
+    results = {}
+    for mode, native in (("native", True), ("translated", False)):
+        print(f"{mode}:")
+        results[mode] = await run_mode(engine, native, source, profile, args.topic, args.language, args.runs)
+
+    print(f"\n{'mode':<12}{'p50 (s)':>10}{'mean (s)':>10}{'tokens':>10}{'in script':>11}")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<12}{stats['p50']:>10.1f}{stats['mean']:>10.1f}"
+            f"{stats['tokens']:>10.0f}{stats['script_share']:>11.0%}"
+        )
+    speedup = results["translated"]["p50"] / results["native"]["p50"]
+    print(f"\nNative generation is {speedup:.1f}x the speed of generate-then-translate (p50)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare native-language and translated module generation")
+    parser.add_argument("--source", required=True, help="Text file with the source manual excerpt")
+    parser.add_argument("--topic", required=True, help="Topic to adapt")
+    parser.add_argument("--language", default="hindi", help="Target language (default: hindi)")
+    parser.add_argument("--runs", type=int, default=3, help="Generations per mode (default: 3)")
+    parser.add_argument("--region", default="Rural", help="Cluster region type")
+    parser.add_argument("--infrastructure", default="Low", help="Cluster infrastructure level")
+    args = parser.parse_args()
+
+    if args.language.lower() == "english":
+        print("✗ Pick a non-English target language; both modes are identical for English")
+        sys.exit(1)
+    args.language = args.language.lower()
+
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
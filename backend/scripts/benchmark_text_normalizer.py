@@ -0,0 +1,105 @@
+"""
+Text Normalizer Benchmark
+Times services.text_normalizer against the per-character loop it replaced, on
+multi-megabyte manual-like text (Hindi and English, some decomposed vowel signs
+and zero-width characters), and checks both give identical output.
+
+Usage (from the backend root directory):
+    python scripts/benchmark_text_normalizer.py
+    python scripts/benchmark_text_normalizer.py --megabytes 8 --runs 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import unicodedata
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.text_normalizer import cache_info, normalize_indic_text
+
+PARAGRAPHS = [
+    "शिक्षक कक्षा में बच्चों को छोटे समूहों में बाँटकर पढ़ने का अभ्यास कराएँ।",
+    "मुलांना स्थानिक उदाहरणांच्या मदतीने अपूर्णांक समजावून सांगा.",
+    "Teachers should use locally available materials such as stones and leaves for counting.",
+    "बहुस्तरीय कक्षा में बड़े बच्चे छोटे बच्चों की सहायता कर सकते हैं।",
+    "Assessment should be continuous and comprehensive, not limited to term-end tests.",
+]
+
+
+def legacy_normalize(text: str) -> str:
+    """The per-character loop previously used by TranslationService and ManualAdapterService"""
+    if not text:
+        return text
+    normalized = unicodedata.normalize('NFC', text)
+    cleaned = ""
+    for char in normalized:
+        code_point = ord(char)
+        if code_point == 0x200D:
+            cleaned += char
+        elif code_point in (0x200B, 0x200C, 0xFEFF):
+            continue
+        else:
+            cleaned += char
+    return cleaned
+
+
+def build_text(megabytes: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < megabytes * 1024 * 1024:
+        paragraph = rng.choice(PARAGRAPHS)
+        roll = rng.random()
+        if roll < 0.05:
+            # PDF extraction sometimes yields decomposed characters
+            paragraph = unicodedata.normalize("NFD", paragraph)
+        elif roll < 0.08:
+            paragraph = paragraph.replace(" ", " \u200b", 1)
+        parts.append(paragraph)
+        size += len(paragraph.encode("utf-8")) + 1
+    return "\n".join(parts)
+
+
+def best_of(runs, fn, *args):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Indic text normalization")
+    parser.add_argument("--megabytes", type=float, default=4, help="Size of the generated manual text (default: 4)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per variant; the best is reported (default: 3)")
+    args = parser.parse_args()
+
+    text = build_text(args.megabytes)
+    print(f"Manual text: {len(text.encode('utf-8')) / 1024 / 1024:.1f} MB, {len(text):,} characters")
+
+    legacy_time, legacy = best_of(args.runs, legacy_normalize, text)
+    shared_time, shared = best_of(args.runs, normalize_indic_text, text)
+    again_time, _ = best_of(args.runs, normalize_indic_text, shared)
+    if shared != legacy:
+        print("✗ Output differs from the per-character loop")
+        sys.exit(1)
+
+    print(f"{'per-character loop':<28}{legacy_time * 1000:>10.1f} ms")
+    print(f"{'normalize_indic_text':<28}{shared_time * 1000:>10.1f} ms  ({legacy_time / shared_time:.0f}x)")
+    print(f"{'already normalized text':<28}{again_time * 1000:>10.1f} ms")
+
+    points = text.split("\n")[:5000]
+    legacy_time, _ = best_of(args.runs, lambda: [legacy_normalize(point) for point in points])
+    shared_time, _ = best_of(args.runs, lambda: [normalize_indic_text(point) for point in points])
+    print(f"\n{len(points)} key points (repeated phrases are memoized):")
+    print(f"{'per-character loop':<28}{legacy_time * 1000:>10.1f} ms")
+    print(f"{'normalize_indic_text':<28}{shared_time * 1000:>10.1f} ms  ({legacy_time / shared_time:.0f}x)")
+    print(f"Memo: {cache_info()}")
+    print("✓ Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Vector Index Snapshot Tool
+Export the RAG index to a portable snapshot file, or warm-boot a new node from one
+
+Usage (from the backend root directory):
+    python scripts/vector_snapshot.py create snapshots/full.snap
+    python scripts/vector_snapshot.py create snapshots/inc1.snap --since snapshots/full.snap
+    python scripts/vector_snapshot.py restore snapshots/full.snap snapshots/inc1.snap
+    python scripts/vector_snapshot.py inspect snapshots/inc1.snap
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.index_snapshot import SnapshotReader, SnapshotError
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot and restore the RAG vector index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create = subparsers.add_parser("create", help="Write a snapshot of the current index")
+    create.add_argument("path", help="Output snapshot file")
+    create.add_argument("--since", help="Previous snapshot; write only what changed after it")
+
+    restore = subparsers.add_parser("restore", help="Load snapshots into the local index")
+    restore.add_argument("paths", nargs="+", help="Full snapshot followed by incrementals, oldest first")
+
+    inspect = subparsers.add_parser("inspect", help="Verify a snapshot and print its header")
+    inspect.add_argument("path")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "inspect":
+            with SnapshotReader(args.path) as snapshot:
+                print(json.dumps(snapshot.info(), indent=2))
+            return
+
+        from services.rag_engine import RAGEngine
+        rag_engine = RAGEngine()
+
+        if args.command == "create":
+            info = rag_engine.create_snapshot(args.path, since=args.since)
+            print(json.dumps(info, indent=2))
+        elif args.command == "restore":
+            summary = rag_engine.restore_snapshot(args.paths)
+            print(json.dumps(summary, indent=2))
+            print(f"✓ Index now holds {rag_engine.get_stats()['total_documents']} documents")
+
+    except SnapshotError as e:
+        print(f"✗ Snapshot error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
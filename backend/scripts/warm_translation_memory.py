@@ -0,0 +1,62 @@
+"""
+Translation Memory Warm-up
+Translates the seven module component headings, in the forms generated modules
+use them ("Classroom Challenge" and "**1. Classroom Challenge**"), into every
+supported language so new deployments start with them in the translation memory.
+
+Usage (from the backend root directory; calls Google Translate for misses only):
+    python scripts/warm_translation_memory.py
+    python scripts/warm_translation_memory.py --languages hindi marathi
+"""
+import argparse
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import settings
+from services.module_schema import MODULE_COMPONENTS
+from services.translation_service import get_translation_service
+
+
+def template_phrases():
+    headings = [heading for _, heading in MODULE_COMPONENTS]
+    numbered = [f"**{number}. {heading}**" for number, heading in enumerate(headings, start=1)]
+    return headings + numbered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-translate module template phrases into the translation memory")
+    parser.add_argument("--languages", nargs="+", help="Languages to warm (default: all supported)")
+    args = parser.parse_args()
+
+    if not settings.translation_memory_enabled:
+        print("✗ Translation memory is disabled (TRANSLATION_MEMORY_ENABLED=false)")
+        sys.exit(1)
+
+    service = get_translation_service()
+    languages = [lang.lower() for lang in args.languages] if args.languages else service.supported_languages
+    unsupported = [lang for lang in languages if not service.is_language_supported(lang)]
+    if unsupported:
+        print(f"✗ Unsupported languages: {', '.join(unsupported)}")
+        sys.exit(1)
+
+    phrases = template_phrases()
+    for language in languages:
+        if language == "english":
+            continue
+        requests_before = service.stats["requests"]
+        translations = service.batch_translate(phrases, language)
+        print(
+            f"✓ {language}: {len(phrases)} phrases, "
+            f"{service.stats['requests'] - requests_before} translation requests "
+            f"(e.g. {phrases[0]!r} → {translations[0]!r})"
+        )
+
+    stats = service.memory.get_stats()
+    print(f"\nTranslation memory: {stats['entries']} entries at {settings.translation_memory_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 # Services - Business Logic Layer
 from services.pdf_processor import PDFProcessor
-from services.rag_engine import RAGEngine
+from services.rag_engine import RAGEngine, get_rag_engine
 from services.ai_engine import AIAdaptationEngine
+from services.llm_gateway import LLMGateway, get_llm_gateway
 from services.translation_service import TranslationService, get_translation_service
 
 __all__ = [
     "PDFProcessor", 
     "RAGEngine", 
+    "get_rag_engine",
     "AIAdaptationEngine",
+    "LLMGateway",
+    "get_llm_gateway",
     "TranslationService",
     "get_translation_service"
 ]
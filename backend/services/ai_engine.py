@@ -1,11 +1,88 @@
-from groq import Groq
+import asyncio
+import re
+from collections import deque
 from core.config import settings
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from services.translation_service import get_translation_service
+from services.language_detection import script_share
+from services.prompt_budget import count_tokens, trim_to_tokens
+from services.llm_gateway import get_llm_gateway
+from core.resilience import CircuitOpen
+from services.llm_scheduler import Priority, SchedulerBusy
+from services.model_router import Task, get_model_router
+from services.module_schema import (
+    COMPETENCY_TAGS, MODULE_COMPONENTS, STRUCTURED_EXTRA_TOKENS, STRUCTURED_OUTPUT_INSTRUCTIONS,
+    parse_structured_module
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+SAFETY_PROMPT = """Review the following teacher training module and ensure:
+- No unsafe or unapproved experiments are suggested
+- No policy violations are present
+- No assumptions of unavailable resources
+- Tone is respectful and supportive toward teachers
+
+MODULE CONTENT:
+\"\"\"
+{content}
+\"\"\"
+
+Respond with:
+1. SAFE or UNSAFE
+2. If UNSAFE, list specific concerns
+3. If concerns found, provide revised content"""
+
+COMPETENCY_PROMPT = """Based on the module content below, tag this module under up to two teacher competency areas:
+- Classroom Management
+- Language Pedagogy
+- Conceptual Teaching
+- Inclusive Education
+- Assessment & Feedback
+
+Return only the tags, comma-separated.
+
+MODULE CONTENT:
+\"\"\"
+{content}
+\"\"\"
+
+TAGS:"""
+
+# Module content sent for competency tagging
+COMPETENCY_CONTENT_TOKENS = 1500
+
+NATIVE_LANGUAGE_INSTRUCTIONS = """
+
+OUTPUT LANGUAGE:
+Write the ENTIRE module in {language}, including the component headings. Use the simple,
+everyday {language} that teachers in this cluster speak; keep a technical term in English
+only where there is no common {language} word for it. Do not add an English version."""
+
+NATIVE_JSON_NOTE = """
+In the JSON, only the component texts are in {language}; keys, the safety verdict and
+competency tags stay in English."""
+
+# Indic scripts take more tokens than English for the same content
+NATIVE_OUTPUT_TOKEN_FACTOR = 1.6
+
+_VERDICT = re.compile(r"\b(UNSAFE|SAFE)\b")
+
+
+def parse_safety_verdict(text: str) -> Optional[str]:
+    """First SAFE/UNSAFE verdict in a validator response, or None"""
+    match = _VERDICT.search((text or "").upper())
+    return match.group(1) if match else None
+
+
+def parse_competency_tags(text: str) -> Optional[List[str]]:
+    """Known competency areas named in a tagging response (at most two), or None"""
+    by_name = {tag.lower(): tag for tag in COMPETENCY_TAGS}
+    names = [part.strip().strip('."').lower() for part in (text or "").split(",")]
+    tags = [by_name[name] for name in names if name in by_name]
+    return list(dict.fromkeys(tags))[:2] or None
+
 class AIAdaptationEngine:
     # Supported languages with native names
     SUPPORTED_LANGUAGES = {
@@ -24,9 +101,11 @@ class AIAdaptationEngine:
     }
     
     def __init__(self):
-        self.client = Groq(api_key=settings.groq_api_key)
-        self.model = "llama-3.3-70b-versatile"  # Fast and capable model
+        self.llm = get_llm_gateway()
+        self.router = get_model_router()
+        self.max_output_tokens = 2000
         self.translation_service = get_translation_service()
+        self._heading_cache: Dict[str, List[str]] = {}
         
         # System prompt for grounded, policy-safe pedagogy
         self.system_prompt = """You are an expert teacher educator working within the Indian public education system.
@@ -113,6 +192,74 @@ Remember:
         
         return prompt
     
+    def source_token_budget(
+        self,
+        cluster_profile: Dict,
+        topic: str,
+        margin: int = 150,
+        structured: bool = False,
+        target_language: Optional[str] = None
+    ) -> int:
+        """
+        Tokens left for source material once the system prompt, the prompt
+        template and the completion are accounted for
+        
+        Args:
+            cluster_profile: Cluster characteristics (they are part of the prompt)
+            topic: Topic being adapted
+            margin: Safety margin for tokenizer estimation error
+            structured: Budget for adapt_content_structured (longer prompt and completion)
+            target_language: Output language (native-language output needs more tokens)
+        
+        Returns:
+            Token budget for the source excerpt
+        """
+        target_lang = self._language(target_language)
+        scaffold = self._prompt("", cluster_profile, topic, target_lang, structured)
+        overhead = (
+            count_tokens(self.system_prompt) + count_tokens(scaffold)
+            + self._output_tokens(target_lang, structured)
+        )
+        return max(settings.groq_request_token_limit - overhead - margin, 300)
+    
+    def _language(self, target_language: Optional[str]) -> str:
+        return target_language.lower() if target_language else "english"
+    
+    def _native(self, target_lang: str) -> bool:
+        """Whether to generate directly in target_lang rather than translate English output"""
+        return (
+            settings.native_language_generation
+            and target_lang != "english"
+            and target_lang in self.SUPPORTED_LANGUAGES
+        )
+    
+    def _output_tokens(self, target_lang: str, structured: bool = False) -> int:
+        tokens = self.max_output_tokens
+        if self._native(target_lang):
+            tokens = int(tokens * NATIVE_OUTPUT_TOKEN_FACTOR)
+        return tokens + (STRUCTURED_EXTRA_TOKENS if structured else 0)
+    
+    def _prompt(self, source_content: str, cluster_profile: Dict, topic: str, target_lang: str, structured: bool = False) -> str:
+        """Adaptation prompt with the output format and language instructions"""
+        prompt = self._build_context_prompt(source_content, cluster_profile, topic)
+        if structured:
+            prompt += STRUCTURED_OUTPUT_INSTRUCTIONS
+        if self._native(target_lang):
+            language = self.SUPPORTED_LANGUAGES[target_lang]
+            prompt += NATIVE_LANGUAGE_INSTRUCTIONS.format(language=language)
+            if structured:
+                prompt += NATIVE_JSON_NOTE.format(language=language)
+        return prompt
+    
+    def _fit_content(self, content: str, template: str, system: str, max_tokens: int, margin: int = 150) -> str:
+        """Trim content so the filled-in template fits the request token limit"""
+        overhead = count_tokens(system) + count_tokens(template.format(content="")) + max_tokens
+        budget = max(settings.groq_request_token_limit - overhead - margin, 300)
+        trimmed = trim_to_tokens(content, budget)
+        if len(trimmed) < len(content):
+            logger.info(f"Content trimmed to {budget} tokens to fit the request limit")
+        return trimmed
+
     def get_supported_languages(self) -> Dict[str, str]:
         """Return list of supported languages with native names"""
         return self.SUPPORTED_LANGUAGES.copy()
@@ -123,10 +270,16 @@ Remember:
         cluster_profile: Dict,
         topic: str,
         target_language: str = "english",
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = None
     ) -> Dict[str, str]:
         """
-        Generate adapted pedagogical content and translate to target language
+        Generate adapted pedagogical content in the target language
+        
+        With native-language generation on, the model writes in the target
+        language directly; paragraphs that come back in another script are
+        translated. Otherwise English output is translated paragraph by paragraph.
         
         Args:
             source_content: Original manual content
@@ -134,167 +287,427 @@ Remember:
             topic: Specific topic to adapt
             target_language: Target language for the output (hindi, marathi, etc.)
             temperature: Model creativity (0-1)
+            priority: LLM scheduling priority
+            max_wait: Raise SchedulerBusy rather than queue longer than this
         
         Returns:
             Dict with adapted content and metadata
         """
         try:
             # Build prompt
-            user_prompt = self._build_context_prompt(source_content, cluster_profile, topic)
+            target_lang = self._language(target_language)
+            user_prompt = self._prompt(source_content, cluster_profile, topic, target_lang)
             
             # Call Groq API
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self.router.complete(
+                Task.MODULE_GENERATION,
                 messages=[
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=temperature,
-                max_tokens=2000,
+                max_tokens=self._output_tokens(target_lang),
                 top_p=1,
-                stream=False
+                cache=False,  # Regenerating a module should give a fresh adaptation
+                priority=priority,
+                max_wait=max_wait
             )
             
-            adapted_content = response.choices[0].message.content
-            
-            # Translate content to target language if not English
-            target_lang = target_language.lower() if target_language else "english"
-            final_content = adapted_content
-            was_translated = False
-            
-            if target_lang != "english" and target_lang in self.SUPPORTED_LANGUAGES:
-                logger.info(f"Translating adapted content to {target_lang}")
-                # Split content into smaller chunks for better translation
-                final_content = self._translate_long_content(adapted_content, target_lang)
-                was_translated = True
-                logger.info(f"Successfully translated content to {target_lang}")
-            
             result = {
-                "adapted_content": final_content,
-                "original_english_content": adapted_content if was_translated else None,
+                **await self._localize(response.content, target_lang),
                 "output_language": target_lang,
-                "was_translated": was_translated,
-                "model": self.model,
-                "tokens_used": response.usage.total_tokens if response.usage else 0,
-                "finish_reason": response.choices[0].finish_reason
+                "model": response.model,
+                "tokens_used": response.total_tokens,
+                "finish_reason": response.finish_reason
             }
             
             logger.info(f"Successfully adapted content for topic: {topic}")
             return result
             
+        except (SchedulerBusy, CircuitOpen):
+            raise
         except Exception as e:
             logger.error(f"Error adapting content: {str(e)}")
             raise Exception(f"AI adaptation failed: {str(e)}")
     
-    def _translate_long_content(self, content: str, target_language: str) -> str:
+    async def _localize(self, content: str, target_lang: str) -> Dict:
+        """
+        Bring generated content into the target language
+        
+        Returns:
+            adapted_content, original_english_content, was_translated and
+            generation_mode ("english", "native" or "translated")
+        """
+        if target_lang == "english" or target_lang not in self.SUPPORTED_LANGUAGES:
+            return {"adapted_content": content, "original_english_content": None,
+                    "was_translated": False, "generation_mode": "english"}
+        
+        if self._native(target_lang):
+            fixed_content, fixed = await self._ensure_language(content, target_lang)
+            return {"adapted_content": fixed_content, "original_english_content": None,
+                    "was_translated": fixed > 0, "generation_mode": "native"}
+        
+        logger.info(f"Translating adapted content to {target_lang}")
+        # Translation is blocking I/O; keep it off the event loop
+        final_content = await asyncio.to_thread(self._translate_long_content, content, target_lang)
+        logger.info(f"Successfully translated content to {target_lang}")
+        return {"adapted_content": final_content, "original_english_content": content,
+                "was_translated": True, "generation_mode": "translated"}
+    
+    def _off_language(self, paragraph: str, target_lang: str) -> bool:
+        """A paragraph with enough letters that is mostly not in the target script"""
+        share = script_share(paragraph, target_lang)
+        return share is not None and share < settings.native_min_script_share
+    
+    async def _ensure_language(self, content: str, target_lang: str) -> Tuple[str, int]:
         """
-        Translate long content by splitting into paragraphs and translating each.
+        Script check for natively generated content: translate only the
+        paragraphs the model wrote in another language (usually English)
+        
+        Returns:
+            (content, number of paragraphs translated)
+        """
+        paragraphs = content.split("\n\n")
+        off = [i for i, paragraph in enumerate(paragraphs) if self._off_language(paragraph, target_lang)]
+        if off:
+            logger.warning(
+                f"{len(off)} of {len(paragraphs)} paragraphs were not in {target_lang}; translating them"
+            )
+            fixed = await asyncio.gather(*(
+                asyncio.to_thread(self._translate_long_content, paragraphs[i], target_lang) for i in off
+            ))
+            for i, text in zip(off, fixed):
+                paragraphs[i] = text
+        return "\n\n".join(paragraphs), len(off)
+    
+    async def _component_headings(self, target_lang: str) -> Optional[List[str]]:
+        """
+        Module component headings in the target language (translated once per language)
+        
+        Headings that fail to translate fall back to English for this module
+        only; the language is cached once every heading has translated.
+        """
+        if target_lang not in self._heading_cache:
+            headings = [heading for _, heading in MODULE_COMPONENTS]
+            items = await asyncio.to_thread(
+                lambda: list(self.translation_service.iter_batch_translate(headings, target_lang))
+            )
+            translated = [item["text"] for item in items]
+            if any(item["status"] == "failed" for item in items):
+                logger.warning(f"Some module headings could not be translated to {target_lang}; not caching them")
+                return translated
+            self._heading_cache[target_lang] = translated
+        return self._heading_cache[target_lang]
+    
+    async def adapt_content_structured(
+        self,
+        source_content: str,
+        cluster_profile: Dict,
+        topic: str,
+        target_language: str = "english",
+        temperature: float = 0.7,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = None
+    ) -> Dict:
+        """
+        Generate a module, its safety verdict and competency tags in one call
+        
+        The model answers with one JSON object (see services.module_schema),
+        which saves the two follow-up calls that would re-send the whole module.
+        If the response does not validate, falls back to adapt_content followed
+        by validate_safety and tag_competencies.
+        
+        Args:
+            Same as adapt_content
+        
+        Returns:
+            adapt_content's result plus "safety" ({"is_safe", "concerns"}),
+            "competency_tags" and "structured" (False when the fallback ran)
+        """
+        target_lang = self._language(target_language)
+        user_prompt = self._prompt(source_content, cluster_profile, topic, target_lang, structured=True)
+        
+        try:
+            response = await self.router.complete(
+                Task.MODULE_GENERATION,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                validate=parse_structured_module,
+                temperature=temperature,
+                max_tokens=self._output_tokens(target_lang, structured=True),
+                top_p=1,
+                response_format={"type": "json_object"},
+                cache=False,
+                priority=priority,
+                max_wait=max_wait
+            )
+        except (SchedulerBusy, CircuitOpen):
+            raise
+        except Exception as e:
+            # Groq rejects JSON mode responses it cannot parse (json_validate_failed)
+            logger.warning(f"Structured generation failed, using separate calls: {e}")
+            response = None
+        
+        structured = parse_structured_module(response.content) if response else None
+        if structured is None:
+            if response is not None:
+                logger.warning(
+                    f"Structured module for '{topic}' did not validate "
+                    f"(finish_reason={response.finish_reason}), using separate calls"
+                )
+            return await self._adapt_with_separate_checks(
+                source_content, cluster_profile, topic, target_language, temperature, priority, max_wait
+            )
+        
+        headings = await self._component_headings(target_lang) if self._native(target_lang) else None
+        localized = await self._localize(structured.to_markdown(headings), target_lang)
+        logger.info(f"Successfully adapted content for topic: {topic} (single structured call)")
+        return {
+            **localized,
+            "output_language": target_lang,
+            "model": response.model,
+            "tokens_used": response.total_tokens,
+            "finish_reason": response.finish_reason,
+            "safety": {
+                "is_safe": structured.safety.verdict == "SAFE",
+                "concerns": structured.safety.concerns
+            },
+            "competency_tags": structured.competency_tags,
+            "structured": True
+        }
+    
+    async def _adapt_with_separate_checks(
+        self,
+        source_content: str,
+        cluster_profile: Dict,
+        topic: str,
+        target_language: str,
+        temperature: float,
+        priority: Priority,
+        max_wait: Optional[float]
+    ) -> Dict:
+        """Three-call path: adapt, then safety check and tagging in parallel"""
+        result = await self.adapt_content(
+            source_content, cluster_profile, topic, target_language, temperature, priority, max_wait
+        )
+        english_content = result["original_english_content"] or result["adapted_content"]
+        safety, tags = await asyncio.gather(
+            self.validate_safety(english_content, priority=priority),
+            self.tag_competencies(english_content, priority=priority)
+        )
+        result["safety"] = {
+            "is_safe": safety["is_safe"],
+            "concerns": [safety["validation_details"]] if not safety["is_safe"] else []
+        }
+        result["competency_tags"] = tags
+        result["structured"] = False
+        return result
+    
+    async def stream_adaptation(
+        self,
+        source_content: str,
+        cluster_profile: Dict,
+        topic: str,
+        target_language: str = "english",
+        temperature: float = 0.7,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of adapt_content
+        
+        Yields {"type": "delta", "text": ...} events while the module is being
+        generated. English output is passed through token by token. For other
+        languages each paragraph is emitted in order as soon as it is complete:
+        natively generated paragraphs as they are (translated only if they fail
+        the script check), English ones translated in parallel with the rest of
+        the generation. The last event is {"type": "done", ...} with the same
+        fields as adapt_content's result.
+        """
+        target_lang = self._language(target_language)
+        user_prompt = self._prompt(source_content, cluster_profile, topic, target_lang)
+        localize = target_lang != "english" and target_lang in self.SUPPORTED_LANGUAGES
+        native = self._native(target_lang)
+        
+        stream = await self.router.stream(
+            Task.MODULE_GENERATION,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=temperature,
+            max_tokens=self._output_tokens(target_lang),
+            top_p=1,
+            priority=priority
+        )
+        
+        pending = deque()
+        emitted: List[str] = []
+        buffer = ""
+        fixed = 0
+        
+        def emit(paragraph: str) -> Dict:
+            text = ("\n\n" if emitted else "") + paragraph
+            emitted.append(paragraph)
+            return {"type": "delta", "text": text}
+        
+        def schedule(paragraph: str):
+            nonlocal fixed
+            if native and not self._off_language(paragraph, target_lang):
+                ready = asyncio.get_running_loop().create_future()
+                ready.set_result(paragraph)
+                pending.append(ready)
+                return
+            fixed += 1
+            pending.append(asyncio.create_task(asyncio.to_thread(
+                self._translate_long_content, paragraph, target_lang
+            )))
+        
+        try:
+            async for delta in stream:
+                if not localize:
+                    yield {"type": "delta", "text": delta}
+                    continue
+                
+                buffer += delta
+                while "\n\n" in buffer:
+                    paragraph, buffer = buffer.split("\n\n", 1)
+                    schedule(paragraph)
+                while pending and pending[0].done():
+                    yield emit(pending.popleft().result())
+            
+            if localize:
+                if buffer.strip():
+                    schedule(buffer)
+                while pending:
+                    yield emit(await pending.popleft())
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        adapted_content = stream.result.content
+        if native and fixed:
+            logger.warning(f"{fixed} streamed paragraphs were not in {target_lang}; translated them")
+        logger.info(f"Successfully streamed adapted content for topic: {topic}")
+        yield {
+            "type": "done",
+            "adapted_content": "\n\n".join(emitted) if localize else adapted_content,
+            "original_english_content": adapted_content if localize and not native else None,
+            "output_language": target_lang,
+            "was_translated": localize and (fixed > 0),
+            "generation_mode": ("native" if native else "translated") if localize else "english",
+            "model": stream.result.model,
+            "tokens_used": stream.result.total_tokens,
+            "finish_reason": stream.result.finish_reason
+        }
+    
+    def translate_module(self, title: str, content: str, target_language: str, source_language: str = "english") -> Tuple[str, str]:
+        """
+        Translate an existing module (title and markdown content)
+        
+        Args:
+            title: Module title
+            content: Module content
+            target_language: Target language (hindi, marathi, etc.)
+            source_language: Language the module is written in
+        
+        Returns:
+            (translated title, translated content)
+        """
+        translated_title = self.translation_service.translate(title, target_language, source_language)
+        return translated_title, self._translate_long_content(content, target_language, source_language)
+    
+    def _translate_long_content(self, content: str, target_language: str, source_language: str = "english") -> str:
+        """
+        Translate long content line by line in one packed batch.
         Preserves formatting like headings and bullet points.
         
         Args:
             content: The content to translate
             target_language: Target language code (hindi, marathi, etc.)
+            source_language: Language the content is written in
             
         Returns:
             Translated content with preserved formatting
         """
         if not content:
             return content
-            
-        # Split by double newlines (paragraphs) to preserve structure
-        paragraphs = content.split('\n\n')
-        translated_paragraphs = []
         
-        for paragraph in paragraphs:
-            if not paragraph.strip():
-                translated_paragraphs.append(paragraph)
+        # Split into lines, keeping markdown-like prefixes (headings, bullets) out of the translation
+        layout = []
+        texts = []
+        for line in content.split('\n'):
+            if not line.strip():
+                layout.append((line, None))
                 continue
                 
-            # Handle single-line vs multi-line paragraphs
-            lines = paragraph.split('\n')
-            translated_lines = []
+            # Preserve markdown-like formatting (headings, bullets)
+            prefix = ""
+            text_to_translate = line
             
-            for line in lines:
-                if not line.strip():
-                    translated_lines.append(line)
-                    continue
-                    
-                # Preserve markdown-like formatting (headings, bullets)
-                prefix = ""
-                text_to_translate = line
-                
-                # Check for heading markers
-                if line.startswith('#'):
-                    hash_count = len(line) - len(line.lstrip('#'))
-                    prefix = '#' * hash_count + ' '
-                    text_to_translate = line.lstrip('#').strip()
-                # Check for bullet points
-                elif line.strip().startswith(('- ', '* ', '• ')):
-                    indent = len(line) - len(line.lstrip())
-                    prefix = ' ' * indent + line.strip()[:2]
-                    text_to_translate = line.strip()[2:]
-                # Check for numbered lists
-                elif len(line.strip()) > 2 and line.strip()[0].isdigit() and line.strip()[1] in '.):':
-                    indent = len(line) - len(line.lstrip())
-                    prefix = ' ' * indent + line.strip()[:3]
-                    text_to_translate = line.strip()[3:]
-                
-                # Translate the text portion
-                if text_to_translate.strip():
-                    translated_text = self.translation_service.translate(
-                        text_to_translate.strip(),
-                        target_language=target_language,
-                        source_language="english"
-                    )
-                    translated_lines.append(prefix + translated_text)
-                else:
-                    translated_lines.append(line)
+            # Check for heading markers
+            if line.startswith('#'):
+                hash_count = len(line) - len(line.lstrip('#'))
+                prefix = '#' * hash_count + ' '
+                text_to_translate = line.lstrip('#').strip()
+            # Check for bullet points
+            elif line.strip().startswith(('- ', '* ', '• ')):
+                indent = len(line) - len(line.lstrip())
+                prefix = ' ' * indent + line.strip()[:2]
+                text_to_translate = line.strip()[2:]
+            # Check for numbered lists
+            elif len(line.strip()) > 2 and line.strip()[0].isdigit() and line.strip()[1] in '.):':
+                indent = len(line) - len(line.lstrip())
+                prefix = ' ' * indent + line.strip()[:3]
+                text_to_translate = line.strip()[3:]
             
-            translated_paragraphs.append('\n'.join(translated_lines))
+            if text_to_translate.strip():
+                layout.append((prefix, len(texts)))
+                texts.append(text_to_translate.strip())
+            else:
+                layout.append((line, None))
         
-        return '\n\n'.join(translated_paragraphs)
+        translated = self.translation_service.batch_translate(
+            texts, target_language=target_language, source_language=source_language
+        )
+        return '\n'.join(
+            prefix if index is None else prefix + translated[index]
+            for prefix, index in layout
+        )
     
-    async def validate_safety(self, content: str) -> Dict[str, any]:
+    async def validate_safety(self, content: str, priority: Priority = Priority.INTERACTIVE) -> Dict[str, any]:
         """
         Optional safety validation pass
         
         Args:
             content: Generated content to validate
+            priority: LLM scheduling priority
         
         Returns:
             Dict with validation result and any concerns
         """
-        safety_prompt = f"""Review the following teacher training module and ensure:
-- No unsafe or unapproved experiments are suggested
-- No policy violations are present
-- No assumptions of unavailable resources
-- Tone is respectful and supportive toward teachers
-
-MODULE CONTENT:
-\"\"\"
-{content}
-\"\"\"
-
-Respond with:
-1. SAFE or UNSAFE
-2. If UNSAFE, list specific concerns
-3. If concerns found, provide revised content"""
+        system = "You are a safety validator for educational content."
+        content = self._fit_content(content, SAFETY_PROMPT, system, max_tokens=1500)
+        safety_prompt = SAFETY_PROMPT.format(content=content)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self.router.complete(
+                Task.SAFETY_CHECK,
                 messages=[
-                    {"role": "system", "content": "You are a safety validator for educational content."},
+                    {"role": "system", "content": system},
                     {"role": "user", "content": safety_prompt}
                 ],
+                validate=parse_safety_verdict,
                 temperature=0.3,
-                max_tokens=1500
+                max_tokens=1500,
+                priority=priority
             )
             
-            validation_result = response.choices[0].message.content
+            validation_result = response.content
             
             return {
-                "is_safe": "SAFE" in validation_result.upper()[:20],
+                "is_safe": parse_safety_verdict(validation_result) == "SAFE",
                 "validation_details": validation_result
             }
             
@@ -306,46 +719,34 @@ Respond with:
                 "validation_details": f"Validation failed: {str(e)}"
             }
     
-    async def tag_competencies(self, content: str) -> list:
+    async def tag_competencies(self, content: str, priority: Priority = Priority.INTERACTIVE) -> list:
         """
         Tag content with relevant teacher competency areas
         
         Args:
             content: Module content to analyze
+            priority: LLM scheduling priority
         
         Returns:
             List of competency tags
         """
-        competency_prompt = f"""Based on the module content below, tag this module under up to two teacher competency areas:
-- Classroom Management
-- Language Pedagogy
-- Conceptual Teaching
-- Inclusive Education
-- Assessment & Feedback
-
-Return only the tags, comma-separated.
-
-MODULE CONTENT:
-\"\"\"
-{content}
-\"\"\"
-
-TAGS:"""
+        # The first part of a module is enough to tell what it is about
+        content = trim_to_tokens(content, COMPETENCY_CONTENT_TOKENS)
+        competency_prompt = COMPETENCY_PROMPT.format(content=content)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self.router.complete(
+                Task.COMPETENCY_TAGGING,
                 messages=[
                     {"role": "user", "content": competency_prompt}
                 ],
+                validate=parse_competency_tags,
                 temperature=0.2,
-                max_tokens=50
+                max_tokens=50,
+                priority=priority
             )
             
-            tags_text = response.choices[0].message.content.strip()
-            tags = [tag.strip() for tag in tags_text.split(',')]
-            
-            return tags[:2]  # Return max 2 tags
+            return parse_competency_tags(response.content) or []
             
         except Exception as e:
             logger.error(f"Error tagging competencies: {str(e)}")
@@ -0,0 +1,162 @@
+"""
+Token-budgeted context packing for module generation
+Turns ranked RAG results into a source excerpt that fits the LLM request limit:
+drops weak and near-duplicate chunks, removes sentences repeated by chunk
+overlap, and trims the last chunk at a sentence boundary instead of mid-word.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from services.prompt_budget import count_tokens, trim_to_tokens
+
+# Sentence ends: Latin punctuation, Devanagari danda/double danda, or line breaks
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of text (see services.prompt_budget)"""
+    return count_tokens(text)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+
+def _shingles(text: str, size: int = 3) -> Set[int]:
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {hash(" ".join(words))} if words else set()
+    return {hash(" ".join(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+@dataclass
+class PackedContext:
+    """Result of packing: the prompt excerpt plus what was kept and why"""
+    text: str
+    tokens: int
+    chunks_used: int
+    dropped_distance: int = 0
+    dropped_duplicate: int = 0
+    truncated: bool = False
+    candidates: List[Dict] = field(default_factory=list)
+
+
+class ContextPacker:
+    """
+    Packs ranked search results into a token budget, best first
+
+    Args:
+        max_distance: Vector distance above which chunks are considered
+            irrelevant (keyword-only hits without a distance are kept)
+        duplicate_threshold: Shingle Jaccard similarity at which a chunk is
+            treated as a near-duplicate of one already packed
+        min_tail_tokens: Smallest trimmed tail worth adding at the end
+    """
+
+    def __init__(
+        self,
+        max_distance: Optional[float] = None,
+        duplicate_threshold: float = 0.8,
+        min_tail_tokens: int = 40,
+        separator: str = "\n\n"
+    ):
+        self.max_distance = max_distance
+        self.duplicate_threshold = duplicate_threshold
+        self.min_tail_tokens = min_tail_tokens
+        self.separator = separator
+
+    def pack(self, results: List[Dict], token_budget: int) -> PackedContext:
+        """
+        Args:
+            results: Search results ordered by relevance (RAGEngine.search format)
+            token_budget: Maximum tokens the packed text may use
+
+        Returns:
+            PackedContext with the excerpt and packing statistics
+        """
+        packed = PackedContext(text="", tokens=0, chunks_used=0, candidates=list(results))
+
+        relevant = []
+        for result in results:
+            distance = result.get("distance")
+            if self.max_distance is not None and distance is not None and distance > self.max_distance:
+                packed.dropped_distance += 1
+                continue
+            relevant.append(result)
+
+        # Never return nothing when the search did find something
+        if not relevant and results:
+            relevant = results[:1]
+            packed.dropped_distance -= 1
+
+        separator_tokens = estimate_tokens(self.separator)
+        seen_sentences: Set[str] = set()
+        kept_shingles: List[Set[int]] = []
+        parts: List[str] = []
+        used = 0
+
+        for result in relevant:
+            content = result.get("content") or ""
+            shingles = _shingles(content)
+            if shingles and any(
+                len(shingles & kept) / len(shingles | kept) >= self.duplicate_threshold
+                for kept in kept_shingles
+            ):
+                packed.dropped_duplicate += 1
+                continue
+
+            # Drop sentences already packed (chunk_text overlaps neighbours by design)
+            sentences = []
+            for sentence in split_sentences(content):
+                key = " ".join(_WORD.findall(sentence.lower()))
+                if key and key not in seen_sentences:
+                    sentences.append(sentence)
+            if not sentences:
+                packed.dropped_duplicate += 1
+                continue
+
+            remaining = token_budget - used - (separator_tokens if parts else 0)
+            if remaining <= 0:
+                break
+
+            chunk_text = " ".join(sentences)
+            chunk_tokens = estimate_tokens(chunk_text)
+
+            if chunk_tokens > remaining:
+                # Trim at a sentence boundary to fill what is left of the budget
+                tail = []
+                tail_tokens = 0
+                for sentence in sentences:
+                    sentence_tokens = estimate_tokens(sentence) + 1
+                    if tail_tokens + sentence_tokens > remaining:
+                        break
+                    tail.append(sentence)
+                    tail_tokens += sentence_tokens
+
+                if tail and (tail_tokens >= self.min_tail_tokens or not parts):
+                    sentences = tail
+                    chunk_text = " ".join(tail)
+                    chunk_tokens = tail_tokens
+                    packed.truncated = True
+                elif not parts:
+                    # A single sentence larger than the whole budget: hard cut
+                    chunk_text = trim_to_tokens(chunk_text, remaining)
+                    chunk_tokens = estimate_tokens(chunk_text)
+                    packed.truncated = True
+                else:
+                    packed.truncated = True
+                    break
+
+            for sentence in sentences:
+                seen_sentences.add(" ".join(_WORD.findall(sentence.lower())))
+            kept_shingles.append(shingles)
+            parts.append(chunk_text)
+            used += chunk_tokens + (separator_tokens if len(parts) > 1 else 0)
+            packed.chunks_used += 1
+
+        packed.text = self.separator.join(parts)
+        packed.tokens = estimate_tokens(packed.text) if parts else 0
+        return packed
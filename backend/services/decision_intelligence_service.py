@@ -8,24 +8,39 @@ from sqlalchemy import func, desc
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from models.database_models import Cluster, Module, Feedback, Manual
-from groq import Groq
-from core.config import settings
+from services.model_router import Task, get_model_router
+from services.llm_scheduler import Priority
+import asyncio
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_recommendations(ai_output: str) -> Optional[List[Dict]]:
+    """Recommendations list from the model's JSON answer, or None if there is none"""
+    ai_output = ai_output.strip()
+    if "{" not in ai_output or "}" not in ai_output:
+        return None
+    json_start = ai_output.index("{")
+    json_end = ai_output.rindex("}") + 1
+    try:
+        parsed = json.loads(ai_output[json_start:json_end])
+    except json.JSONDecodeError:
+        return None
+    recommendations = parsed.get("recommendations") if isinstance(parsed, dict) else None
+    return recommendations if isinstance(recommendations, list) else None
+
+
 class DecisionIntelligenceService:
     """
     AI-powered service to detect training needs and recommend interventions
     """
     
     def __init__(self):
-        self.client = Groq(api_key=settings.groq_api_key)
-        self.model = "llama-3.3-70b-versatile"
+        self.router = get_model_router()
     
-    def analyze_cluster_needs(
+    async def analyze_cluster_needs(
         self, 
         db: Session, 
         cluster_id: Optional[int] = None
@@ -33,24 +48,25 @@ class DecisionIntelligenceService:
         """
         Analyze training needs for a specific cluster or all clusters
         Returns ranked list of training priorities
+        
+        Database reads run one cluster at a time on the request's session;
+        the AI recommendation calls for all clusters run concurrently.
         """
         if cluster_id:
             clusters = db.query(Cluster).filter(Cluster.id == cluster_id).all()
         else:
             clusters = db.query(Cluster).all()
         
-        recommendations = []
-        
-        for cluster in clusters:
-            needs = self._analyze_single_cluster(db, cluster)
-            recommendations.append(needs)
+        recommendations = list(await asyncio.gather(
+            *(self._analyze_single_cluster(db, cluster) for cluster in clusters)
+        ))
         
         # Sort by priority score
         recommendations.sort(key=lambda x: x["priority_score"], reverse=True)
         
         return recommendations
     
-    def _analyze_single_cluster(self, db: Session, cluster: Cluster) -> Dict:
+    async def _analyze_single_cluster(self, db: Session, cluster: Cluster) -> Dict:
         """
         Analyze a single cluster's training needs
         """
@@ -67,7 +83,7 @@ class DecisionIntelligenceService:
         priority_score = self._calculate_priority(issues, cluster)
         
         # Generate AI recommendations
-        recommendations = self._generate_recommendations(
+        recommendations = await self._generate_recommendations(
             cluster, 
             issues, 
             feedback_data
@@ -272,7 +288,7 @@ class DecisionIntelligenceService:
         
         return found_issues[:3]  # Return top 3
     
-    def _generate_recommendations(
+    async def _generate_recommendations(
         self, 
         cluster: Cluster, 
         issues: List[Dict],
@@ -298,8 +314,8 @@ class DecisionIntelligenceService:
         try:
             prompt = self._build_recommendation_prompt(context)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self.router.complete(
+                Task.CLUSTER_RECOMMENDATIONS,
                 messages=[
                     {
                         "role": "system",
@@ -325,20 +341,16 @@ Keep recommendations practical, specific, and aligned with NEP 2020."""
                         "content": prompt
                     }
                 ],
+                validate=_parse_recommendations,
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=1000,
+                priority=Priority.BATCH
             )
             
             # Parse AI response
-            ai_output = response.choices[0].message.content.strip()
-            
-            # Try to extract JSON
-            if "{" in ai_output and "}" in ai_output:
-                json_start = ai_output.index("{")
-                json_end = ai_output.rindex("}") + 1
-                json_str = ai_output[json_start:json_end]
-                parsed = json.loads(json_str)
-                return parsed.get("recommendations", [])
+            recommendations = _parse_recommendations(response.content)
+            if recommendations is not None:
+                return recommendations
             
             # Fallback: return generic recommendations
             return self._fallback_recommendations(issues)
@@ -416,11 +428,11 @@ Focus on practical, classroom-applicable topics."""
         
         return recommendations
     
-    def get_macro_insights(self, db: Session) -> Dict:
+    async def get_macro_insights(self, db: Session) -> Dict:
         """
         Generate institution-wide or district-wide insights
         """
-        all_clusters = self.analyze_cluster_needs(db)
+        all_clusters = await self.analyze_cluster_needs(db)
         
         # Aggregate metrics
         total_clusters = len(all_clusters)
@@ -0,0 +1,163 @@
+"""
+Batch module generation jobs
+One manual topic is adapted for many clusters: the source context is retrieved
+once, then adaptations run concurrently (bounded, at batch priority under the
+shared LLM rate budget) and each cluster's result is published as it finishes.
+
+Jobs live in memory in the worker process that started them.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs are kept this long for status polling
+JOB_RETENTION_SECONDS = 3600
+
+
+@dataclass
+class GenerationJob:
+    id: str
+    manual_id: int
+    topic: str
+    cluster_ids: List[int]
+    status: str = "queued"              # queued, running, completed, failed
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    results: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        self.events.append({"event": event, "data": data})
+        # Wake current subscribers, then re-arm for the next event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def snapshot(self) -> Dict[str, Any]:
+        done = [r for r in self.results.values() if r["status"] in ("completed", "failed")]
+        return {
+            "job_id": self.id,
+            "manual_id": self.manual_id,
+            "topic": self.topic,
+            "status": self.status,
+            "total": len(self.cluster_ids),
+            "completed": sum(1 for r in done if r["status"] == "completed"),
+            "failed": sum(1 for r in done if r["status"] == "failed"),
+            "results": [self.results[cluster_id] for cluster_id in self.cluster_ids],
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class GenerationJobRegistry:
+    """
+    Runs and tracks batch generation jobs
+
+    Args:
+        concurrency: Adaptations in flight at once per job
+    """
+
+    def __init__(self, concurrency: int = 4):
+        self.concurrency = concurrency
+        self._jobs: Dict[str, GenerationJob] = {}
+
+    def start(
+        self,
+        manual_id: int,
+        topic: str,
+        cluster_ids: List[int],
+        generate: Callable[[int], Awaitable[Dict[str, Any]]]
+    ) -> GenerationJob:
+        """
+        Start a job in the background
+
+        Args:
+            manual_id: Manual being adapted
+            topic: Topic being adapted
+            cluster_ids: Clusters to generate for (duplicates ignored)
+            generate: Coroutine function producing one cluster's result dict
+                (must include module_id); exceptions mark that cluster failed
+
+        Returns:
+            The running job
+        """
+        self._expire()
+        cluster_ids = list(dict.fromkeys(cluster_ids))
+        job = GenerationJob(id=uuid.uuid4().hex, manual_id=manual_id, topic=topic, cluster_ids=cluster_ids)
+        for cluster_id in cluster_ids:
+            job.results[cluster_id] = {"cluster_id": cluster_id, "status": "queued"}
+        self._jobs[job.id] = job
+        job._task = asyncio.create_task(self._run(job, generate))
+        return job
+
+    async def _run(self, job: GenerationJob, generate: Callable[[int], Awaitable[Dict[str, Any]]]):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        job.status = "running"
+        job.publish("status", {"status": "running", "total": len(job.cluster_ids)})
+        started = time.perf_counter()
+
+        async def one(cluster_id: int):
+            async with semaphore:
+                job.results[cluster_id]["status"] = "running"
+                try:
+                    result = await generate(cluster_id)
+                    job.results[cluster_id] = {"cluster_id": cluster_id, "status": "completed", **result}
+                except Exception as e:
+                    logger.error(f"Batch job {job.id}: cluster {cluster_id} failed: {e}")
+                    job.results[cluster_id] = {"cluster_id": cluster_id, "status": "failed", "error": str(e)}
+                job.publish("result", job.results[cluster_id])
+
+        try:
+            await asyncio.gather(*(one(cluster_id) for cluster_id in job.cluster_ids))
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            raise
+        finally:
+            job.finished_at = time.time()
+            snapshot = job.snapshot()
+            job.publish("done", {k: v for k, v in snapshot.items() if k != "results"})
+            logger.info(
+                f"Batch job {job.id} finished: {snapshot['completed']}/{snapshot['total']} modules "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self._jobs.get(job_id)
+
+    async def follow(self, job: GenerationJob) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's events from the beginning, then live until it finishes"""
+        position = 0
+        while True:
+            changed = job._changed
+            while position < len(job.events):
+                event = job.events[position]
+                position += 1
+                yield event
+                if event["event"] == "done":
+                    return
+            await changed.wait()
+
+    def _expire(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+
+# Service instance
+_job_registry = None
+
+def get_generation_job_registry() -> GenerationJobRegistry:
+    """Get singleton instance of the batch generation job registry"""
+    global _job_registry
+    if _job_registry is None:
+        from core.config import settings
+        _job_registry = GenerationJobRegistry(concurrency=settings.batch_generation_concurrency)
+    return _job_registry
@@ -0,0 +1,323 @@
+"""
+Portable snapshots of the RAG vector index
+Exports chunk texts, metadata and embeddings to a single versioned,
+checksummed file so a new backend node can warm-boot without re-indexing.
+
+File layout (little-endian):
+    header      128 bytes  magic, version, flags, dim, counts, manifest size,
+                           created_at, checksum of the base snapshot
+    manifest    zlib-compressed JSON (ids, documents, metadatas, fingerprints)
+    padding     up to a 64-byte boundary
+    embeddings  float32 matrix, one row per record (memory-mappable)
+    footer      SHA-256 of everything above
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"SSVSNAP\0"
+SNAPSHOT_VERSION = 1
+FLAG_INCREMENTAL = 0x1
+
+# magic, version, flags, dim, record_count, removed_count, manifest_len, created_at, base_checksum
+_HEADER = struct.Struct("<8sHHIIIQd32s")
+HEADER_SIZE = 128
+FOOTER_SIZE = 32
+ALIGNMENT = 64
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is malformed, corrupt or out of order"""
+
+
+def _fingerprint(records: List[Dict[str, Any]]) -> str:
+    """Stable content hash of one manual's chunks"""
+    digest = hashlib.sha256()
+    for record in sorted(records, key=lambda r: r['id']):
+        digest.update(record['id'].encode('utf-8'))
+        digest.update(b"\0")
+        digest.update((record['document'] or "").encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(json.dumps(record['metadata'] or {}, sort_keys=True).encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SnapshotReader:
+    """
+    Read-only view over a snapshot file
+    The embedding matrix is memory-mapped, not copied into Python lists.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"Snapshot file is empty: {path}")
+
+        try:
+            self._parse(verify)
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self, verify: bool):
+        if len(self._map) < HEADER_SIZE + FOOTER_SIZE:
+            raise SnapshotError(f"Snapshot file is truncated: {self.path}")
+
+        (magic, version, flags, dim, count, removed_count,
+         manifest_len, created_at, base_checksum) = _HEADER.unpack_from(self._map, 0)
+
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"Not a vector index snapshot: {self.path}")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+
+        body_end = len(self._map) - FOOTER_SIZE
+        self.checksum = bytes(self._map[body_end:])
+        if verify:
+            with memoryview(self._map) as view:
+                actual = hashlib.sha256(view[:body_end]).digest()
+            if actual != self.checksum:
+                raise SnapshotError(f"Checksum mismatch, snapshot is corrupt: {self.path}")
+
+        self.version = version
+        self.incremental = bool(flags & FLAG_INCREMENTAL)
+        self.dim = dim
+        self.count = count
+        self.created_at = created_at
+        self.base_checksum = base_checksum if self.incremental else None
+
+        manifest_start = HEADER_SIZE
+        manifest_end = manifest_start + manifest_len
+        self.manifest = json.loads(zlib.decompress(self._map[manifest_start:manifest_end]))
+        if len(self.manifest['removed_manuals']) != removed_count:
+            raise SnapshotError("Manifest does not match header removal count")
+
+        embeddings_start = -(-manifest_end // ALIGNMENT) * ALIGNMENT
+        embeddings_end = embeddings_start + count * dim * 4
+        if embeddings_end != body_end:
+            raise SnapshotError("Embedding section size does not match header")
+        self._embeddings = memoryview(self._map)[embeddings_start:embeddings_end].cast('f')
+
+    @property
+    def fingerprints(self) -> Dict[str, str]:
+        """Fingerprint of every manual in the cumulative index state"""
+        return self.manifest['fingerprints']
+
+    @property
+    def changed_manuals(self) -> List[str]:
+        return self.manifest['changed_manuals']
+
+    @property
+    def removed_manuals(self) -> List[str]:
+        return self.manifest['removed_manuals']
+
+    def embedding(self, index: int) -> memoryview:
+        """Zero-copy view of one embedding row"""
+        return self._embeddings[index * self.dim:(index + 1) * self.dim]
+
+    def iter_batches(self, batch_size: int = 512):
+        """Yield (ids, documents, metadatas, embeddings) tuples for bulk loading"""
+        ids = self.manifest['ids']
+        documents = self.manifest['documents']
+        metadatas = self.manifest['metadatas']
+        for start in range(0, self.count, batch_size):
+            end = min(start + batch_size, self.count)
+            yield (
+                ids[start:end],
+                documents[start:end],
+                metadatas[start:end],
+                [self.embedding(i).tolist() for i in range(start, end)]
+            )
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "version": self.version,
+            "incremental": self.incremental,
+            "records": self.count,
+            "dimension": self.dim,
+            "manuals": len(self.fingerprints),
+            "changed_manuals": len(self.changed_manuals),
+            "removed_manuals": len(self.removed_manuals),
+            "created_at": self.created_at,
+            "checksum": self.checksum.hex(),
+            "base_checksum": self.base_checksum.hex() if self.base_checksum else None
+        }
+
+    def close(self):
+        if getattr(self, '_embeddings', None) is not None:
+            self._embeddings.release()
+            self._embeddings = None
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class IndexSnapshotService:
+    """
+    Creates and restores vector index snapshots
+    Works against any store exposing export_records/import_records/delete_collection.
+    """
+
+    def __init__(self, vector_store):
+        self.vector_store = vector_store
+
+    def _collect(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Group every stored record by manual ID"""
+        by_manual: Dict[str, List[Dict[str, Any]]] = {}
+        for batch in self.vector_store.export_records():
+            for i, record_id in enumerate(batch['ids']):
+                metadata = batch['metadatas'][i] or {}
+                manual_id = str(metadata.get('manual_id', ''))
+                by_manual.setdefault(manual_id, []).append({
+                    'id': record_id,
+                    'document': batch['documents'][i],
+                    'metadata': metadata,
+                    'embedding': batch['embeddings'][i]
+                })
+        return by_manual
+
+    def create_snapshot(self, path: str, since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write a snapshot of the current index
+
+        Args:
+            path: Output file path
+            since: Optional previous snapshot; only manuals that changed
+                   after it are written (incremental snapshot)
+
+        Returns:
+            Snapshot info (record counts, checksum, ...)
+        """
+        by_manual = self._collect()
+        fingerprints = {manual_id: _fingerprint(records) for manual_id, records in by_manual.items()}
+
+        base_checksum = b"\0" * 32
+        flags = 0
+        changed = sorted(fingerprints)
+        removed: List[str] = []
+
+        if since:
+            with SnapshotReader(since) as base:
+                previous = base.fingerprints
+                base_checksum = base.checksum
+            flags |= FLAG_INCREMENTAL
+            changed = sorted(m for m, fp in fingerprints.items() if previous.get(m) != fp)
+            removed = sorted(m for m in previous if m not in fingerprints)
+
+        records = [record for manual_id in changed for record in by_manual[manual_id]]
+        dim = len(records[0]['embedding']) if records else 0
+
+        manifest = {
+            'fingerprints': fingerprints,
+            'changed_manuals': changed,
+            'removed_manuals': removed,
+            'ids': [r['id'] for r in records],
+            'documents': [r['document'] for r in records],
+            'metadatas': [r['metadata'] for r in records]
+        }
+        manifest_bytes = zlib.compress(
+            json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 6
+        )
+
+        header = _HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, dim, len(records), len(removed),
+            len(manifest_bytes), time.time(), base_checksum
+        ).ljust(HEADER_SIZE, b"\0")
+
+        manifest_end = HEADER_SIZE + len(manifest_bytes)
+        padding = b"\0" * (-manifest_end % ALIGNMENT)
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        digest = hashlib.sha256()
+
+        with open(tmp_path, 'wb') as out:
+            for part in (header, manifest_bytes, padding):
+                out.write(part)
+                digest.update(part)
+            for record in records:
+                row = array('f', record['embedding'])
+                if len(row) != dim:
+                    raise SnapshotError(f"Embedding dimension mismatch for {record['id']}")
+                data = row.tobytes()
+                out.write(data)
+                digest.update(data)
+            out.write(digest.digest())
+        tmp_path.replace(target)
+
+        logger.info(
+            f"✓ Wrote {'incremental ' if since else ''}snapshot {target} "
+            f"({len(records)} records, {len(changed)} manuals changed, {len(removed)} removed)"
+        )
+        with SnapshotReader(str(target), verify=False) as written:
+            return written.info()
+
+    def restore_snapshot(self, paths: List[str], batch_size: int = 512) -> Dict[str, Any]:
+        """
+        Bulk-load a full snapshot followed by any incremental snapshots
+
+        Args:
+            paths: Full snapshot first, then incrementals in creation order
+            batch_size: Records per bulk insert
+
+        Returns:
+            Summary of restored records and manuals
+        """
+        if not paths:
+            raise SnapshotError("No snapshot files given")
+
+        restored = 0
+        removed = 0
+        previous_checksum = None
+
+        for index, path in enumerate(paths):
+            with SnapshotReader(path) as snapshot:
+                if index == 0 and snapshot.incremental:
+                    raise SnapshotError(f"First snapshot must be a full snapshot: {path}")
+                if index > 0:
+                    if not snapshot.incremental:
+                        raise SnapshotError(f"Expected an incremental snapshot: {path}")
+                    if snapshot.base_checksum != previous_checksum:
+                        raise SnapshotError(f"Incremental snapshot {path} was not taken from the preceding file")
+
+                    # Replace changed manuals wholesale so stale chunks do not linger
+                    for manual_id in snapshot.changed_manuals + snapshot.removed_manuals:
+                        self.vector_store.delete_collection(manual_id)
+                    removed += len(snapshot.removed_manuals)
+
+                for ids, documents, metadatas, embeddings in snapshot.iter_batches(batch_size):
+                    self.vector_store.import_records(ids, documents, metadatas, embeddings)
+                    restored += len(ids)
+
+                previous_checksum = snapshot.checksum
+
+        logger.info(f"✓ Restored {restored} records from {len(paths)} snapshot file(s)")
+        return {
+            "files": len(paths),
+            "records_restored": restored,
+            "manuals_removed": removed
+        }
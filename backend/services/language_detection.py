@@ -0,0 +1,254 @@
+"""
+Script and language detection
+Classifies letters by Unicode script with one precomputed lookup table and
+counts them in bulk (NumPy over the UTF-32 buffer when available, otherwise a
+single str.translate pass). Long documents are judged from stratified samples
+(evenly spread page windows) instead of every character, and a confidence
+score reflects both how dominant the script is and how consistently the
+samples agree. Hindi and Marathi share Devanagari, so they are told apart by
+counting whole-word indicator matches.
+
+Used for manual language detection, the script check of natively generated
+modules, OCR language selection and translation with an "auto" source.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # optional: counting falls back to str.translate
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Script blocks (letters only are counted; see _build_table)
+SCRIPT_RANGES = {
+    "latin": [(0x0041, 0x005A), (0x0061, 0x007A)],
+    "devanagari": [(0x0900, 0x097F)],
+    "bengali": [(0x0980, 0x09FF)],
+    "gurmukhi": [(0x0A00, 0x0A7F)],
+    "gujarati": [(0x0A80, 0x0AFF)],
+    "odia": [(0x0B00, 0x0B7F)],
+    "tamil": [(0x0B80, 0x0BFF)],
+    "telugu": [(0x0C00, 0x0C7F)],
+    "kannada": [(0x0C80, 0x0CFF)],
+    "malayalam": [(0x0D00, 0x0D7F)],
+    "arabic": [(0x0600, 0x06FF), (0x0750, 0x077F)],
+}
+
+LANGUAGE_SCRIPTS = {
+    "english": "latin",
+    "hindi": "devanagari",
+    "marathi": "devanagari",
+    "bengali": "bengali",
+    "punjabi": "gurmukhi",
+    "gujarati": "gujarati",
+    "odia": "odia",
+    "tamil": "tamil",
+    "telugu": "telugu",
+    "kannada": "kannada",
+    "malayalam": "malayalam",
+    "urdu": "arabic",
+}
+
+# Language assumed for each script (Devanagari is refined to Hindi or Marathi)
+SCRIPT_LANGUAGES = {
+    script: language for language, script in reversed(list(LANGUAGE_SCRIPTS.items()))
+}
+
+# Tesseract traineddata names
+OCR_LANGUAGE_CODES = {
+    "english": "eng",
+    "hindi": "hin",
+    "marathi": "mar",
+    "bengali": "ben",
+    "punjabi": "pan",
+    "gujarati": "guj",
+    "odia": "ori",
+    "tamil": "tam",
+    "telugu": "tel",
+    "kannada": "kan",
+    "malayalam": "mal",
+    "urdu": "urd",
+}
+
+# Texts longer than this are sampled
+SAMPLE_CHARS = 60000
+# Page windows taken across a long document
+SAMPLE_STRATA = 12
+# Samples need this many letters to count towards agreement
+MIN_STRATUM_LETTERS = 50
+# Fewer letters than this are not script-checked (numbers, short headings)
+MIN_LETTERS_FOR_SCRIPT_CHECK = 20
+
+MARATHI_INDICATORS = ["आहे", "आहेत", "नाही", "आणि", "हे", "ते", "या", "त्या", "केले", "झाले", "असे", "म्हणून"]
+HINDI_INDICATORS = ["है", "हैं", "नहीं", "और", "यह", "वह", "था", "थे", "किया", "हुआ", "लिए", "में"]
+
+# A Devanagari word must not continue on either side (\b treats vowel signs as
+# word boundaries, so it cannot be used for Indic words)
+_DEVANAGARI = "\u0900-\u097F\u200c\u200d"
+
+
+def _indicator_pattern(words: List[str]) -> "re.Pattern":
+    alternatives = "|".join(sorted(map(re.escape, words), key=len, reverse=True))
+    return re.compile(f"(?<![{_DEVANAGARI}])(?:{alternatives})(?![{_DEVANAGARI}])")
+
+
+_MARATHI_PATTERN = _indicator_pattern(MARATHI_INDICATORS)
+_HINDI_PATTERN = _indicator_pattern(HINDI_INDICATORS)
+_PAGE_MARKER = re.compile(r"--- Page \d+ ---")
+
+SCRIPTS = list(SCRIPT_RANGES)
+_OTHER = len(SCRIPTS)
+# Code points at or above this are not in any script block above
+_TABLE_SIZE = 0x0E00
+
+
+def _build_table() -> bytes:
+    """Script index for every code point below _TABLE_SIZE (_OTHER for non-letters)"""
+    table = bytearray([_OTHER]) * (_TABLE_SIZE + 1)
+    for index, script in enumerate(SCRIPTS):
+        for start, end in SCRIPT_RANGES[script]:
+            for code_point in range(start, end + 1):
+                if chr(code_point).isalpha():
+                    table[code_point] = index
+    return bytes(table)
+
+
+_SCRIPT_TABLE = _build_table()
+# Same table for str.translate: every code point maps to a control character
+# naming its class; code points past the table pass through and are not counted
+_CLASS_CHARS = [chr(index) for index in range(len(SCRIPTS))]
+_TRANSLATE_TABLE = {code_point: chr(index) for code_point, index in enumerate(_SCRIPT_TABLE[:_TABLE_SIZE])}
+_NUMPY_TABLE = np.frombuffer(_SCRIPT_TABLE, dtype=np.uint8) if np is not None else None
+
+
+def script_counts(text: str) -> Dict[str, int]:
+    """Number of letters in each script"""
+    if not text:
+        return {script: 0 for script in SCRIPTS}
+    if _NUMPY_TABLE is not None:
+        code_points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        classes = _NUMPY_TABLE[np.minimum(code_points, _TABLE_SIZE)]
+        counts = np.bincount(classes, minlength=_OTHER + 1)
+        return {script: int(counts[index]) for index, script in enumerate(SCRIPTS)}
+    classified = text.translate(_TRANSLATE_TABLE)
+    return {script: classified.count(char) for script, char in zip(SCRIPTS, _CLASS_CHARS)}
+
+
+def script_share(text: str, language: str, min_letters: int = MIN_LETTERS_FOR_SCRIPT_CHECK) -> Optional[float]:
+    """Share of letters written in the language's script (None if too few letters to judge)"""
+    script = LANGUAGE_SCRIPTS.get(language)
+    if script is None:
+        return None
+    counts = script_counts(text)
+    letters = sum(counts.values())
+    if letters < min_letters:
+        return None
+    return counts[script] / letters
+
+
+def sample_text(text: str, page_starts: Optional[Sequence[int]] = None, max_chars: int = SAMPLE_CHARS) -> List[str]:
+    """
+    Stratified sample of a long text: windows from pages spread evenly across it
+
+    Args:
+        text: Full document text
+        page_starts: Character offset of each page (defaults to OCR page
+            markers, or equal slices when there are none)
+        max_chars: Total characters to sample
+
+    Returns:
+        The text itself when it is short, otherwise up to SAMPLE_STRATA windows
+    """
+    if len(text) <= max_chars:
+        return [text]
+    starts = list(page_starts or [])
+    if len(starts) < 2:
+        starts = [match.start() for match in _PAGE_MARKER.finditer(text)]
+    if len(starts) < 2:
+        step = len(text) // SAMPLE_STRATA
+        starts = [i * step for i in range(SAMPLE_STRATA)]
+
+    bounds = list(zip(starts, starts[1:] + [len(text)]))
+    if len(bounds) > SAMPLE_STRATA:
+        # Evenly spaced pages, first and last included
+        picks = [round(i * (len(bounds) - 1) / (SAMPLE_STRATA - 1)) for i in range(SAMPLE_STRATA)]
+        bounds = [bounds[i] for i in dict.fromkeys(picks)]
+    window = max_chars // len(bounds)
+    samples = []
+    for start, end in bounds:
+        # The middle of a page skips running headers and page numbers
+        middle = (start + end) // 2
+        left = max(start, middle - window // 2)
+        samples.append(text[left:min(end, left + window)])
+    return samples
+
+
+@dataclass
+class LanguageGuess:
+    language: str
+    script: str
+    # 0-1: dominant script's share of letters times the share of samples agreeing
+    confidence: float
+    script_shares: Dict[str, float] = field(default_factory=dict)
+    letters: int = 0
+    samples: int = 1
+
+
+def detect_language(text: str, page_starts: Optional[Sequence[int]] = None) -> LanguageGuess:
+    """
+    Detect the primary language of a document
+
+    Args:
+        text: Document text
+        page_starts: Optional page offsets for stratified sampling
+
+    Returns:
+        LanguageGuess (English with zero confidence when there are no letters)
+    """
+    samples = sample_text(text or "", page_starts)
+    per_sample = [script_counts(sample) for sample in samples]
+    totals = {script: sum(counts[script] for counts in per_sample) for script in SCRIPTS}
+    letters = sum(totals.values())
+    if letters == 0:
+        return LanguageGuess("english", "latin", 0.0, samples=len(samples))
+
+    script = max(SCRIPTS, key=lambda name: totals[name])
+    share = totals[script] / letters
+    judged = [counts for counts in per_sample if sum(counts.values()) >= MIN_STRATUM_LETTERS]
+    agreeing = sum(1 for counts in judged if max(SCRIPTS, key=lambda name: counts[name]) == script)
+    agreement = agreeing / len(judged) if judged else 1.0
+
+    language = SCRIPT_LANGUAGES[script]
+    if script == "devanagari":
+        sampled = "\n".join(samples)
+        marathi = len(_MARATHI_PATTERN.findall(sampled))
+        hindi = len(_HINDI_PATTERN.findall(sampled))
+        language = "marathi" if marathi > hindi else "hindi"
+
+    return LanguageGuess(
+        language=language,
+        script=script,
+        confidence=round(share * agreement, 3),
+        script_shares={name: round(count / letters, 3) for name, count in totals.items() if count},
+        letters=letters,
+        samples=len(samples),
+    )
+
+
+def ocr_languages(guess: Optional[LanguageGuess] = None, available: Optional[Sequence[str]] = None) -> str:
+    """
+    Tesseract language string for a detected language ("eng+mar")
+
+    English is always included for mixed-script manuals. Without a guess the
+    default is English and Hindi; languages whose traineddata is not in
+    available are left out.
+    """
+    codes = ["eng", OCR_LANGUAGE_CODES.get(guess.language if guess else "hindi", "hin")]
+    if available is not None:
+        codes = [code for code in codes if code in available] or ["eng"]
+    return "+".join(dict.fromkeys(codes))
@@ -0,0 +1,328 @@
+"""
+Lexical (BM25) inverted index for hybrid retrieval
+The default MiniLM embedding is English-centric, so exact Hindi/Marathi terms are
+often missed by vector search alone. This index is built at indexing time next
+to the vector store and its results are fused with vector results in RAGEngine.
+
+Posting lists are kept as typed arrays in memory and stored on disk as
+delta + varint encoded, zlib-compressed blocks.
+"""
+
+import json
+import math
+import re
+import struct
+import threading
+import unicodedata
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from services.text_normalizer import normalize_indic_text
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b"SSBM25\0"
+INDEX_VERSION = 1
+
+# Latin words, or runs of Indic script letters/marks (Devanagari .. Malayalam,
+# excluding the danda punctuation), or Arabic-script runs for Urdu
+_TOKEN_PATTERN = re.compile(
+    r"[0-9a-z\u00C0-\u024F]+"
+    r"|[\u0900-\u0963\u0966-\u0D7F\u200D]+"
+    r"|[\u0600-\u06FF\u0750-\u077F]+"
+)
+
+_TOKEN_PATTERN_ANYCASE = re.compile(_TOKEN_PATTERN.pattern, re.IGNORECASE)
+
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+का के की को में से पर है हैं और या यह वह था थे भी तो ही एक
+आहे आहेत आणि या ते हे व ला ने चा ची चे मध्ये तर
+""".split())
+
+# Common Hindi/Marathi inflectional suffixes, longest first, so that
+# "शिक्षकों" and "शिक्षक" match the same posting list
+INDIC_SUFFIXES = sorted([
+    "ियों", "ियाँ", "ाओं", "ाएँ", "ाएं", "ों", "ें", "ीं", "ाँ", "ां",
+    "ाला", "ाची", "ाचे", "ाचा", "ांना", "ाने", "ात", "ास",
+], key=len, reverse=True)
+
+
+def _stem(token: str) -> str:
+    if not token or token[0] < "\u0900":
+        return token
+    for suffix in INDIC_SUFFIXES:
+        if len(token) > len(suffix) + 1 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized search terms
+    NFC-normalizes, removes zero-width characters, lowercases Latin text, keeps
+    Indic vowel signs/viramas inside words and drops stopwords.
+    """
+    if not text:
+        return []
+    text = normalize_indic_text(text).lower()
+    return [
+        _stem(token)
+        for token in _TOKEN_PATTERN.findall(text)
+        if token not in STOPWORDS and token != "\u200D"
+    ]
+
+
+def match_spans(text: str, query: str) -> List[Tuple[int, int]]:
+    """
+    Find where the query's search terms occur in the original text
+    Spans are character offsets into text (not the normalized form), so
+    callers can highlight the exact words that matched, inflections included.
+    """
+    terms = set(tokenize(query))
+    if not terms or not text:
+        return []
+    spans = []
+    for match in _TOKEN_PATTERN_ANYCASE.finditer(text):
+        word = unicodedata.normalize('NFC', match.group()).lower()
+        if _stem(word) in terms:
+            spans.append(match.span())
+    return spans
+
+
+def _encode_varints(values: Iterable[int], out: bytearray):
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def _decode_varints(data: bytes, start: int, count: int) -> Tuple[List[int], int]:
+    values = []
+    pos = start
+    for _ in range(count):
+        value = 0
+        shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(value)
+    return values, pos
+
+
+class LexicalIndex:
+    """
+    In-process BM25 index over manual chunks
+
+    Documents are keyed by the same IDs as the vector store so results from
+    both can be fused.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._doc_keys: List[Optional[str]] = []
+        self._doc_manuals: List[str] = []
+        self._doc_lengths = array('I')
+        self._key_to_doc: Dict[str, int] = {}
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._total_length = 0
+        self._live_docs = 0
+
+    def __len__(self) -> int:
+        return self._live_docs
+
+    def add_documents(self, ids: List[str], texts: List[str], manual_ids: List[str]):
+        """Add (or replace) documents in the index"""
+        with self._lock:
+            replaced = [doc_id for doc_id in ids if doc_id in self._key_to_doc]
+            if replaced:
+                self._remove_keys(set(replaced))
+
+            for key, text, manual_id in zip(ids, texts, manual_ids):
+                terms = Counter(tokenize(text))
+                doc = len(self._doc_keys)
+                length = sum(terms.values())
+
+                self._doc_keys.append(key)
+                self._doc_manuals.append(str(manual_id))
+                self._doc_lengths.append(length)
+                self._key_to_doc[key] = doc
+                self._total_length += length
+                self._live_docs += 1
+
+                for term, tf in terms.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = (array('I'), array('H'))
+                        self._postings[term] = postings
+                    postings[0].append(doc)
+                    postings[1].append(min(tf, 0xFFFF))
+
+    def remove_manual(self, manual_id: str):
+        """Remove every document belonging to a manual"""
+        with self._lock:
+            keys = {
+                key for doc, key in enumerate(self._doc_keys)
+                if key is not None and self._doc_manuals[doc] == str(manual_id)
+            }
+            if keys:
+                self._remove_keys(keys)
+
+    def _remove_keys(self, keys: set):
+        removed = set()
+        for key in keys:
+            doc = self._key_to_doc.pop(key)
+            self._doc_keys[doc] = None
+            self._total_length -= self._doc_lengths[doc]
+            self._live_docs -= 1
+            removed.add(doc)
+
+        for term in list(self._postings):
+            docs, tfs = self._postings[term]
+            keep = [i for i, doc in enumerate(docs) if doc not in removed]
+            if len(keep) == len(docs):
+                continue
+            if not keep:
+                del self._postings[term]
+            else:
+                self._postings[term] = (array('I', (docs[i] for i in keep)), array('H', (tfs[i] for i in keep)))
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        manual_ids: Optional[List[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank documents by BM25 score
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            manual_ids: Optional manual IDs to restrict the search to
+
+        Returns:
+            List of (document ID, score), best first
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        allowed = {str(m) for m in manual_ids} if manual_ids else None
+
+        with self._lock:
+            if not self._live_docs:
+                return []
+            avg_length = self._total_length / self._live_docs
+            scores: Dict[int, float] = {}
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                docs, tfs = postings
+                df = len(docs)
+                idf = math.log(1 + (self._live_docs - df + 0.5) / (df + 0.5))
+
+                for doc, tf in zip(docs, tfs):
+                    if allowed is not None and self._doc_manuals[doc] not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc] / avg_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            return [(self._doc_keys[doc], score) for doc, score in ranked]
+
+    def save(self, path: str):
+        """Write the index to disk atomically"""
+        with self._lock:
+            # Compact internal doc numbers so deleted slots are not persisted
+            live = [doc for doc, key in enumerate(self._doc_keys) if key is not None]
+            renumber = {doc: new for new, doc in enumerate(live)}
+
+            terms = []
+            blob = bytearray()
+            for term, (docs, tfs) in self._postings.items():
+                new_docs = [renumber[doc] for doc in docs]
+                offset = len(blob)
+                previous = 0
+                deltas = []
+                for doc in new_docs:
+                    deltas.append(doc - previous)
+                    previous = doc
+                _encode_varints(deltas, blob)
+                _encode_varints(tfs, blob)
+                terms.append([term, offset, len(new_docs)])
+
+            header = json.dumps({
+                "k1": self.k1,
+                "b": self.b,
+                "docs": [[self._doc_keys[doc], self._doc_manuals[doc], self._doc_lengths[doc]] for doc in live],
+                "terms": terms
+            }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        payload = zlib.compress(struct.pack("<I", len(header)) + header + bytes(blob), 6)
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        with open(tmp_path, 'wb') as out:
+            out.write(INDEX_MAGIC)
+            out.write(struct.pack("<H", INDEX_VERSION))
+            out.write(payload)
+        tmp_path.replace(target)
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        """Read an index written by save()"""
+        data = Path(path).read_bytes()
+        if not data.startswith(INDEX_MAGIC):
+            raise ValueError(f"Not a lexical index file: {path}")
+        (version,) = struct.unpack_from("<H", data, len(INDEX_MAGIC))
+        if version != INDEX_VERSION:
+            raise ValueError(f"Unsupported lexical index version {version}")
+
+        payload = zlib.decompress(data[len(INDEX_MAGIC) + 2:])
+        (header_len,) = struct.unpack_from("<I", payload, 0)
+        header = json.loads(payload[4:4 + header_len])
+        blob = payload[4 + header_len:]
+
+        index = cls(k1=header["k1"], b=header["b"])
+        for doc, (key, manual_id, length) in enumerate(header["docs"]):
+            index._doc_keys.append(key)
+            index._doc_manuals.append(manual_id)
+            index._doc_lengths.append(length)
+            index._key_to_doc[key] = doc
+            index._total_length += length
+        index._live_docs = len(header["docs"])
+
+        for term, offset, count in header["terms"]:
+            deltas, pos = _decode_varints(blob, offset, count)
+            tfs, _ = _decode_varints(blob, pos, count)
+            docs = array('I')
+            previous = 0
+            for delta in deltas:
+                previous += delta
+                docs.append(previous)
+            index._postings[term] = (docs, array('H', tfs))
+
+        return index
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "documents": self._live_docs,
+                "terms": len(self._postings),
+                "postings": sum(len(docs) for docs, _ in self._postings.values())
+            }
@@ -0,0 +1,206 @@
+"""
+Content-addressed LLM response cache
+Completions are stored in a local SQLite file keyed by a hash of everything
+that determines the output (model, messages, temperature, max_tokens and any
+extra options), so re-indexing an unchanged manual or re-running analysis on
+unchanged data costs no tokens. Shared by all worker processes on a host.
+
+Lookups only read: access times and hit/miss counters are buffered in memory
+and written with the periodic eviction pass (or by flush()), so a cache read
+never becomes a write transaction on the shared WAL file.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Run a full size check every N writes rather than on every insert
+EVICTION_CHECK_INTERVAL = 20
+
+
+def cache_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int, **options: Any) -> str:
+    """Hash of every parameter that affects the completion"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": round(float(temperature), 4),
+            "max_tokens": max_tokens,
+            "options": options,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed completion cache with TTL and LRU size eviction
+
+    Args:
+        path: SQLite file path
+        ttl_seconds: How long an entry stays valid
+        max_bytes: Total size of cached responses before least recently
+            used entries are evicted
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Buffered until the next flush: key -> (last access, hits), counter -> amount
+        self._pending_access: Dict[str, Tuple[float, int]] = {}
+        self._pending_counters: Dict[str, int] = {}
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_last_access ON llm_responses(last_access);
+            CREATE TABLE IF NOT EXISTS llm_cache_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response dict, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, total_tokens, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            # Expired rows are left for the eviction pass to delete
+            if row is None or row[2] <= now:
+                self._count("misses", 1)
+                return None
+
+            _, hits = self._pending_access.get(key, (now, 0))
+            self._pending_access[key] = (now, hits + 1)
+            self._count("hits", 1)
+            self._count("tokens_saved", row[1])
+
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, response: Dict[str, Any], total_tokens: int = 0):
+        """Store a response"""
+        body = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO llm_responses
+                   (key, model, response, total_tokens, size, created_at, expires_at, last_access, hits)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)""",
+                (key, model, body, total_tokens, len(body.encode('utf-8')), now, now + self.ttl_seconds, now)
+            )
+            self._writes += 1
+            if self._writes % EVICTION_CHECK_INTERVAL == 1:
+                # Fresh access times first, so LRU eviction sees recent hits
+                self._flush()
+                self._evict(now)
+            self._conn.commit()
+
+    def flush(self):
+        """Write buffered access times and counters (stats reads and shutdown)"""
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+
+    def _flush(self):
+        """Caller holds the lock and commits"""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE llm_responses SET last_access = MAX(last_access, ?), hits = hits + ? WHERE key = ?",
+                [(last_access, hits, key) for key, (last_access, hits) in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+        for name, amount in self._pending_counters.items():
+            self._bump(name, amount)
+        self._pending_counters.clear()
+
+    def _count(self, name: str, amount: int):
+        self._pending_counters[name] = self._pending_counters.get(name, 0) + amount
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes (caller holds the lock)"""
+        expired = self._conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,)).rowcount
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+        if total <= self.max_bytes:
+            if expired:
+                self._bump("evictions", expired)
+            return
+
+        # Evict down to 90% so the next few writes do not trigger another pass
+        target = int(self.max_bytes * 0.9)
+        evicted = expired
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_responses ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._bump("evictions", evicted)
+        logger.info(f"LLM cache evicted {evicted} entries ({total} bytes kept)")
+
+    def _bump(self, name: str, amount: int):
+        self._conn.execute(
+            "INSERT INTO llm_cache_counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._pending_access.clear()
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate and tokens saved across all processes sharing the file"""
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+            counters = dict(self._conn.execute("SELECT name, value FROM llm_cache_counters").fetchall())
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "tokens_saved": counters.get("tokens_saved", 0),
+            "evictions": counters.get("evictions", 0),
+        }
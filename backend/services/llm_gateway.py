@@ -0,0 +1,444 @@
+"""
+Async LLM gateway
+Every Groq chat completion goes through one pooled async client (built on
+the shared transport in core.http_transport), so a slow generation awaits on
+the network instead of blocking the uvicorn event loop and concurrent
+requests overlap. Responses are served from the shared
+LLMResponseCache when an identical request was answered before, and calls
+that do reach Groq are admitted by the LLMScheduler's rate budgets.
+While Groq keeps failing, the "groq" circuit breaker fails calls fast with
+CircuitOpen instead of letting each one wait out the timeout.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+import logging
+
+import httpx
+from groq import AsyncGroq
+
+from core.config import settings
+from core.http_transport import RetryPolicy, get_http_transport
+from core.resilience import CircuitBreaker, get_circuit_breaker
+from services.llm_cache import LLMResponseCache, cache_key
+from services.llm_scheduler import LLMScheduler, Priority, SchedulerBusy
+from services.prompt_budget import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# Completions are resent only when Groq never handled them: connection
+# failures and 502-504 answers. A read timeout is not resent (it could bill
+# the generation twice and triple the wait); it goes to the circuit breaker.
+GROQ_RETRY = RetryPolicy(
+    max_retries=2,
+    retry_statuses=frozenset({502, 503, 504}),
+    status_retry_methods=frozenset({"POST"})
+)
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """Raised when the HTTP client went away before the LLM call finished"""
+
+
+@dataclass
+class LLMResult:
+    """Text and usage of one chat completion"""
+    content: str
+    model: str
+    total_tokens: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    finish_reason: Optional[str] = None
+    cached: bool = False
+
+
+class LLMGateway:
+    """
+    Shared async client for Groq chat completions
+
+    Args:
+        api_key: Groq API key
+        timeout: Default per-call timeout in seconds
+        max_connections: Connection pool size shared by all callers
+        cache: Optional response cache
+        scheduler: Optional rate-limit scheduler
+        breaker: Optional circuit breaker for Groq
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 60.0,
+        max_connections: int = 20,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.cache = cache
+        self.scheduler = scheduler
+        self.breaker = breaker
+        self._client: Optional[AsyncGroq] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> AsyncGroq:
+        # httpx pools are bound to the event loop that created them; scripts that
+        # call asyncio.run() repeatedly get a fresh pool per loop
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            http_client = get_http_transport().async_client(
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                retry=GROQ_RETRY,
+                max_connections=self.max_connections
+            )
+            # Retries happen in the transport; 429s are left to the scheduler
+            self._client = AsyncGroq(api_key=self.api_key, http_client=http_client, max_retries=0)
+            self._client_loop = loop
+        return self._client
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None,
+        cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = None,
+        call_site: Optional[str] = None,
+        **options: Any
+    ) -> LLMResult:
+        """
+        Run one chat completion
+
+        Args:
+            messages: Chat messages (system/user)
+            model: Model name (defaults to the generation model)
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            timeout: Per-call timeout in seconds (defaults to the gateway timeout)
+            cache: Set False for calls that should always produce a fresh answer
+            priority: Scheduling priority when the rate budget is short
+            max_wait: Raise SchedulerBusy instead of queueing longer than this
+            call_site: What is calling (e.g. the router task), for token logs
+            **options: Extra completion parameters (top_p, response_format, ...)
+
+        Returns:
+            LLMResult with the generated text and token usage
+
+        Raises:
+            SchedulerBusy: If max_wait is given and the queue is longer
+            CircuitOpen: If Groq's breaker is open
+        """
+        model = model or DEFAULT_MODEL
+
+        key = None
+        if cache and self.cache is not None:
+            key = cache_key(model, messages, temperature, max_tokens, **options)
+            hit = await asyncio.to_thread(self.cache.get, key)
+            if hit is not None:
+                hit["cached"] = True
+                return LLMResult(**hit)
+
+        predicted_prompt = get_token_counter().count_messages(messages)
+        estimated = predicted_prompt + max_tokens
+
+        # One retry covers a provider 429 caused by quota used outside this process
+        for attempt in range(2):
+            self._admit()
+            reservation = None
+            try:
+                if self.scheduler is not None:
+                    reservation = await self.scheduler.acquire(estimated, priority, max_wait)
+                response = await self._get_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=False,
+                    timeout=timeout or self.timeout,
+                    **options
+                )
+                self._outcome(None)
+                break
+            except BaseException as e:
+                self._outcome(e)
+                self._refund(reservation, e)
+                if self.scheduler is None or getattr(e, "status_code", None) != 429 or attempt == 1:
+                    raise
+                self.scheduler.drain(_retry_after(e))
+
+        usage = response.usage
+        choice = response.choices[0]
+        result = LLMResult(
+            content=choice.message.content or "",
+            model=model,
+            total_tokens=usage.total_tokens if usage else 0,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            finish_reason=choice.finish_reason
+        )
+        if reservation is not None:
+            self.scheduler.settle(reservation, result.total_tokens)
+        get_token_counter().record_usage(
+            call_site or "llm", predicted_prompt, result.prompt_tokens, result.total_tokens, model=model
+        )
+
+        # Truncated answers are not worth replaying
+        if key is not None and result.content and result.finish_reason != "length":
+            try:
+                await asyncio.to_thread(self.cache.put, key, model, asdict(result), result.total_tokens)
+            except Exception as e:
+                logger.warning(f"Could not cache LLM response: {e}")
+        return result
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = None,
+        call_site: Optional[str] = None,
+        **options: Any
+    ) -> "LLMStream":
+        """
+        Start a streamed chat completion (never cached)
+
+        Returns:
+            LLMStream; iterate it for text deltas, then read .result
+        """
+        model = model or DEFAULT_MODEL
+        predicted_prompt = get_token_counter().count_messages(messages)
+        estimated = predicted_prompt + max_tokens
+
+        self._admit()
+        reservation = None
+        try:
+            if self.scheduler is not None:
+                reservation = await self.scheduler.acquire(estimated, priority, max_wait)
+            response = await self._get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                timeout=timeout or self.timeout,
+                **options
+            )
+        except BaseException as e:
+            self._outcome(e)
+            self._refund(reservation, e)
+            if self.scheduler is not None and getattr(e, "status_code", None) == 429:
+                self.scheduler.drain(_retry_after(e))
+            raise
+        # The breaker hears how the call went once the body has been read
+        return LLMStream(
+            response, model, self.scheduler, reservation, predicted_prompt, call_site or "llm", self._outcome
+        )
+
+    def _refund(self, reservation, error: BaseException):
+        """
+        Return a failed call's reserved tokens to the budget
+
+        A timed-out call may still have been processed (and billed) by Groq,
+        so its estimate stays charged.
+        """
+        if reservation is None or _is_timeout(error):
+            return
+        self.scheduler.release(reservation)
+
+    def _admit(self):
+        """Fail fast with CircuitOpen while Groq's breaker is open"""
+        if self.breaker is not None:
+            self.breaker.allow()
+
+    def _outcome(self, error: Optional[BaseException]):
+        """
+        Report a Groq call to the breaker
+
+        Timeouts, connection errors and 5xx answers are provider failures;
+        throttling, bad requests, a full scheduler queue and cancellation
+        say nothing about Groq's health.
+        """
+        if self.breaker is None:
+            return
+        if error is None:
+            self.breaker.record_success()
+            return
+        status = getattr(error, "status_code", None)
+        if isinstance(error, Exception) and not isinstance(error, SchedulerBusy) and (status is None or status >= 500):
+            self.breaker.record_failure(error)
+        else:
+            self.breaker.release()
+
+    def estimate_wait(self, tokens: int, priority: Priority = Priority.INTERACTIVE) -> Tuple[int, float]:
+        """Queue position and seconds a call of this size would wait now"""
+        if self.scheduler is None:
+            return 1, 0.0
+        return self.scheduler.estimate_wait(tokens, priority)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "scheduler": self.scheduler.get_stats() if self.scheduler is not None else None,
+            "breaker": self.breaker.get_stats() if self.breaker is not None else None,
+            "tokens": get_token_counter().get_stats()
+        }
+
+    async def aclose(self):
+        """Close the pooled connections and flush cache counters (application shutdown)"""
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.flush)
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._client_loop = None
+
+
+class LLMStream:
+    """
+    Text deltas of a streamed completion; .result is complete once iteration ends
+
+    outcome is called once iteration ends with the error that ended it (None
+    when the body was read to the end), so a connection dropped mid-stream
+    counts against the provider and a consumer that stops early does not.
+    """
+
+    def __init__(
+        self,
+        response,
+        model: str,
+        scheduler: Optional[LLMScheduler],
+        reservation,
+        predicted_prompt: int = 0,
+        call_site: str = "llm",
+        outcome: Optional[Callable[[Optional[BaseException]], None]] = None
+    ):
+        self._response = response
+        self._outcome = outcome
+        self._predicted_prompt = predicted_prompt
+        self._call_site = call_site
+        self._scheduler = scheduler
+        self._reservation = reservation
+        self.result = LLMResult(content="", model=model)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        parts = []
+        error = None
+        try:
+            async for chunk in self._response:
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if choice.delta and choice.delta.content:
+                        parts.append(choice.delta.content)
+                        yield choice.delta.content
+                    if choice.finish_reason:
+                        self.result.finish_reason = choice.finish_reason
+                # Groq reports usage on the final chunk
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage:
+                    self.result.total_tokens = usage.total_tokens
+                    self.result.prompt_tokens = usage.prompt_tokens
+                    self.result.completion_tokens = usage.completion_tokens
+        except BaseException as e:
+            # GeneratorExit and CancelledError (consumer stopped) release the breaker
+            error = e
+            raise
+        finally:
+            if self._outcome is not None:
+                self._outcome(error)
+            self.result.content = "".join(parts)
+            if self._reservation is not None:
+                self._scheduler.settle(self._reservation, self.result.total_tokens)
+            get_token_counter().record_usage(
+                self._call_site, self._predicted_prompt, self.result.prompt_tokens, self.result.total_tokens,
+                model=self.result.model
+            )
+            close = getattr(self._response, "close", None)
+            if close is not None:
+                await close()
+
+
+def _is_timeout(error: BaseException) -> bool:
+    # groq.APITimeoutError wraps httpx timeouts
+    return isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)) or type(error).__name__ == "APITimeoutError"
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds from a provider 429's Retry-After header (default 10)"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 10))
+    except (AttributeError, TypeError, ValueError):
+        return 10.0
+
+
+async def cancel_on_disconnect(request, awaitable: Awaitable[T], poll_interval: float = 0.5) -> T:
+    """
+    Await an LLM-bound operation, cancelling it if the HTTP client disconnects
+    Cancelling closes the upstream connection, so Groq stops generating for a
+    browser tab that has already gone away.
+
+    Args:
+        request: Starlette/FastAPI Request of the calling route
+        awaitable: The operation to run
+        poll_interval: Seconds between disconnect checks
+
+    Raises:
+        ClientDisconnected: If the client disconnected first
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                logger.info("Client disconnected, cancelled LLM request")
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+# Service instance
+_llm_gateway = None
+
+def get_llm_gateway() -> LLMGateway:
+    """Get singleton instance of the LLM gateway (one connection pool per process)"""
+    global _llm_gateway
+    if _llm_gateway is None:
+        cache = None
+        if settings.llm_cache_enabled:
+            try:
+                cache = LLMResponseCache(
+                    settings.llm_cache_path,
+                    ttl_seconds=settings.llm_cache_ttl_hours * 3600,
+                    max_bytes=settings.llm_cache_max_mb * 1024 * 1024
+                )
+            except Exception as e:
+                logger.error(f"LLM response cache unavailable: {e}")
+        _llm_gateway = LLMGateway(
+            api_key=settings.groq_api_key,
+            timeout=settings.groq_timeout_seconds,
+            max_connections=settings.groq_max_connections,
+            cache=cache,
+            scheduler=LLMScheduler(
+                requests_per_minute=settings.groq_requests_per_minute,
+                tokens_per_minute=settings.groq_tokens_per_minute
+            ),
+            breaker=get_circuit_breaker("groq")
+        )
+    return _llm_gateway
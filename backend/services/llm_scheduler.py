@@ -0,0 +1,247 @@
+"""
+Rate-limit aware scheduler for LLM calls
+Token buckets enforce the Groq requests-per-minute and tokens-per-minute
+budgets before a call is made, and a priority queue decides who goes next when
+the budget is short: interactive module generation is served ahead of
+background manual processing, which is served ahead of batch analysis.
+
+Limits are per process; with several workers set them to each worker's share.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0   # A teacher is waiting on the response
+    BACKGROUND = 1    # User-triggered processing (manual indexing)
+    BATCH = 2         # Bulk analysis and generation jobs
+
+
+class SchedulerBusy(Exception):
+    """Raised when a call would wait longer than the caller allows"""
+
+    def __init__(self, queue_position: int, estimated_wait: float):
+        self.queue_position = queue_position
+        self.estimated_wait = estimated_wait
+        super().__init__(
+            f"LLM capacity exhausted: position {queue_position} in queue, "
+            f"estimated wait {estimated_wait:.0f}s"
+        )
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until amount is available (0 if it is now)"""
+        self._refill()
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def adjust(self, amount: float):
+        """Give back (positive) or charge (negative) tokens after the fact"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def empty(self, penalty_seconds: float = 0.0):
+        """Drop to zero, or below it so refilling takes penalty_seconds longer"""
+        self._refill()
+        self.level = -penalty_seconds * self.rate
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+
+@dataclass
+class Reservation:
+    """Budget taken for one call; settle() it with the real usage"""
+    tokens: int
+    priority: Priority
+    queued_seconds: float
+
+
+class LLMScheduler:
+    """
+    Admits LLM calls in priority order within RPM/TPM budgets
+
+    Args:
+        requests_per_minute: Request budget
+        tokens_per_minute: Token budget (prompt + completion)
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self._queue: List[list] = []
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {
+            "admitted": 0, "rejected": 0, "queued_seconds": 0.0, "estimate_error_tokens": 0, "released_tokens": 0
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._queue = []
+        return self._condition
+
+    def _delay_for(self, tokens: int) -> float:
+        return max(self._requests.time_until(1), self._tokens.time_until(tokens))
+
+    def estimate_wait(self, tokens: int, priority: Priority) -> Tuple[int, float]:
+        """
+        Estimate where a new call would queue and how long it would wait
+
+        Returns:
+            (queue position, 1-based; estimated wait in seconds)
+        """
+        ahead = [entry for entry in self._queue if entry[0] <= priority]
+        tokens_ahead = sum(entry[2] for entry in ahead) + tokens
+        wait = max(
+            (len(ahead) + 1 - self._requests.available()) / self._requests.rate,
+            (tokens_ahead - self._tokens.available()) / self._tokens.rate,
+            0.0
+        )
+        return len(ahead) + 1, wait
+
+    async def acquire(
+        self,
+        tokens: int,
+        priority: Priority = Priority.INTERACTIVE,
+        max_wait: Optional[float] = None
+    ) -> Reservation:
+        """
+        Wait for budget to make a call
+
+        Args:
+            tokens: Estimated prompt + completion tokens
+            priority: Queue priority
+            max_wait: Fail fast with SchedulerBusy if the estimated wait is longer
+
+        Returns:
+            Reservation to settle with the actual token usage
+        """
+        # A single call larger than the bucket would never be admitted
+        tokens = int(min(tokens, self._tokens.capacity))
+        priority = Priority(priority)
+        condition = self._get_condition()
+        started = time.monotonic()
+
+        async with condition:
+            position, wait = self.estimate_wait(tokens, priority)
+            if max_wait is not None and wait > max_wait:
+                self.stats["rejected"] += 1
+                raise SchedulerBusy(position, wait)
+
+            entry = [int(priority), next(self._sequence), tokens]
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    delay = None
+                    if self._queue[0] is entry:
+                        delay = self._delay_for(tokens)
+                        if delay <= 0:
+                            heapq.heappop(self._queue)
+                            self._requests.take(1)
+                            self._tokens.take(tokens)
+                            condition.notify_all()
+                            break
+                    try:
+                        await asyncio.wait_for(condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                # Cancelled while queued: leave the queue and let the next caller in
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    condition.notify_all()
+                raise
+
+        queued = time.monotonic() - started
+        self.stats["admitted"] += 1
+        self.stats["queued_seconds"] += queued
+        if queued > 1:
+            logger.info(f"LLM call ({priority.name}, ~{tokens} tokens) waited {queued:.1f}s for rate budget")
+        return Reservation(tokens=tokens, priority=priority, queued_seconds=queued)
+
+    def settle(self, reservation: Reservation, actual_tokens: int):
+        """Correct the token budget once the real usage is known"""
+        if actual_tokens <= 0:
+            return
+        difference = reservation.tokens - actual_tokens
+        self._tokens.adjust(difference)
+        self.stats["estimate_error_tokens"] += abs(difference)
+
+    def release(self, reservation: Reservation):
+        """
+        Give back a reservation whose call failed without using its tokens
+        (rejected, throttled or cancelled), so it does not hold the budget
+        for a minute; waiting callers are woken to use it
+        """
+        if reservation.tokens <= 0:
+            return
+        self._tokens.adjust(reservation.tokens)
+        self.stats["released_tokens"] += reservation.tokens
+        reservation.tokens = 0
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._condition is not None and loop is self._loop:
+            loop.create_task(self._notify())
+
+    async def _notify(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+    def drain(self, retry_after: float = 0.0):
+        """Empty the buckets after the provider reported a rate limit"""
+        self._requests.empty(retry_after)
+        self._tokens.empty(retry_after)
+        logger.warning(f"LLM provider rate limit hit; budget drained for {retry_after:.0f}s")
+
+    def get_stats(self) -> Dict:
+        queued = [0, 0, 0]
+        for entry in self._queue:
+            queued[entry[0]] += 1
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "available_requests": round(self._requests.available(), 1),
+            "available_tokens": int(self._tokens.available()),
+            "queued": {priority.name.lower(): queued[priority] for priority in Priority},
+            **self.stats,
+            "queued_seconds": round(self.stats["queued_seconds"], 1),
+        }
@@ -7,15 +7,26 @@ Handles AI-based adaptation of uploaded PDF manuals:
 """
 
 import re
-import unicodedata
+import asyncio
 from typing import Dict, List, Optional, Tuple
-from groq import Groq
 from core.config import settings
 from services.translation_service import get_translation_service
+from services.language_detection import detect_language
+from services.llm_scheduler import Priority
+from services.model_router import Task, get_model_router
+from services.prompt_budget import count_tokens, trim_to_tokens
+from services.section_splitter import split_sections
+from services.text_normalizer import normalize_indic_text
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Completion sizes for the final summary and for each section summary
+SUMMARY_MAX_TOKENS = 3000
+SECTION_SUMMARY_MAX_TOKENS = 400
+# Section summaries merged per intermediate reduce call on very long manuals
+REDUCE_GROUP_SIZE = 6
+
 
 class ManualAdapterService:
     """
@@ -23,134 +34,22 @@ class ManualAdapterService:
     and key points in the same language as the source document.
     """
     
-    # Unicode ranges for Indian language detection
-    LANGUAGE_UNICODE_RANGES = {
-        'hindi': [
-            (0x0900, 0x097F),  # Devanagari
-        ],
-        'marathi': [
-            (0x0900, 0x097F),  # Devanagari (same as Hindi)
-        ],
-        'bengali': [
-            (0x0980, 0x09FF),  # Bengali
-        ],
-        'tamil': [
-            (0x0B80, 0x0BFF),  # Tamil
-        ],
-        'telugu': [
-            (0x0C00, 0x0C7F),  # Telugu
-        ],
-        'gujarati': [
-            (0x0A80, 0x0AFF),  # Gujarati
-        ],
-        'kannada': [
-            (0x0C80, 0x0CFF),  # Kannada
-        ],
-        'malayalam': [
-            (0x0D00, 0x0D7F),  # Malayalam
-        ],
-        'punjabi': [
-            (0x0A00, 0x0A7F),  # Gurmukhi
-        ],
-        'odia': [
-            (0x0B00, 0x0B7F),  # Oriya
-        ],
-        'urdu': [
-            (0x0600, 0x06FF),  # Arabic (Urdu uses Arabic script)
-            (0x0750, 0x077F),  # Arabic Supplement
-        ],
-    }
-    
     def __init__(self):
-        self.client = Groq(api_key=settings.groq_api_key)
-        self.model = "llama-3.3-70b-versatile"
+        self.router = get_model_router()
         self.translation_service = get_translation_service()
         logger.info("Manual Adapter Service initialized")
     
-    def _normalize_indian_text(self, text: str) -> str:
-        """
-        Normalize Indian language text to prevent character splitting.
-        Uses NFC normalization to keep combined characters together.
-        """
-        if not text:
-            return text
-        
-        # Normalize to NFC (Canonical Composition) - keeps characters together
-        normalized = unicodedata.normalize('NFC', text)
-        
-        # Remove any zero-width characters that might cause issues
-        # But keep Zero Width Joiner (ZWJ) which is needed for some conjuncts
-        cleaned = ""
-        for char in normalized:
-            code_point = ord(char)
-            # Keep ZWJ (0x200D) but remove ZWNJ (0x200C) and other zero-width chars
-            if code_point == 0x200D:  # Zero Width Joiner - keep it
-                cleaned += char
-            elif code_point in (0x200B, 0x200C, 0xFEFF):  # Zero width space, ZWNJ, BOM
-                continue
-            else:
-                cleaned += char
-        
-        return cleaned
-    
     def detect_language(self, text: str) -> str:
         """
-        Detect the primary language of the text based on Unicode character analysis.
-        Returns the detected language name (lowercase).
+        Detect the primary language of the text from sampled script counts
+        (see services.language_detection). Returns the language name (lowercase).
         """
-        if not text:
-            return "english"
-        
-        # Count characters in each language's Unicode range
-        language_counts = {lang: 0 for lang in self.LANGUAGE_UNICODE_RANGES}
-        english_count = 0
-        total_alpha = 0
-        
-        for char in text:
-            if not char.isalpha():
-                continue
-            
-            total_alpha += 1
-            code_point = ord(char)
-            
-            # Check if it's ASCII (English)
-            if code_point < 128:
-                english_count += 1
-                continue
-            
-            # Check against Indian language ranges
-            for lang, ranges in self.LANGUAGE_UNICODE_RANGES.items():
-                for start, end in ranges:
-                    if start <= code_point <= end:
-                        language_counts[lang] += 1
-                        break
-        
-        if total_alpha == 0:
-            return "english"
-        
-        # Find the dominant language
-        max_count = english_count
-        detected_lang = "english"
-        
-        for lang, count in language_counts.items():
-            if count > max_count:
-                max_count = count
-                detected_lang = lang
-        
-        # If Devanagari script detected, try to distinguish Hindi from Marathi
-        # based on common word patterns (simplified heuristic)
-        if detected_lang in ('hindi', 'marathi'):
-            # Check for Marathi-specific words/patterns
-            marathi_indicators = ['आहे', 'नाही', 'आणि', 'हे', 'ते', 'या', 'त्या', 'केले', 'झाले', 'असे']
-            hindi_indicators = ['है', 'हैं', 'नहीं', 'और', 'यह', 'वह', 'था', 'थे', 'किया', 'हुआ']
-            
-            marathi_score = sum(1 for word in marathi_indicators if word in text)
-            hindi_score = sum(1 for word in hindi_indicators if word in text)
-            
-            detected_lang = 'marathi' if marathi_score > hindi_score else 'hindi'
-        
-        logger.info(f"Detected language: {detected_lang} (confidence based on {max_count}/{total_alpha} chars)")
-        return detected_lang
+        guess = detect_language(text)
+        logger.info(
+            f"Detected language: {guess.language} (confidence {guess.confidence:.2f}, "
+            f"{guess.letters} letters in {guess.samples} samples)"
+        )
+        return guess.language
     
     def _get_language_instruction(self, language: str) -> str:
         """Get AI instruction for generating content in specific language."""
@@ -190,12 +89,7 @@ class ManualAdapterService:
         """
         try:
             # Normalize the input text for proper Unicode handling
-            normalized_text = self._normalize_indian_text(extracted_text)
-            
-            # Truncate text if too long (keep first ~8000 chars for context)
-            max_chars = 8000
-            if len(normalized_text) > max_chars:
-                normalized_text = normalized_text[:max_chars] + "..."
+            normalized_text = normalize_indic_text(extracted_text)
             
             lang_name = self._get_language_instruction(detected_language)
             
@@ -222,11 +116,22 @@ OUTPUT REQUIREMENTS:
 - Organize information in easy-to-understand format
 - Keep the educational context intact"""
 
+            # Long manuals are summarized section by section first so the
+            # whole document is covered, not just its opening pages. Sizing a
+            # whole manual is CPU work, so it runs off the event loop.
+            content_budget = self._content_token_budget(system_prompt, manual_title)
+            content_label = "CONTENT"
+            if await asyncio.to_thread(count_tokens, normalized_text) > content_budget:
+                normalized_text = await self._map_reduce(normalized_text, lang_name, manual_title, content_budget)
+                # A single section summary can still overshoot when the model ignores brevity
+                normalized_text = await asyncio.to_thread(trim_to_tokens, normalized_text, content_budget)
+                content_label = "CONTENT (section-by-section summaries of the full manual, in order)"
+            
             user_prompt = f"""Please analyze this training manual and create an adapted summary:
 
 MANUAL TITLE: {manual_title}
 
-CONTENT:
+{content_label}:
 \"\"\"
 {normalized_text}
 \"\"\"
@@ -244,22 +149,22 @@ Generate the following in {lang_name}:
 Remember: Write ENTIRELY in {lang_name}. Do not use English unless the source is in English."""
 
             # Call Groq API
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self.router.complete(
+                Task.MANUAL_SUMMARY,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,  # Lower temperature for more consistent output
-                max_tokens=3000,
+                max_tokens=SUMMARY_MAX_TOKENS,
                 top_p=1,
-                stream=False
+                priority=Priority.BACKGROUND
             )
             
-            adapted_content = response.choices[0].message.content
+            adapted_content = response.content
             
             # Normalize the output text for proper Unicode handling
-            adapted_content = self._normalize_indian_text(adapted_content)
+            adapted_content = normalize_indic_text(adapted_content)
             
             # Parse key points from the response
             key_points = self._extract_key_points(adapted_content)
@@ -268,7 +173,7 @@ Remember: Write ENTIRELY in {lang_name}. Do not use English unless the source is
                 "adapted_summary": adapted_content,
                 "key_points": key_points,
                 "detected_language": detected_language,
-                "tokens_used": response.usage.total_tokens if response.usage else 0
+                "tokens_used": response.total_tokens
             }
             
             logger.info(f"Successfully generated adapted content for '{manual_title}' in {detected_language}")
@@ -278,6 +183,69 @@ Remember: Write ENTIRELY in {lang_name}. Do not use English unless the source is
             logger.error(f"Error generating adapted content: {str(e)}")
             raise Exception(f"AI adaptation failed: {str(e)}")
     
+    def _content_token_budget(self, system_prompt: str, manual_title: str) -> int:
+        """Tokens of manual content that fit one summary request"""
+        overhead = count_tokens(system_prompt) + count_tokens(manual_title) + 250
+        return max(settings.groq_request_token_limit - SUMMARY_MAX_TOKENS - overhead - 150, 500)
+    
+    async def _summarize_section(self, section: str, lang_name: str, manual_title: str) -> str:
+        """
+        Map step: summarize one section (cached by content, so unchanged sections are free)
+        
+        The prompt holds nothing positional: adding or removing a section in a
+        revised manual must not change the cache key of any other section.
+        """
+        response = await self.router.complete(
+            Task.SECTION_SUMMARY,
+            messages=[
+                {"role": "system", "content": f"""You summarize parts of teacher training manuals.
+Write ONLY in {lang_name}. Keep every teaching strategy, activity, key concept and
+learning objective mentioned; drop repetition and filler. Use short bullet points."""},
+                {"role": "user", "content": f"""MANUAL TITLE: {manual_title}
+
+\"\"\"
+{section}
+\"\"\"
+
+Summarize this part in {lang_name}."""}
+            ],
+            temperature=0.2,
+            max_tokens=SECTION_SUMMARY_MAX_TOKENS,
+            priority=Priority.BACKGROUND
+        )
+        return response.content.strip()
+    
+    async def _map_reduce(self, text: str, lang_name: str, manual_title: str, content_budget: int) -> str:
+        """
+        Condense a long manual into ordered section summaries that fit content_budget
+        
+        Sections are summarized concurrently (the LLM scheduler keeps this within
+        the rate budget); if the summaries are still too long they are merged in
+        groups until they fit, so cost stays linear in manual length.
+        """
+        section_budget = min(content_budget, settings.groq_request_token_limit - SECTION_SUMMARY_MAX_TOKENS - 400)
+        sections = await asyncio.to_thread(
+            split_sections, text, target_tokens=int(section_budget * 0.75), max_tokens=section_budget
+        )
+        logger.info(f"Summarizing '{manual_title}' in {len(sections)} sections")
+        
+        level = 0
+        summaries = await asyncio.gather(*(
+            self._summarize_section(section, lang_name, manual_title) for section in sections
+        ))
+        
+        while count_tokens("\n\n".join(summaries)) > content_budget and len(summaries) > 1:
+            level += 1
+            groups = [summaries[i:i + REDUCE_GROUP_SIZE] for i in range(0, len(summaries), REDUCE_GROUP_SIZE)]
+            summaries = await asyncio.gather(*(
+                self._summarize_section("\n\n".join(group), lang_name, manual_title) for group in groups
+            ))
+            logger.info(f"Reduce level {level}: merged into {len(summaries)} summaries")
+        
+        return "\n\n".join(
+            f"[{i + 1}] {summary}" for i, summary in enumerate(summaries)
+        ) if len(summaries) > 1 else summaries[0]
+    
     def _extract_key_points(self, content: str) -> List[str]:
         """Extract key points from the adapted content as a list."""
         key_points = []
@@ -291,11 +259,11 @@ Remember: Write ENTIRELY in {lang_name}. Do not use English unless the source is
             if re.match(r'^[-*•]\s+', line):
                 point = re.sub(r'^[-*•]\s+', '', line)
                 if point and len(point) > 10:  # Skip very short items
-                    key_points.append(self._normalize_indian_text(point))
+                    key_points.append(normalize_indic_text(point))
             elif re.match(r'^\d+[.)]\s+', line):
                 point = re.sub(r'^\d+[.)]\s+', '', line)
                 if point and len(point) > 10:
-                    key_points.append(self._normalize_indian_text(point))
+                    key_points.append(normalize_indic_text(point))
         
         # If no bullet points found, try to extract sentences
         if not key_points:
@@ -304,7 +272,7 @@ Remember: Write ENTIRELY in {lang_name}. Do not use English unless the source is
             for sentence in sentences[:10]:  # Limit to first 10
                 sentence = sentence.strip()
                 if len(sentence) > 20:
-                    key_points.append(self._normalize_indian_text(sentence))
+                    key_points.append(normalize_indic_text(sentence))
         
         return key_points[:10]  # Limit to 10 key points
     
@@ -329,7 +297,7 @@ Remember: Write ENTIRELY in {lang_name}. Do not use English unless the source is
             Dict with all adaptation results
         """
         # Normalize the extracted text
-        normalized_text = self._normalize_indian_text(extracted_text)
+        normalized_text = normalize_indic_text(extracted_text)
         
         # Detect language
         detected_language = self.detect_language(normalized_text)
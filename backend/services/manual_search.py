@@ -0,0 +1,257 @@
+"""
+Teacher-facing search over indexed manuals
+Wraps RAGEngine.search with a result cache for popular queries, opaque cursor
+pagination, highlighted snippets and per-query latency tracking.
+"""
+
+import base64
+import hashlib
+import html
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from services.lexical_index import match_spans
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or belongs to another query"""
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so equivalent queries share a cache entry"""
+    return " ".join(unicodedata.normalize('NFC', query).lower().split())
+
+
+def make_snippet(text: str, query: str, max_chars: int = 240) -> str:
+    """
+    Build an HTML-safe snippet around the first matching terms
+    Matched words are wrapped in <mark>; everything else is escaped.
+    """
+    spans = match_spans(text, query)
+    if len(text) <= max_chars:
+        start, end = 0, len(text)
+    else:
+        anchor = spans[0][0] if spans else 0
+        start = max(0, anchor - max_chars // 3)
+        if start:
+            # Start on a word boundary
+            space = text.find(" ", start)
+            if 0 <= space < anchor:
+                start = space + 1
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            space = text.rfind(" ", start, end)
+            if space > start + max_chars // 2:
+                end = space
+
+    parts = ["…" if start else ""]
+    position = start
+    for span_start, span_end in spans:
+        if span_start < start or span_end > end:
+            continue
+        parts.append(html.escape(text[position:span_start]))
+        parts.append(f"<mark>{html.escape(text[span_start:span_end])}</mark>")
+        position = span_end
+    parts.append(html.escape(text[position:end]))
+    if end < len(text):
+        parts.append("…")
+    return " ".join("".join(parts).split())
+
+
+class ManualSearchService:
+    """
+    Cached, paginated search across manuals
+
+    The full ranked list (up to max_results) is cached per normalized query and
+    manual scope, so paging through results never re-runs the search.
+    Concurrent misses for the same key share one search. Entries expire after
+    cache_ttl seconds, which also bounds staleness across worker processes;
+    invalidate() drops the local cache when a manual is indexed or deleted.
+
+    Args:
+        rag_engine: RAGEngine used for hybrid retrieval
+        cache_size: Number of queries kept in the LRU cache
+        cache_ttl: Seconds a cached result list stays valid
+        max_results: Results ranked per query (the pagination window)
+    """
+
+    def __init__(
+        self,
+        rag_engine,
+        cache_size: int = 256,
+        cache_ttl: float = 300.0,
+        max_results: int = 50,
+        snippet_chars: int = 240
+    ):
+        self.rag_engine = rag_engine
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.max_results = max_results
+        self.snippet_chars = snippet_chars
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._latencies = deque(maxlen=1000)
+        self._hits = 0
+        self._misses = 0
+
+    def search(
+        self,
+        query: str,
+        manual_ids: Optional[List[int]] = None,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """
+        Search manuals and return one page of results
+
+        Args:
+            query: Search text
+            manual_ids: Optional manual IDs to restrict the search to
+            limit: Page size
+            cursor: Cursor from a previous page's next_cursor
+
+        Returns:
+            Dict with results, total, next_cursor, cached and took_ms
+
+        Raises:
+            InvalidCursorError: If the cursor does not belong to this query
+        """
+        started = time.perf_counter()
+        normalized = normalize_query(query)
+        scope = tuple(sorted({int(m) for m in manual_ids})) if manual_ids else ()
+        key = (normalized, scope)
+        query_hash = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:12]
+        offset = self._decode_cursor(cursor, query_hash) if cursor else 0
+
+        ranked, cached = self._get_ranked(key)
+
+        page = []
+        for result in ranked[offset:offset + limit]:
+            metadata = result.get("metadata") or {}
+            page.append({
+                "chunk_id": result.get("id"),
+                "manual_id": int(metadata["manual_id"]) if str(metadata.get("manual_id", "")).isdigit() else None,
+                "page_start": metadata.get("page_start"),
+                "page_end": metadata.get("page_end"),
+                "snippet": make_snippet(result.get("content") or "", normalized, self.snippet_chars),
+                "score": result.get("score"),
+                "distance": result.get("distance"),
+                "match": result.get("match", "vector"),
+            })
+
+        next_offset = offset + limit
+        took_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._latencies.append(took_ms)
+
+        return {
+            "query": query,
+            "results": page,
+            "total": len(ranked),
+            "next_cursor": self._encode_cursor(next_offset, query_hash) if next_offset < len(ranked) else None,
+            "cached": cached,
+            "took_ms": round(took_ms, 2),
+        }
+
+    def _get_ranked(self, key: Tuple) -> Tuple[List[Dict], bool]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > now:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return entry[1], True
+
+            self._misses += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result(), False
+
+        try:
+            query, scope = key
+            ranked = self.rag_engine.search(query, top_k=self.max_results, manual_ids=list(scope) or None)
+            future.set_result(ranked)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        with self._lock:
+            # Empty results usually mean a search error; do not pin them in the cache
+            if ranked:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, ranked)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return ranked, False
+
+    def invalidate(self):
+        """Drop cached results (call after a manual is indexed or deleted)"""
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _encode_cursor(offset: int, query_hash: str) -> str:
+        payload = json.dumps({"o": offset, "q": query_hash}, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii').rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, query_hash: str) -> int:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            offset = int(payload["o"])
+        except Exception:
+            raise InvalidCursorError("Malformed cursor")
+        if payload.get("q") != query_hash or offset < 0:
+            raise InvalidCursorError("Cursor does not match this query")
+        return offset
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            lookups = self._hits + self._misses
+
+            def percentile(p: float) -> Optional[float]:
+                if not latencies:
+                    return None
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2)
+
+            return {
+                "queries": lookups,
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "cache_hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "cached_queries": len(self._cache),
+                "latency_p50_ms": percentile(0.50),
+                "latency_p95_ms": percentile(0.95),
+            }
+
+
+# Service instance
+_manual_search_service = None
+
+def get_manual_search_service() -> ManualSearchService:
+    """Get singleton instance of the manual search service"""
+    global _manual_search_service
+    if _manual_search_service is None:
+        from services.rag_engine import get_rag_engine
+        _manual_search_service = ManualSearchService(get_rag_engine())
+    return _manual_search_service
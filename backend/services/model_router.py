@@ -0,0 +1,334 @@
+"""
+Task-based model routing
+Maps each kind of LLM call to a model tier so short classification-style
+calls (safety verdicts, competency tags, JSON recommendations) run on a small
+fast model and only long-form generation uses the 70B model. Latency, token
+use and output validity are tracked per task and model, and an optional
+shadow mode replays a sample of live calls on the other tier to compare them.
+"""
+
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+import logging
+
+from core.resilience import CircuitOpen
+from services.llm_gateway import LLMGateway, LLMResult, LLMStream, get_llm_gateway
+from services.llm_scheduler import Priority, SchedulerBusy
+
+logger = logging.getLogger(__name__)
+
+LARGE = "large"
+SMALL = "small"
+
+
+class Task(str, Enum):
+    MODULE_GENERATION = "module_generation"
+    MANUAL_SUMMARY = "manual_summary"
+    SECTION_SUMMARY = "section_summary"
+    SAFETY_CHECK = "safety_check"
+    COMPETENCY_TAGGING = "competency_tagging"
+    CLUSTER_RECOMMENDATIONS = "cluster_recommendations"
+
+
+DEFAULT_TASK_TIERS = {
+    Task.MODULE_GENERATION: LARGE,
+    Task.MANUAL_SUMMARY: LARGE,
+    Task.SECTION_SUMMARY: LARGE,
+    Task.SAFETY_CHECK: SMALL,
+    Task.COMPETENCY_TAGGING: SMALL,
+    Task.CLUSTER_RECOMMENDATIONS: SMALL,
+}
+
+# Latency samples kept per task and model
+LATENCY_WINDOW = 200
+# Shadow calls give up instead of queueing behind real traffic
+SHADOW_MAX_WAIT_SECONDS = 5.0
+
+_WORD = re.compile(r"\w+")
+
+
+def _percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+def _text_agreement(a: str, b: str) -> float:
+    """Word-set Jaccard similarity of two outputs"""
+    words_a, words_b = set(_WORD.findall(a.lower())), set(_WORD.findall(b.lower()))
+    if not words_a and not words_b:
+        return 1.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+class _TaskStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.invalid = 0
+        self.tokens = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "invalid": self.invalid,
+            "valid_rate": round(1 - self.invalid / self.calls, 3) if self.calls else None,
+            "tokens": self.tokens,
+            "latency_p50": _percentile(list(self.latencies), 0.5),
+            "latency_p95": _percentile(list(self.latencies), 0.95),
+        }
+
+
+class _RoutedStream:
+    """LLMStream that adds the routed task's stats once iteration ends"""
+
+    def __init__(self, stream: LLMStream, stats: _TaskStats, started: float):
+        self._stream = stream
+        self._stats = stats
+        self._started = started
+
+    @property
+    def result(self) -> LLMResult:
+        return self._stream.result
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for delta in self._stream:
+                yield delta
+        except Exception:
+            self._stats.errors += 1
+            raise
+        self._stats.calls += 1
+        self._stats.tokens += self.result.total_tokens
+        self._stats.latencies.append(time.perf_counter() - self._started)
+
+
+class ModelRouter:
+    """
+    Routes LLM calls to a model by task
+
+    Args:
+        gateway: LLM gateway used for every call
+        models: Model name per tier ({"large": ..., "small": ...})
+        task_tiers: Tier overrides per task name (defaults: DEFAULT_TASK_TIERS)
+        shadow_fraction: Share of calls (0-1) also replayed on the other tier
+        shadow_tasks: Tasks eligible for shadow comparison
+    """
+
+    def __init__(
+        self,
+        gateway: LLMGateway,
+        models: Dict[str, str],
+        task_tiers: Optional[Dict[str, str]] = None,
+        shadow_fraction: float = 0.0,
+        shadow_tasks: Optional[List[str]] = None
+    ):
+        self.gateway = gateway
+        self.models = models
+        self.task_tiers = {task.value: tier for task, tier in DEFAULT_TASK_TIERS.items()}
+        self.task_tiers.update(task_tiers or {})
+        self.shadow_fraction = shadow_fraction
+        self.shadow_tasks = set(shadow_tasks or [])
+        self._stats: Dict[tuple, _TaskStats] = {}
+        self._shadow: Dict[str, Dict[str, Any]] = {}
+        self._shadow_tasks_running: Set[asyncio.Task] = set()
+
+    def model_for(self, task: Task) -> str:
+        tier = self.task_tiers.get(Task(task).value, LARGE)
+        return self.models.get(tier) or self.models[LARGE]
+
+    def _other_model(self, model: str) -> Optional[str]:
+        others = [m for m in self.models.values() if m != model]
+        return others[0] if others else None
+
+    def _task_stats(self, task: Task, model: str) -> _TaskStats:
+        key = (Task(task).value, model)
+        if key not in self._stats:
+            self._stats[key] = _TaskStats()
+        return self._stats[key]
+
+    async def complete(
+        self,
+        task: Task,
+        messages: List[Dict[str, str]],
+        validate: Optional[Callable[[str], Any]] = None,
+        **kwargs: Any
+    ) -> LLMResult:
+        """
+        Run a chat completion on the model configured for task
+
+        Args:
+            task: Kind of call (decides the model)
+            messages: Chat messages
+            validate: Optional parser for the output; returning None or raising
+                marks the output invalid in the quality stats, and parsed
+                values are what shadow mode compares
+            **kwargs: Passed to LLMGateway.complete (temperature, max_tokens, ...)
+
+        Returns:
+            LLMResult from the routed model
+        """
+        task = Task(task)
+        model = kwargs.pop("model", None) or self.model_for(task)
+        stats = self._task_stats(task, model)
+        started = time.perf_counter()
+        try:
+            result = await self.gateway.complete(messages, model=model, call_site=task.value, **kwargs)
+        except Exception:
+            stats.errors += 1
+            raise
+        latency = time.perf_counter() - started
+
+        stats.calls += 1
+        stats.tokens += result.total_tokens
+        if not result.cached:
+            stats.latencies.append(latency)
+        parsed = _validated(validate, result.content)
+        if validate is not None and parsed is None:
+            stats.invalid += 1
+            logger.warning(f"LLM output for {task.value} on {model} failed validation")
+        logger.debug(f"LLM {task.value} on {model}: {latency:.2f}s, {result.total_tokens} tokens")
+
+        if (
+            task.value in self.shadow_tasks
+            and self.shadow_fraction > 0
+            and random.random() < self.shadow_fraction
+            and self._other_model(model)
+        ):
+            shadow = asyncio.create_task(self._run_shadow(
+                task, messages, validate, kwargs, result, parsed, latency
+            ))
+            # Keep a reference so the background task is not garbage collected
+            self._shadow_tasks_running.add(shadow)
+            shadow.add_done_callback(self._shadow_tasks_running.discard)
+        return result
+
+    async def stream(self, task: Task, messages: List[Dict[str, str]], **kwargs: Any) -> _RoutedStream:
+        """
+        Start a streamed chat completion on the model configured for task
+
+        Calls, errors, tokens and latency (to the last chunk) are recorded
+        when the stream has been read to the end; shadow mode does not apply.
+
+        Args:
+            task: Kind of call (decides the model)
+            messages: Chat messages
+            **kwargs: Passed to LLMGateway.stream (temperature, max_tokens, ...)
+
+        Returns:
+            Stream of text deltas; read .result after iterating
+        """
+        task = Task(task)
+        model = kwargs.pop("model", None) or self.model_for(task)
+        stats = self._task_stats(task, model)
+        started = time.perf_counter()
+        try:
+            stream = await self.gateway.stream(messages, model=model, call_site=task.value, **kwargs)
+        except Exception:
+            stats.errors += 1
+            raise
+        return _RoutedStream(stream, stats, started)
+
+    async def _run_shadow(
+        self,
+        task: Task,
+        messages: List[Dict[str, str]],
+        validate: Optional[Callable[[str], Any]],
+        kwargs: Dict[str, Any],
+        primary: LLMResult,
+        primary_parsed: Any,
+        primary_latency: float
+    ):
+        """Replay a call on the other tier and record how the answers compare"""
+        model = self._other_model(primary.model)
+        kwargs = {**kwargs, "priority": Priority.BATCH, "max_wait": SHADOW_MAX_WAIT_SECONDS}
+        started = time.perf_counter()
+        try:
+            shadow = await self.gateway.complete(messages, model=model, call_site=f"{task.value}:shadow", **kwargs)
+        except (SchedulerBusy, CircuitOpen):
+            return
+        except Exception as e:
+            logger.warning(f"Shadow {task.value} call on {model} failed: {e}")
+            return
+        latency = time.perf_counter() - started
+
+        shadow_parsed = _validated(validate, shadow.content)
+        if validate is not None:
+            agreement = 1.0 if shadow_parsed is not None and shadow_parsed == primary_parsed else 0.0
+        else:
+            agreement = _text_agreement(primary.content, shadow.content)
+
+        record = self._shadow.setdefault(task.value, {
+            "primary_model": primary.model,
+            "shadow_model": model,
+            "runs": 0,
+            "agreement_total": 0.0,
+            "shadow_invalid": 0,
+            "primary_latency": deque(maxlen=LATENCY_WINDOW),
+            "shadow_latency": deque(maxlen=LATENCY_WINDOW),
+        })
+        record["runs"] += 1
+        record["agreement_total"] += agreement
+        record["shadow_invalid"] += int(validate is not None and shadow_parsed is None)
+        record["primary_latency"].append(primary_latency)
+        record["shadow_latency"].append(latency)
+        logger.info(
+            f"Shadow {task.value}: {primary.model} {primary_latency:.2f}s vs {model} {latency:.2f}s, "
+            f"agreement {agreement:.2f}"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "models": self.models,
+            "task_tiers": self.task_tiers,
+            "tasks": {
+                f"{task}:{model}": stats.snapshot() for (task, model), stats in self._stats.items()
+            },
+            "shadow": {
+                task: {
+                    "primary_model": record["primary_model"],
+                    "shadow_model": record["shadow_model"],
+                    "runs": record["runs"],
+                    "agreement": round(record["agreement_total"] / record["runs"], 3),
+                    "shadow_invalid": record["shadow_invalid"],
+                    "primary_latency_p50": _percentile(list(record["primary_latency"]), 0.5),
+                    "shadow_latency_p50": _percentile(list(record["shadow_latency"]), 0.5),
+                }
+                for task, record in self._shadow.items()
+            },
+        }
+
+
+def _validated(validate: Optional[Callable[[str], Any]], content: str) -> Any:
+    if validate is None:
+        return None
+    try:
+        return validate(content)
+    except Exception:
+        return None
+
+
+# Service instance
+_model_router = None
+
+def get_model_router() -> ModelRouter:
+    """Get singleton instance of the model router"""
+    global _model_router
+    if _model_router is None:
+        from core.config import settings
+        _model_router = ModelRouter(
+            get_llm_gateway(),
+            models={LARGE: settings.llm_large_model, SMALL: settings.llm_small_model},
+            task_tiers=settings.llm_task_tiers,
+            shadow_fraction=settings.llm_shadow_fraction,
+            shadow_tasks=settings.llm_shadow_tasks
+        )
+    return _model_router
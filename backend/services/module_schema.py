@@ -0,0 +1,122 @@
+"""
+Structured module output
+Schema for the single-call generation mode, where the model returns the seven
+module components, a safety verdict and competency tags as one JSON object
+instead of three separate calls (adapt, validate, tag).
+"""
+
+import json
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+# Module components in display order: (JSON key, heading)
+MODULE_COMPONENTS = [
+    ("classroom_challenge", "Classroom Challenge"),
+    ("why_this_matters", "Why This Matters"),
+    ("teaching_approach", "Suggested Teaching Approach"),
+    ("low_resource_activity", "Low-Resource Activity"),
+    ("expected_student_response", "Expected Student Response"),
+    ("classroom_signals", "Classroom Signals"),
+    ("teacher_feedback_prompt", "Teacher Feedback Prompt"),
+]
+
+COMPETENCY_TAGS = [
+    "Classroom Management",
+    "Language Pedagogy",
+    "Conceptual Teaching",
+    "Inclusive Education",
+    "Assessment & Feedback",
+]
+
+_COMPONENT_KEYS = ",\n".join(f'    "{key}": "<{heading}, as markdown text>"' for key, heading in MODULE_COMPONENTS)
+_TAG_CHOICES = ", ".join(f'"{tag}"' for tag in COMPETENCY_TAGS)
+
+STRUCTURED_OUTPUT_INSTRUCTIONS = f"""
+OUTPUT FORMAT:
+Return ONE JSON object and nothing else (instead of the markdown layout above), with exactly these keys:
+{{
+  "components": {{
+{_COMPONENT_KEYS}
+  }},
+  "safety": {{"verdict": "SAFE" or "UNSAFE", "concerns": ["<specific concern>", ...]}},
+  "competency_tags": [up to two of: {_TAG_CHOICES}]
+}}
+
+"safety" reviews your own module: UNSAFE if it suggests unsafe or unapproved
+experiments, violates policy, assumes unavailable resources, or is disrespectful
+toward teachers. "concerns" is empty when SAFE."""
+
+# Extra completion tokens for JSON syntax, the verdict and the tags
+STRUCTURED_EXTRA_TOKENS = 300
+
+
+class ModuleComponents(BaseModel):
+    classroom_challenge: str = Field(..., min_length=1)
+    why_this_matters: str = Field(..., min_length=1)
+    teaching_approach: str = Field(..., min_length=1)
+    low_resource_activity: str = Field(..., min_length=1)
+    expected_student_response: str = Field(..., min_length=1)
+    classroom_signals: str = Field(..., min_length=1)
+    teacher_feedback_prompt: str = Field(..., min_length=1)
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def join_lists(cls, value):
+        # Models often answer list-like components (signals, steps) as arrays
+        if isinstance(value, list):
+            return "\n".join(f"- {item}" for item in value)
+        return value
+
+
+class SafetyVerdict(BaseModel):
+    verdict: Literal["SAFE", "UNSAFE"]
+    concerns: List[str] = Field(default_factory=list)
+
+    @field_validator("verdict", mode="before")
+    @classmethod
+    def normalize_verdict(cls, value):
+        return value.strip().upper() if isinstance(value, str) else value
+
+
+class StructuredModule(BaseModel):
+    components: ModuleComponents
+    safety: SafetyVerdict
+    competency_tags: List[str] = Field(default_factory=list)
+
+    @field_validator("competency_tags")
+    @classmethod
+    def known_tags(cls, tags):
+        by_name = {tag.lower(): tag for tag in COMPETENCY_TAGS}
+        known = [by_name[tag.strip().lower()] for tag in tags if tag.strip().lower() in by_name]
+        return list(dict.fromkeys(known))[:2]
+
+    def to_markdown(self, headings: Optional[List[str]] = None) -> str:
+        """
+        The module in the same 7-component layout as free-text generation
+
+        Args:
+            headings: Component headings to use instead of the English ones
+        """
+        headings = headings or [heading for _, heading in MODULE_COMPONENTS]
+        return "\n\n".join(
+            f"**{number}. {heading}**\n{getattr(self.components, key).strip()}"
+            for number, ((key, _), heading) in enumerate(zip(MODULE_COMPONENTS, headings), start=1)
+        )
+
+
+def parse_structured_module(text: str) -> Optional[StructuredModule]:
+    """
+    Validate a JSON module response
+
+    Returns:
+        StructuredModule, or None if the text is not valid JSON matching the schema
+    """
+    text = (text or "").strip()
+    # Tolerate a markdown code fence around the object
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        return StructuredModule.model_validate(json.loads(text))
+    except (json.JSONDecodeError, ValidationError, TypeError):
+        return None
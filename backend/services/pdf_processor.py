@@ -1,10 +1,14 @@
 import os
+import re
+import bisect
 import PyPDF2
 import pdfplumber
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import logging
 
+from services.language_detection import OCR_LANGUAGE_CODES, detect_language, ocr_languages
+
 # OCR imports - optional dependencies
 try:
     import pytesseract
@@ -93,10 +97,60 @@ class PDFProcessor:
         
         return text
     
-    def extract_text_ocr(self, file_path: str, language: str = 'eng+hin') -> str:
+    def extract_text_with_pages(self, file_path: str) -> Tuple[str, List[int]]:
+        """
+        Extract text and the character offset at which each page starts.
+        Page offsets let chunks carry page provenance for search results.
+        Falls back to extract_text() (including OCR) for scanned PDFs.
+        """
+        text = ""
+        page_starts = []
+        try:
+            with pdfplumber.open(file_path) as pdf:
+                for page in pdf.pages:
+                    page_starts.append(len(text))
+                    text += (page.extract_text() or "") + "\n"
+        except Exception as e:
+            logger.warning(f"Page-aware extraction failed, falling back: {str(e)}")
+            text = ""
+        
+        if len(text.strip()) < self.min_text_threshold:
+            text = self.extract_text(file_path, method="auto")
+            # OCR output marks each page as "--- Page N ---"
+            page_starts = [match.start() for match in re.finditer(r"--- Page \d+ ---", text)]
+        
+        return text, page_starts
+    
+    def select_ocr_language(self, image, known_text: str = "") -> str:
+        """
+        Choose Tesseract languages for a document.
+        Uses text already extracted from the document when it has enough
+        letters; otherwise OCRs one page with every installed Indian language
+        and detects the script of the result.
+        """
+        try:
+            available = set(pytesseract.get_languages(config=""))
+        except Exception:
+            available = None
+        
+        guess = detect_language(known_text) if known_text else None
+        if guess is None or guess.letters < 200:
+            probe = [code for code in OCR_LANGUAGE_CODES.values() if available is None or code in available]
+            try:
+                guess = detect_language(pytesseract.image_to_string(image, lang="+".join(probe)))
+            except Exception as e:
+                logger.warning(f"OCR language probe failed, using the default: {str(e)}")
+                return ocr_languages(available=available)
+        
+        language = ocr_languages(guess, available)
+        logger.info(f"OCR language: {language} (detected {guess.language}, confidence {guess.confidence:.2f})")
+        return language
+    
+    def extract_text_ocr(self, file_path: str, language: Optional[str] = None) -> str:
         """
         Extract text from PDF using OCR (for scanned PDFs/images).
-        Supports multiple languages including English and Hindi.
+        Supports English and all Indian languages; when language is not given
+        it is chosen from a sample page (see select_ocr_language).
         """
         if not OCR_AVAILABLE:
             raise ImportError("OCR dependencies not installed. Run: pip install pytesseract pdf2image Pillow")
@@ -106,6 +160,9 @@ class PDFProcessor:
             # Convert PDF pages to images
             logger.info(f"Converting PDF to images for OCR: {file_path}")
             images = convert_from_path(file_path, dpi=300)
+            if language is None and images:
+                # A middle page is less likely to be a cover or blank
+                language = self.select_ocr_language(images[len(images) // 2])
             
             # Process each page
             for page_num, image in enumerate(images, start=1):
@@ -173,6 +230,7 @@ class PDFProcessor:
                 
                 # Convert all pages to images upfront (for OCR fallback)
                 images = convert_from_path(file_path, dpi=300)
+                ocr_language = None
                 
                 for page_num in range(total_pages):
                     # Try text extraction first
@@ -182,7 +240,10 @@ class PDFProcessor:
                     if len(page_text) < 50:
                         logger.info(f"Page {page_num + 1}: Using OCR (text extraction yielded {len(page_text)} chars)")
                         try:
-                            page_text = pytesseract.image_to_string(images[page_num], lang='eng+hin')
+                            if ocr_language is None:
+                                # Text pages read so far usually reveal the language
+                                ocr_language = self.select_ocr_language(images[page_num], known_text=text)
+                            page_text = pytesseract.image_to_string(images[page_num], lang=ocr_language)
                         except Exception as e:
                             logger.error(f"OCR failed on page {page_num + 1}: {str(e)}")
                     else:
@@ -224,45 +285,68 @@ class PDFProcessor:
             raise Exception(f"Error extracting page range: {str(e)}")
         return text
     
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[Dict[str, any]]:
+    def chunk_text(
+        self,
+        text: str,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        page_starts: Optional[List[int]] = None
+    ) -> List[Dict[str, any]]:
         """
         Split text into logical chunks with overlap.
         Tries to split at paragraph boundaries when possible.
+        When page_starts (from extract_text_with_pages) is given, each chunk
+        also records the 1-based page_start/page_end it was taken from.
         """
         chunks = []
         paragraphs = text.split('\n\n')
         
         current_chunk = ""
         chunk_id = 0
+        offset = 0
+        first_offset = last_start = last_end = None
+        
+        def page_of(position: int) -> int:
+            return max(bisect.bisect_right(page_starts, position), 1)
         
-        for para in paragraphs:
-            para = para.strip()
+        def make_chunk() -> Dict[str, any]:
+            chunk = {
+                "id": chunk_id,
+                "text": current_chunk.strip(),
+                "char_count": len(current_chunk)
+            }
+            if page_starts and first_offset is not None:
+                chunk["page_start"] = page_of(first_offset)
+                chunk["page_end"] = page_of(last_end)
+            return chunk
+        
+        for raw_para in paragraphs:
+            para_offset = offset
+            offset += len(raw_para) + 2
+            para = raw_para.strip()
             if not para:
                 continue
             
             # If adding this paragraph would exceed chunk_size
             if len(current_chunk) + len(para) > chunk_size and current_chunk:
-                chunks.append({
-                    "id": chunk_id,
-                    "text": current_chunk.strip(),
-                    "char_count": len(current_chunk)
-                })
+                chunks.append(make_chunk())
                 chunk_id += 1
                 
                 # Keep overlap from previous chunk
                 words = current_chunk.split()
                 overlap_text = " ".join(words[-overlap:]) if len(words) > overlap else current_chunk
                 current_chunk = overlap_text + "\n\n" + para
+                first_offset = last_start
             else:
                 current_chunk += "\n\n" + para if current_chunk else para
+                if first_offset is None:
+                    first_offset = para_offset
+            last_start = para_offset
+            last_end = para_offset + max(len(raw_para.rstrip()) - 1, 0)
         
         # Add the last chunk
         if current_chunk:
-            chunks.append({
-                "id": chunk_id,
-                "text": current_chunk.strip(),
-                "char_count": len(current_chunk)
-            })
+            chunks.append(make_chunk())
         
         return chunks
     
@@ -0,0 +1,219 @@
+"""
+Background pre-translation of approved modules
+An approved module is translated into the primary languages of clusters with
+a similar profile (they are the likeliest to ask for it next) and a PDF is
+rendered per language, so a later request for that language is served from
+disk. The translated segments also land in the translation memory, which
+makes related modules cheaper to translate.
+
+Jobs live in memory in the worker process that started them.
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs are kept this long for status polling
+JOB_RETENTION_SECONDS = 3600
+
+_WORD = re.compile(r"\w+")
+
+
+def _same(a: Optional[str], b: Optional[str]) -> float:
+    return 1.0 if (a or "").strip().lower() == (b or "").strip().lower() != "" else 0.0
+
+
+def _words(text: Optional[str]) -> set:
+    return set(_WORD.findall((text or "").lower()))
+
+
+def profile_similarity(a: Any, b: Any) -> float:
+    """
+    Similarity of two cluster profiles (0-1)
+
+    The mean of: same region type, same infrastructure level, and the
+    word-set Jaccard similarity of their key issues.
+    """
+    issues_a, issues_b = _words(a.specific_challenges), _words(b.specific_challenges)
+    issues = len(issues_a & issues_b) / len(issues_a | issues_b) if issues_a or issues_b else 0.0
+    return (_same(a.geographic_type, b.geographic_type) + _same(a.infrastructure_level, b.infrastructure_level) + issues) / 3
+
+
+def pretranslation_languages(
+    cluster: Any,
+    clusters: Iterable[Any],
+    module_language: str,
+    supported: Iterable[str],
+    min_similarity: float = 0.5,
+    max_languages: int = 4
+) -> List[str]:
+    """
+    Languages to pre-translate a module into
+
+    Args:
+        cluster: The module's cluster
+        clusters: All clusters
+        module_language: Language the module is written in (skipped)
+        supported: Languages the translation service supports
+        min_similarity: Minimum profile_similarity of a cluster to count
+        max_languages: Most languages returned
+
+    Returns:
+        Primary languages of similar clusters, most similar cluster first
+    """
+    supported = set(supported)
+    ranked = sorted(
+        ((profile_similarity(cluster, other), other) for other in clusters if other.id != cluster.id),
+        key=lambda pair: pair[0],
+        reverse=True
+    )
+    languages: List[str] = []
+    for score, other in ranked:
+        if score < min_similarity or len(languages) >= max_languages:
+            break
+        language = (other.primary_language or "").strip().lower()
+        if language in supported and language != module_language and language not in languages:
+            languages.append(language)
+    return languages
+
+
+@dataclass
+class PretranslationJob:
+    module_id: int
+    languages: List[str]
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    _tasks: Dict[str, asyncio.Task] = field(default_factory=dict, repr=False)
+
+    @property
+    def status(self) -> str:
+        states = {result["status"] for result in self.results.values()}
+        if states & {"queued", "running"}:
+            return "running"
+        return "failed" if states == {"failed"} else "completed"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "module_id": self.module_id,
+            "status": self.status,
+            "languages": self.languages,
+            "results": [self.results[language] for language in self.languages],
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class PretranslationQueue:
+    """
+    Runs and tracks pre-translation jobs
+
+    Args:
+        concurrency: Languages being localized at once across all jobs (kept
+            low so the stage does not compete with interactive translation)
+    """
+
+    def __init__(self, concurrency: int = 2):
+        self.concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[int, PretranslationJob] = {}
+
+    def start(
+        self,
+        module_id: int,
+        languages: List[str],
+        localize: Callable[[str], Awaitable[Dict[str, Any]]]
+    ) -> PretranslationJob:
+        """
+        Start localizing a module in the background
+
+        Args:
+            module_id: Approved module
+            languages: Languages to localize into (duplicates ignored)
+            localize: Coroutine function translating the module into one
+                language and rendering its PDF (returns e.g. {"pdf_id": ...});
+                exceptions mark that language failed
+
+        Returns:
+            The running job (replaces one still running for the module)
+        """
+        self._expire()
+        self.cancel(module_id)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        languages = list(dict.fromkeys(languages))
+        job = PretranslationJob(module_id=module_id, languages=languages)
+        for language in languages:
+            job.results[language] = {"language": language, "status": "queued"}
+        self._jobs[module_id] = job
+        for language in languages:
+            job._tasks[language] = asyncio.create_task(self._run(job, language, localize))
+        if not languages:
+            job.finished_at = time.time()
+        return job
+
+    async def _run(self, job: PretranslationJob, language: str, localize: Callable[[str], Awaitable[Dict[str, Any]]]):
+        started = time.perf_counter()
+        try:
+            async with self._semaphore:
+                job.results[language]["status"] = "running"
+                try:
+                    result = await localize(language)
+                    job.results[language] = {"language": language, "status": "completed", **result}
+                    logger.info(
+                        f"Pre-translated module {job.module_id} into {language} "
+                        f"in {time.perf_counter() - started:.1f}s"
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Pre-translation of module {job.module_id} into {language} failed: {e}")
+                    job.results[language] = {"language": language, "status": "failed", "error": str(e)}
+        except asyncio.CancelledError:
+            job.results[language] = {"language": language, "status": "failed", "error": "cancelled"}
+            raise
+        finally:
+            if job.status != "running":
+                job.finished_at = time.time()
+
+    def get(self, module_id: int) -> Optional[PretranslationJob]:
+        return self._jobs.get(module_id)
+
+    async def wait(self, module_id: int, language: str) -> Optional[Dict[str, Any]]:
+        """Wait for a module's pending localization into language (None if there is none)"""
+        job = self._jobs.get(module_id)
+        task = job._tasks.get(language) if job else None
+        if task is None:
+            return None
+        # A caller giving up must not cancel the shared background work
+        await asyncio.wait([task])
+        return job.results[language]
+
+    def cancel(self, module_id: int):
+        """Stop a module's unfinished localizations (re-approval or deletion)"""
+        job = self._jobs.pop(module_id, None)
+        if job:
+            for task in job._tasks.values():
+                task.cancel()
+
+    def _expire(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for module_id in [j.module_id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[module_id]
+
+
+# Service instance
+_pretranslation_queue = None
+
+def get_pretranslation_queue() -> PretranslationQueue:
+    """Get singleton instance of the pre-translation queue"""
+    global _pretranslation_queue
+    if _pretranslation_queue is None:
+        from core.config import settings
+        _pretranslation_queue = PretranslationQueue(concurrency=settings.pretranslation_concurrency)
+    return _pretranslation_queue
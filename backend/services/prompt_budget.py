@@ -0,0 +1,253 @@
+"""
+Prompt token budgeting
+Counts tokens the way the Llama 3 tokenizer does so every LLM call site can
+size its input by tokens rather than characters: Devanagari and Tamil take
+several times more tokens per character than English.
+
+Uses a local tokenizer.json (HuggingFace `tokenizers`) when LLM_TOKENIZER_PATH
+is set. Otherwise a per-script estimator is used, and it calibrates itself from
+the prompt token counts Groq reports. The estimator classifies characters with
+one lookup table and counts them in bulk (NumPy when available, otherwise a
+single str.translate pass), so whole manuals can be sized cheaply.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from itertools import accumulate, repeat
+from typing import Dict, List, Optional
+import logging
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+try:
+    import numpy as np
+except ImportError:  # optional: counting falls back to str.translate
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Average characters per Llama 3 token by script (measured on manual text;
+# rounded down so the estimate errs on the side of more tokens)
+CHARS_PER_TOKEN = [
+    (0x0000, 0x007F, 4.0),   # ASCII
+    (0x0080, 0x024F, 2.5),   # Latin-1 / Latin Extended
+    (0x0600, 0x06FF, 2.2),   # Arabic (Urdu)
+    (0x0750, 0x077F, 2.2),
+    (0x0900, 0x097F, 2.2),   # Devanagari (Hindi, Marathi)
+    (0x0980, 0x09FF, 1.8),   # Bengali
+    (0x0A00, 0x0A7F, 1.6),   # Gurmukhi
+    (0x0A80, 0x0AFF, 1.6),   # Gujarati
+    (0x0B00, 0x0B7F, 1.3),   # Odia
+    (0x0B80, 0x0BFF, 1.5),   # Tamil
+    (0x0C00, 0x0C7F, 1.5),   # Telugu
+    (0x0C80, 0x0CFF, 1.4),   # Kannada
+    (0x0D00, 0x0D7F, 1.4),   # Malayalam
+]
+DEFAULT_CHARS_PER_TOKEN = 1.5
+
+# Chat format overhead per message and per request
+MESSAGE_OVERHEAD_TOKENS = 4
+REQUEST_OVERHEAD_TOKENS = 3
+
+_BOUNDARY = re.compile(r"[.!?।॥]\s|\n")
+
+
+# Code points at or above this cost DEFAULT_CHARS_PER_TOKEN
+_TABLE_SIZE = 0x0E00
+_RATIOS = sorted({ratio for _, _, ratio in CHARS_PER_TOKEN} | {DEFAULT_CHARS_PER_TOKEN})
+_DEFAULT_CLASS = _RATIOS.index(DEFAULT_CHARS_PER_TOKEN)
+# Estimated tokens per character of each class
+_CLASS_TOKENS = [1.0 / ratio for ratio in _RATIOS]
+
+
+def _build_table() -> bytes:
+    """Cost class for every code point below _TABLE_SIZE, plus the default class at the end"""
+    table = bytearray([_DEFAULT_CLASS]) * (_TABLE_SIZE + 1)
+    for start, end, ratio in CHARS_PER_TOKEN:
+        table[start:end + 1] = bytes([_RATIOS.index(ratio)]) * (end - start + 1)
+    return bytes(table)
+
+
+_CLASS_TABLE = _build_table()
+# Same table for str.translate: code points map to a control character naming
+# their class; code points past the table pass through (default class)
+_CLASS_CHARS = [chr(index) for index in range(len(_RATIOS))]
+_TRANSLATE_TABLE = {code_point: chr(index) for code_point, index in enumerate(_CLASS_TABLE[:_TABLE_SIZE])}
+_CHAR_TOKENS = {chr(index): tokens for index, tokens in enumerate(_CLASS_TOKENS)}
+_NUMPY_TABLE = np.frombuffer(_CLASS_TABLE, dtype=np.uint8) if np is not None else None
+_NUMPY_TOKENS = np.array(_CLASS_TOKENS) if np is not None else None
+
+
+def _classes(text: str):
+    return _NUMPY_TABLE[np.minimum(np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32), _TABLE_SIZE)]
+
+
+def _estimate(text: str) -> float:
+    """Uncalibrated token estimate of text"""
+    if _NUMPY_TABLE is not None:
+        counts = np.bincount(_classes(text), minlength=len(_RATIOS))
+        return float(counts @ _NUMPY_TOKENS)
+    classified = text.translate(_TRANSLATE_TABLE)
+    counts = [classified.count(char) for char in _CLASS_CHARS]
+    counts[_DEFAULT_CLASS] += len(text) - sum(counts)
+    return sum(count * tokens for count, tokens in zip(counts, _CLASS_TOKENS))
+
+
+def _estimate_prefix_length(text: str, limit: float) -> int:
+    """Longest prefix of text whose uncalibrated estimate stays below limit"""
+    if _NUMPY_TABLE is not None:
+        totals = np.cumsum(_NUMPY_TOKENS[_classes(text)])
+        return int(np.searchsorted(totals, limit, side="left"))
+    default = _CLASS_TOKENS[_DEFAULT_CLASS]
+    totals = list(accumulate(map(_CHAR_TOKENS.get, text.translate(_TRANSLATE_TABLE), repeat(default))))
+    return bisect_left(totals, limit)
+
+
+class TokenCounter:
+    """
+    Token counting and trimming with a real tokenizer or a calibrated estimate
+
+    Args:
+        tokenizer_path: Optional path to a Llama-compatible tokenizer.json
+    """
+
+    def __init__(self, tokenizer_path: Optional[str] = None):
+        self._tokenizer = None
+        self._lock = threading.Lock()
+        # Multiplier learned from reported usage (estimator mode only)
+        self.calibration = 1.0
+        self.stats = {"calls": 0, "predicted_prompt_tokens": 0, "actual_prompt_tokens": 0}
+        # Call site -> [predicted, actual] prompt tokens
+        self._call_sites: Dict[str, List[int]] = {}
+
+        if tokenizer_path and Tokenizer is not None:
+            try:
+                self._tokenizer = Tokenizer.from_file(tokenizer_path)
+                logger.info(f"Token counting with tokenizer from {tokenizer_path}")
+            except Exception as e:
+                logger.warning(f"Could not load tokenizer {tokenizer_path}, using estimator: {e}")
+        elif tokenizer_path:
+            logger.warning("tokenizers is not installed, using calibrated token estimator")
+
+    @property
+    def exact(self) -> bool:
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+        return int(_estimate(text) * self.calibration) + 1
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Prompt tokens of a chat request"""
+        return REQUEST_OVERHEAD_TOKENS + sum(
+            MESSAGE_OVERHEAD_TOKENS + self.count(message.get("content") or "") for message in messages
+        )
+
+    def trim(self, text: str, budget: int) -> str:
+        """
+        Cut text to at most budget tokens, preferring a sentence or line break
+        near the cut and never splitting a word
+        """
+        if budget <= 0:
+            return ""
+        if self.count(text) <= budget:
+            return text
+
+        if self._tokenizer is not None:
+            encoding = self._tokenizer.encode(text, add_special_tokens=False)
+            end = encoding.offsets[budget - 1][1]
+        else:
+            # count() <= budget exactly when the calibrated estimate is below budget;
+            # no prefix longer than budget / (cheapest tokens per char) can fit
+            limit = budget / self.calibration
+            end = _estimate_prefix_length(text[:int(limit * _RATIOS[-1]) + 1], limit)
+
+        cut = text[:end]
+        boundaries = [m.end() for m in _BOUNDARY.finditer(cut)]
+        if boundaries and boundaries[-1] > len(cut) * 0.8:
+            return cut[:boundaries[-1]].rstrip()
+        space = cut.rfind(" ")
+        return cut[:space] if space > len(cut) // 2 else cut
+
+    def record_usage(
+        self,
+        call_site: str,
+        predicted_prompt: int,
+        actual_prompt: int,
+        actual_total: int,
+        model: Optional[str] = None
+    ):
+        """
+        Log predicted vs reported prompt tokens and refine the estimator
+
+        Args:
+            call_site: What made the call (a model router task such as
+                "safety_check"), so estimate errors can be traced to prompts
+            model: Model that answered
+        """
+        if actual_prompt <= 0 or predicted_prompt <= 0:
+            return
+        error = (predicted_prompt - actual_prompt) / actual_prompt
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["predicted_prompt_tokens"] += predicted_prompt
+            self.stats["actual_prompt_tokens"] += actual_prompt
+            site = self._call_sites.setdefault(call_site, [0, 0])
+            site[0] += predicted_prompt
+            site[1] += actual_prompt
+            if not self.exact:
+                # Slow exponential average of the observed ratio, kept in a sane band
+                ratio = actual_prompt / (predicted_prompt / self.calibration)
+                self.calibration = min(2.0, max(0.5, 0.9 * self.calibration + 0.1 * ratio))
+
+        log = logger.warning if error < -0.1 else logger.info
+        log(
+            f"LLM tokens [{call_site}{f' on {model}' if model else ''}]: prompt predicted {predicted_prompt}, actual {actual_prompt} "
+            f"({error:+.0%}); total {actual_total}"
+        )
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            predicted = self.stats["predicted_prompt_tokens"]
+            actual = self.stats["actual_prompt_tokens"]
+            return {
+                "mode": "tokenizer" if self.exact else "estimator",
+                "calibration": round(self.calibration, 3),
+                "calls": self.stats["calls"],
+                "prompt_error": round((predicted - actual) / actual, 3) if actual else None,
+                "prompt_error_by_call_site": {
+                    site: round((site_predicted - site_actual) / site_actual, 3)
+                    for site, (site_predicted, site_actual) in self._call_sites.items()
+                },
+            }
+
+
+# Service instance
+_token_counter = None
+
+def get_token_counter() -> TokenCounter:
+    """Get singleton instance of the token counter"""
+    global _token_counter
+    if _token_counter is None:
+        try:
+            from core.config import settings
+            tokenizer_path = settings.llm_tokenizer_path
+        except Exception:
+            tokenizer_path = None
+        _token_counter = TokenCounter(tokenizer_path)
+    return _token_counter
+
+
+def count_tokens(text: str) -> int:
+    return get_token_counter().count(text)
+
+
+def trim_to_tokens(text: str, budget: int) -> str:
+    return get_token_counter().trim(text, budget)
@@ -1,18 +1,108 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
+from contextlib import contextmanager
+from pathlib import Path
+import os
 from core.config import settings
-from core.vector_store import ChromaVectorStore
+from core.vector_store import create_vector_store
+from services.index_snapshot import IndexSnapshotService
+from services.lexical_index import LexicalIndex
+from services.context_packer import ContextPacker, PackedContext
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Reciprocal Rank Fusion constant; 60 is the value from the original RRF paper
+RRF_K = 60
+
 class RAGEngine:
     def __init__(self):
-        # Use ChromaDB for efficient vector storage and retrieval
-        self.vector_store = ChromaVectorStore(
-            persist_directory=settings.chroma_persist_directory
-        )
+        # Use ChromaDB for efficient vector storage and retrieval (in-process,
+        # or via the single-writer vector service when one is configured)
+        self.vector_store = create_vector_store()
+        
+        # BM25 index stored next to the vector index, fused with vector results
+        self.hybrid_search = settings.hybrid_search_enabled
+        self.lexical_index = LexicalIndex()
+        self.lexical_index_path = Path(settings.chroma_persist_directory) / "lexical_index.bin"
+        self._lexical_mtime = None
         
-        logger.info("RAG Engine initialized with ChromaDB")
+        self.context_packer = ContextPacker(max_distance=settings.rag_max_distance)
+        
+        if self.hybrid_search:
+            try:
+                self._load_lexical_index()
+            except Exception as e:
+                logger.error(f"Lexical index unavailable, using vector search only: {e}")
+                self.hybrid_search = False
+        
+        logger.info(f"RAG Engine initialized with ChromaDB (hybrid BM25: {self.hybrid_search})")
+    
+    @contextmanager
+    def _lexical_lock(self):
+        """Serialize lexical index writes across worker processes"""
+        self.lexical_index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(self.lexical_index_path) + ".lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _refresh_lexical_index(self):
+        """Reload the lexical index if another process rewrote it"""
+        try:
+            mtime = os.stat(self.lexical_index_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._lexical_mtime:
+            self.lexical_index = LexicalIndex.load(str(self.lexical_index_path))
+            self._lexical_mtime = mtime
+    
+    def _save_lexical_index(self):
+        self.lexical_index.save(str(self.lexical_index_path))
+        self._lexical_mtime = os.stat(self.lexical_index_path).st_mtime_ns
+    
+    def _load_lexical_index(self):
+        """Load the lexical index, building it from the vector store on first run"""
+        with self._lexical_lock():
+            if self.lexical_index_path.exists():
+                self._refresh_lexical_index()
+                return
+            
+            # Backfill manuals indexed before hybrid search existed
+            self._rebuild_lexical_index()
+    
+    def _rebuild_lexical_index(self):
+        """Rebuild the lexical index from every chunk in the vector store (caller holds the lock)"""
+        index = LexicalIndex()
+        for batch in self.vector_store.export_records():
+            index.add_documents(
+                ids=batch['ids'],
+                texts=batch['documents'],
+                manual_ids=[str((m or {}).get('manual_id', '')) for m in batch['metadatas']]
+            )
+        self.lexical_index = index
+        self._save_lexical_index()
+        logger.info(f"Built lexical index for {len(index)} chunks")
+    
+    def _update_lexical_index(self, update: Callable[[LexicalIndex], None]):
+        """Apply an update to the shared lexical index and persist it"""
+        if not self.hybrid_search:
+            return
+        try:
+            with self._lexical_lock():
+                self._refresh_lexical_index()
+                update(self.lexical_index)
+                self._save_lexical_index()
+        except Exception as e:
+            logger.error(f"Error updating lexical index: {str(e)}")
     
     def index_manual(self, manual_id: int, chunks: List[Dict]) -> bool:
         """
@@ -36,11 +126,15 @@ class RAGEngine:
                 
                 documents.append(chunk_text)
                 ids.append(chunk_id)
-                metadatas.append({
+                metadata = {
                     "manual_id": str(manual_id),
                     "chunk_id": chunk['id'],
                     "char_count": chunk['char_count']
-                })
+                }
+                if 'page_start' in chunk:
+                    metadata["page_start"] = chunk['page_start']
+                    metadata["page_end"] = chunk['page_end']
+                metadatas.append(metadata)
             
             # Add to vector store
             self.vector_store.add_documents(
@@ -49,6 +143,11 @@ class RAGEngine:
                 ids=ids
             )
             
+            # Add to the lexical index alongside
+            self._update_lexical_index(
+                lambda index: index.add_documents(ids, documents, [str(manual_id)] * len(ids))
+            )
+            
             logger.info(f"Indexed {len(chunks)} chunks for manual {manual_id}")
             return True
             
@@ -60,26 +159,36 @@ class RAGEngine:
         self, 
         query: str, 
         manual_id: Optional[int] = None, 
-        top_k: int = 5
+        top_k: int = 5,
+        manual_ids: Optional[List[int]] = None
     ) -> List[Dict]:
         """
-        Search for relevant chunks using semantic similarity
+        Search for relevant chunks using semantic similarity, fused with BM25
+        keyword matches when hybrid search is enabled
         
         Args:
             query: Search query
             manual_id: Optional manual ID to filter results
             top_k: Number of top results to return
+            manual_ids: Optional list of manual IDs to search across
         
         Returns:
             List of search results with content and metadata
         """
         try:
             # Prepare filter
-            where_filter = {"manual_id": str(manual_id)} if manual_id else None
+            scope = [str(m) for m in manual_ids] if manual_ids else ([str(manual_id)] if manual_id else None)
+            if scope and len(scope) > 1:
+                where_filter = {"manual_id": {"$in": scope}}
+            else:
+                where_filter = {"manual_id": scope[0]} if scope else None
+            
+            # Fetch a wider candidate pool when results will be fused
+            candidate_k = max(top_k * 2, top_k + 5) if self.hybrid_search else top_k
             
             results = self.vector_store.search(
                 query=query,
-                n_results=top_k,
+                n_results=candidate_k,
                 filter_metadata=where_filter
             )
             
@@ -88,11 +197,16 @@ class RAGEngine:
             if results['documents'] and len(results['documents']) > 0:
                 for i, doc in enumerate(results['documents'][0]):
                     formatted_results.append({
+                        "id": results['ids'][0][i] if results.get('ids') else None,
                         "content": doc,
                         "metadata": results['metadatas'][0][i] if results['metadatas'] else {},
                         "distance": results['distances'][0][i] if results['distances'] else None
                     })
             
+            if self.hybrid_search:
+                formatted_results = self._fuse_lexical(query, scope, formatted_results, candidate_k)
+            
+            formatted_results = formatted_results[:top_k]
             logger.info(f"Search returned {len(formatted_results)} results for query: {query[:50]}...")
             return formatted_results
             
@@ -100,11 +214,71 @@ class RAGEngine:
             logger.error(f"Error searching: {str(e)}")
             return []
     
+    def _fuse_lexical(
+        self,
+        query: str,
+        manual_ids: Optional[List[str]],
+        vector_results: List[Dict],
+        candidate_k: int
+    ) -> List[Dict]:
+        """
+        Merge vector and BM25 rankings with Reciprocal Rank Fusion
+        Chunks found by both rank highest; keyword-only hits are fetched from
+        the vector store so callers get the same result shape.
+        """
+        try:
+            self._refresh_lexical_index()
+            lexical_hits = self.lexical_index.search(
+                query,
+                top_k=candidate_k,
+                manual_ids=manual_ids
+            )
+        except Exception as e:
+            logger.error(f"Lexical search failed, using vector results only: {e}")
+            return vector_results
+        
+        if not lexical_hits:
+            return vector_results
+        
+        by_id = {result["id"]: result for result in vector_results if result["id"]}
+        scores: Dict[str, float] = {}
+        sources: Dict[str, set] = {}
+        
+        for rank, result in enumerate(vector_results):
+            scores[result["id"]] = scores.get(result["id"], 0.0) + 1 / (RRF_K + rank + 1)
+            sources.setdefault(result["id"], set()).add("vector")
+        for rank, (doc_id, _) in enumerate(lexical_hits):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1 / (RRF_K + rank + 1)
+            sources.setdefault(doc_id, set()).add("lexical")
+        
+        missing = [doc_id for doc_id, _ in lexical_hits if doc_id not in by_id]
+        if missing:
+            fetched = self.vector_store.get_documents(missing)
+            for i, doc_id in enumerate(fetched['ids']):
+                by_id[doc_id] = {
+                    "id": doc_id,
+                    "content": fetched['documents'][i],
+                    "metadata": fetched['metadatas'][i] or {},
+                    "distance": None
+                }
+        
+        fused = []
+        for doc_id in sorted(scores, key=scores.get, reverse=True):
+            if doc_id not in by_id:
+                continue  # Stale lexical entry for a chunk no longer in the vector store
+            result = dict(by_id[doc_id])
+            result["score"] = scores[doc_id]
+            result["match"] = "both" if len(sources[doc_id]) == 2 else sources[doc_id].pop()
+            fused.append(result)
+        
+        return fused
+    
     def get_context_for_topic(
         self, 
         topic: str, 
         manual_id: int, 
-        max_chunks: int = 3
+        max_chunks: int = 3,
+        token_budget: Optional[int] = None
     ) -> str:
         """
         Get relevant context for a specific topic from manual
@@ -113,10 +287,15 @@ class RAGEngine:
             topic: Topic to search for
             manual_id: Manual ID to search in
             max_chunks: Maximum number of chunks to retrieve
+            token_budget: Optional token budget; when given, chunks are packed
+                          (deduplicated, thresholded, sentence-trimmed) to fit it
         
         Returns:
             Combined context text
         """
+        if token_budget is not None:
+            return self.pack_context(topic, manual_id, token_budget, candidates=max_chunks).text
+        
         results = self.search(topic, manual_id=manual_id, top_k=max_chunks)
         
         if not results:
@@ -126,10 +305,38 @@ class RAGEngine:
         context = "\n\n".join([result['content'] for result in results])
         return context
     
+    def pack_context(
+        self,
+        topic: str,
+        manual_id: int,
+        token_budget: int,
+        candidates: int = 8
+    ) -> PackedContext:
+        """
+        Retrieve candidate chunks and pack the most relevant content into a token budget
+        
+        Args:
+            topic: Topic to search for
+            manual_id: Manual ID to search in
+            token_budget: Maximum tokens for the packed context
+            candidates: Number of ranked chunks to consider
+        
+        Returns:
+            PackedContext (text plus the candidates, so callers can re-pack smaller)
+        """
+        results = self.search(topic, manual_id=manual_id, top_k=candidates)
+        packed = self.context_packer.pack(results, token_budget)
+        logger.info(
+            f"Packed {packed.chunks_used}/{len(results)} chunks into ~{packed.tokens} tokens "
+            f"(budget {token_budget}, {packed.dropped_duplicate} duplicate, {packed.dropped_distance} off-topic)"
+        )
+        return packed
+    
     def delete_manual(self, manual_id: int) -> bool:
         """Delete all chunks for a specific manual"""
         try:
             self.vector_store.delete_collection(str(manual_id))
+            self._update_lexical_index(lambda index: index.remove_manual(str(manual_id)))
             logger.info(f"Deleted chunks for manual {manual_id}")
             return True
         except Exception as e:
@@ -140,18 +347,60 @@ class RAGEngine:
         """Reset the entire collection (use with caution)"""
         try:
             # Recreate the vector store
-            self.vector_store = ChromaVectorStore(
-                persist_directory=settings.chroma_persist_directory
-            )
+            self.vector_store = create_vector_store()
             logger.info("Vector store reset successfully")
             return True
         except Exception as e:
             logger.error(f"Error resetting collection: {str(e)}")
             return False
     
+    def create_snapshot(self, path: str, since: Optional[str] = None) -> Dict:
+        """
+        Export the index to a portable snapshot file
+        
+        Args:
+            path: Output file path
+            since: Previous snapshot to diff against (incremental snapshot)
+        
+        Returns:
+            Snapshot info
+        """
+        return IndexSnapshotService(self.vector_store).create_snapshot(path, since=since)
+    
+    def restore_snapshot(self, paths: List[str]) -> Dict:
+        """
+        Bulk-load a full snapshot plus optional incrementals into the index
+        
+        Args:
+            paths: Full snapshot first, then incrementals in creation order
+        
+        Returns:
+            Restore summary
+        """
+        summary = IndexSnapshotService(self.vector_store).restore_snapshot(paths)
+        
+        # Snapshots carry chunk texts, so the BM25 index is rebuilt locally
+        if self.hybrid_search:
+            with self._lexical_lock():
+                self._rebuild_lexical_index()
+        return summary
+    
     def get_stats(self) -> Dict:
         """Get statistics about the indexed content"""
         return {
             "total_documents": self.vector_store.get_collection_size(),
-            "embedding_model": "all-MiniLM-L6-v2"
+            "embedding_model": "all-MiniLM-L6-v2",
+            "hybrid_search": self.hybrid_search,
+            "lexical_index": self.lexical_index.get_stats() if self.hybrid_search else None
         }
+
+
+# Service instance
+_rag_engine = None
+
+def get_rag_engine() -> RAGEngine:
+    """Get singleton instance of the RAG engine (one vector store client per process)"""
+    global _rag_engine
+    if _rag_engine is None:
+        _rag_engine = RAGEngine()
+    return _rag_engine
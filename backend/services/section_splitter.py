@@ -0,0 +1,103 @@
+"""
+Content-defined sectioning of long documents
+Splits manual text into section-sized pieces for map-reduce summarization.
+Boundaries are chosen from the content of each paragraph (not from absolute
+offsets), so editing one part of a manual only changes the sections around
+the edit and the rest keep their hashes - and their cached summaries.
+"""
+
+import hashlib
+import zlib
+from typing import Callable, List
+
+from services.context_packer import split_sentences
+from services.prompt_budget import count_tokens
+
+# Characters per token no script exceeds; bounds the text counted per cut
+CUT_WINDOW_CHARS = 8
+
+
+def _pieces(text: str, max_tokens: int, count: Callable[[str], int]) -> List[str]:
+    """Paragraphs, with any paragraph over max_tokens broken at sentence (then character) boundaries"""
+    pieces = []
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+
+        current = ""
+        for sentence in split_sentences(paragraph):
+            while len(sentence) > max_tokens * CUT_WINDOW_CHARS or count(sentence) > max_tokens:
+                # A "sentence" this long is usually OCR output without punctuation;
+                # only a bounded window is counted per cut, so long blobs stay linear
+                window = sentence[:max_tokens * CUT_WINDOW_CHARS]
+                window_tokens = count(window)
+                cut = len(window) if window_tokens <= max_tokens else max(1, len(window) * max_tokens // window_tokens)
+                while cut > 1 and count(window[:cut]) > max_tokens:
+                    cut = cut * 9 // 10
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:]
+            candidate = f"{current} {sentence}".strip()
+            if current and count(candidate) > max_tokens:
+                pieces.append(current)
+                current = sentence
+            else:
+                current = candidate
+        if current:
+            pieces.append(current)
+    return pieces
+
+
+def split_sections(
+    text: str,
+    target_tokens: int = 1500,
+    max_tokens: int = 2000,
+    boundary_every: int = 4,
+    count: Callable[[str], int] = count_tokens
+) -> List[str]:
+    """
+    Split text into sections of roughly target_tokens
+
+    A section may end after any paragraph once it reaches half the target,
+    if that paragraph's checksum is divisible by boundary_every (a content-
+    defined boundary), and must end before exceeding max_tokens.
+
+    Args:
+        text: Document text (paragraphs separated by blank lines)
+        target_tokens: Typical section size
+        max_tokens: Hard upper bound per section
+        boundary_every: Average paragraphs between content-defined boundaries
+        count: Token counter
+
+    Returns:
+        Sections in document order
+    """
+    sections = []
+    current: List[str] = []
+    current_tokens = 0
+    min_tokens = target_tokens // 2
+
+    for piece in _pieces(text, max_tokens, count):
+        piece_tokens = count(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            sections.append("\n\n".join(current))
+            current, current_tokens = [], 0
+
+        current.append(piece)
+        current_tokens += piece_tokens
+
+        content_boundary = zlib.crc32(piece.encode('utf-8')) % boundary_every == 0
+        if current_tokens >= target_tokens or (current_tokens >= min_tokens and content_boundary):
+            sections.append("\n\n".join(current))
+            current, current_tokens = [], 0
+
+    if current:
+        sections.append("\n\n".join(current))
+    return sections
+
+
+def section_hash(section: str) -> str:
+    return hashlib.sha256(section.encode('utf-8')).hexdigest()[:16]
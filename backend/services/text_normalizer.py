@@ -0,0 +1,55 @@
+"""
+Unicode normalization for Indian language text
+NFC composition keeps Devanagari and other Indic syllables together, and stray
+zero-width characters (which split otherwise identical words) are removed.
+The Zero Width Joiner is kept because some conjuncts need it.
+
+ASCII text is returned as-is (it is already NFC and has no zero-width
+characters), and short texts such as key points and headings are memoized.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+# Removed: zero-width space, ZWNJ and BOM (not ZWJ, U+200D)
+ZERO_WIDTH_CHARS = ("\u200b", "\u200c", "\ufeff")
+
+# Texts up to this length are memoized; longer ones (whole manuals) are not kept
+MEMO_MAX_CHARS = 2000
+MEMO_SIZE = 4096
+
+
+def _normalize(text: str) -> str:
+    # normalize() returns its input when the quick check already says NFC
+    text = unicodedata.normalize("NFC", text)
+    # str.replace is a C-level substring scan; on megabytes of text it is far
+    # faster than str.translate, which looks up every character
+    for char in ZERO_WIDTH_CHARS:
+        if char in text:
+            text = text.replace(char, "")
+    return text
+
+
+_normalize_memoized = lru_cache(maxsize=MEMO_SIZE)(_normalize)
+
+
+def normalize_indic_text(text: str) -> str:
+    """
+    NFC-normalize text and remove zero-width characters other than ZWJ
+
+    Args:
+        text: Text in any script
+
+    Returns:
+        The normalized text
+    """
+    if not text or text.isascii():
+        return text
+    if len(text) <= MEMO_MAX_CHARS:
+        return _normalize_memoized(text)
+    return _normalize(text)
+
+
+def cache_info():
+    """Hit/miss counts of the memo for short texts"""
+    return _normalize_memoized.cache_info()
@@ -0,0 +1,432 @@
+"""
+Translation backends
+TranslationService routes each language pair to one of these:
+
+- GoogleTranslateBackend: Google Translate over the network (the page
+  deep-translator reads, fetched on the shared keep-alive HTTP pool), with
+  many short segments packed into each request
+- IndicTrans2Backend: AI4Bharat IndicTrans2 running locally on the CPU from
+  settings.indictrans2_model_dir, so translation keeps working offline
+- DictionaryBackend: deterministic lookups for tests and development
+
+Backends take and return plain segments (language codes are ISO 639-1, as in
+TranslationService.LANGUAGE_CODES); a None result marks a segment the backend
+could not translate so the service can try another backend.
+"""
+
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import httpx
+from bs4 import BeautifulSoup
+
+from core.http_transport import get_http_transport
+from core.resilience import OPEN, CircuitOpen
+from services.translation_executor import TranslationExecutor
+
+logger = logging.getLogger(__name__)
+
+# Google Translate rejects requests over 5000 characters; leave headroom
+MAX_REQUEST_CHARS = 4500
+GOOGLE_TRANSLATE_URL = "https://translate.google.com/m"
+GOOGLE_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+# Sentinel line between packed segments: "§§12§§". Translation may add spaces
+# or turn the number into native digits (१२), which \d and int() both accept.
+SENTINEL = "\n§§{}§§\n"
+_SENTINEL_SPLIT = re.compile(r"\s*§\s*§\s*(\d+)\s*§\s*§\s*")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class TranslationBackend:
+    """Base class: translate a list of segments for one language pair"""
+
+    name = "base"
+    # Whether the service may use this backend when the routed one fails
+    fallback = True
+
+    def supports(self, src_code: str, tgt_code: str) -> bool:
+        return True
+
+    def translate_batch(self, segments: List[str], src_code: str, tgt_code: str) -> List[Optional[str]]:
+        """
+        Translate segments
+
+        Returns:
+            One translation per segment, in order (None where it failed)
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(getattr(self, "stats", {}))
+
+
+class GoogleWebTranslator:
+    """
+    One language pair of Google Translate's mobile page, the same request
+    deep-translator makes, but sent on a pooled client so consecutive
+    requests reuse a kept-alive connection instead of a new TLS handshake
+
+    Args:
+        client: Shared HTTP client
+        source: Source language code
+        target: Target language code
+    """
+
+    def __init__(self, client: httpx.Client, source: str, target: str):
+        self.client = client
+        self.source = source
+        self.target = target
+
+    def translate(self, text: str) -> str:
+        text = text.strip()
+        if not text or self.source == self.target:
+            return text
+        response = self.client.get(GOOGLE_TRANSLATE_URL, params={"tl": self.target, "sl": self.source, "q": text})
+        # A 429 raises HTTPStatusError; the executor treats its status as throttling
+        response.raise_for_status()
+        soup = BeautifulSoup(response.text, "html.parser")
+        element = soup.find("div", {"class": "t0"}) or soup.find("div", {"class": "result-container"})
+        if element is None:
+            raise ValueError(f"No translation found in Google Translate response for: {text[:50]}")
+        return element.get_text(strip=True)
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """
+    Google Translate over the shared HTTP transport
+
+    Segments are packed into requests of up to MAX_REQUEST_CHARS, each followed
+    by a numbered sentinel line, and the requests are sent concurrently within
+    the executor's limits. If a response cannot be split back into the same
+    numbered segments, that request's segments are translated one by one.
+
+    Args:
+        executor: Concurrency and rate limits for Google requests
+        client: HTTP client (default: one on the shared transport)
+    """
+
+    name = "google"
+
+    def __init__(self, executor: Optional[TranslationExecutor] = None, client: Optional[httpx.Client] = None):
+        self.executor = executor or TranslationExecutor(self.name)
+        self.client = client
+        self._translators: Dict[Tuple[str, str], GoogleWebTranslator] = {}
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "packed_fallbacks": 0}
+
+    def _translator(self, src_code: str, tgt_code: str) -> GoogleWebTranslator:
+        with self._stats_lock:
+            if self.client is None:
+                self.client = get_http_transport().client(timeout=GOOGLE_TIMEOUT)
+            key = (src_code, tgt_code)
+            if key not in self._translators:
+                self._translators[key] = GoogleWebTranslator(self.client, src_code, tgt_code)
+            return self._translators[key]
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def translate_batch(self, segments: List[str], src_code: str, tgt_code: str) -> List[Optional[str]]:
+        if self.executor.breaker.state == OPEN:
+            # Provider is failing: hand every segment to the next backend now
+            return [None] * len(segments)
+        packs = self._packs(segments)
+        # Packs are independent: translate them side by side, then reassemble in order
+        translated = self.executor.map(lambda pack: self._translate_pack(pack, src_code, tgt_code), packs)
+        return [text for pack in translated for text in pack]
+
+    def _translate_segment(self, text: str, src_code: str, tgt_code: str) -> Optional[str]:
+        """One request for one segment; None if it fails"""
+        try:
+            self._count("requests")
+            return self.executor.call(self._translator(src_code, tgt_code).translate, text)
+        except CircuitOpen:
+            return None
+        except Exception as e:
+            logger.error(f"Translation failed: {str(e)}")
+            return None
+
+    def _packs(self, segments: List[str]) -> List[List[str]]:
+        """Group segments into requests that stay under MAX_REQUEST_CHARS"""
+        packs: List[List[str]] = []
+        current: List[str] = []
+        size = 0
+        for text in segments:
+            cost = len(text) + len(SENTINEL.format(len(current)))
+            # Oversized segments and segments containing the sentinel travel alone
+            alone = cost > MAX_REQUEST_CHARS or "§" in text
+            if current and (alone or size + cost > MAX_REQUEST_CHARS):
+                packs.append(current)
+                current, size = [], 0
+            current.append(text)
+            size += cost
+            if alone:
+                packs.append(current)
+                current, size = [], 0
+        if current:
+            packs.append(current)
+        return packs
+
+    def _translate_pack(self, pack: List[str], src_code: str, tgt_code: str) -> List[Optional[str]]:
+        if len(pack) == 1:
+            return [self._translate_segment(pack[0], src_code, tgt_code)]
+
+        payload = "".join(text + SENTINEL.format(i) for i, text in enumerate(pack))
+        try:
+            self._count("requests")
+            translated = self.executor.call(self._translator(src_code, tgt_code).translate, payload)
+            parts = self._unpack(translated, len(pack))
+        except CircuitOpen:
+            return [None] * len(pack)
+        except Exception as e:
+            logger.warning(f"Packed translation request failed: {e}")
+            parts = None
+
+        if parts is None:
+            # Alignment lost (a sentinel was dropped or merged): one call per segment
+            self._count("packed_fallbacks")
+            logger.warning(f"Packed translation of {len(pack)} segments misaligned; translating individually")
+            return [self._translate_segment(text, src_code, tgt_code) for text in pack]
+        return parts
+
+    @staticmethod
+    def _unpack(translated: str, count: int) -> Optional[List[str]]:
+        """Split a packed response on its sentinels; None unless all count segments come back in order"""
+        pieces = _SENTINEL_SPLIT.split(translated or "")
+        # split() alternates text and captured numbers: t0, n0, t1, n1, ..., trailing text
+        texts, numbers, trailing = pieces[0:-1:2], pieces[1::2], pieces[-1]
+        if trailing.strip() or len(numbers) != count:
+            return None
+        try:
+            if [int(number) for number in numbers] != list(range(count)):
+                return None
+        except ValueError:
+            return None
+        if any(not text.strip() for text in texts):
+            return None
+        return [text.strip() for text in texts]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {**self.stats, "executor": self.executor.get_stats()}
+
+
+class IndicTrans2Backend(TranslationBackend):
+    """
+    IndicTrans2 (English to Indic) on the local CPU
+
+    The model is loaded once and kept resident. Segments from all callers go
+    through one queue; a worker thread collects them for up to batch_window_ms
+    (or max_batch_size sentences), groups them by language pair and runs one
+    generate() call per group, so concurrent requests share forward passes.
+
+    Args:
+        model_dir: A saved model directory, or the Hugging Face cache holding model_name
+        model_name: Hugging Face model id used when model_dir is a cache directory
+        num_threads: CPU threads torch may use
+        max_batch_size: Sentences per generate() call
+        batch_window_ms: How long to wait for more sentences before running a batch
+        num_beams: Beam width for generation
+        max_length: Token limit per sentence (input and output)
+    """
+
+    name = "local"
+
+    FLORES_CODES = {
+        "en": "eng_Latn",
+        "hi": "hin_Deva",
+        "mr": "mar_Deva",
+        "bn": "ben_Beng",
+        "te": "tel_Telu",
+        "ta": "tam_Taml",
+        "gu": "guj_Gujr",
+        "kn": "kan_Knda",
+        "ml": "mal_Mlym",
+        "pa": "pan_Guru",
+        "ur": "urd_Arab",
+        "or": "ory_Orya",
+    }
+
+    def __init__(
+        self,
+        model_dir: str,
+        model_name: str = "ai4bharat/indictrans2-en-indic-1B",
+        num_threads: int = 2,
+        max_batch_size: int = 16,
+        batch_window_ms: int = 20,
+        num_beams: int = 4,
+        max_length: int = 256
+    ):
+        self.model_dir = Path(model_dir)
+        self.model_name = model_name
+        self.num_threads = num_threads
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.num_beams = num_beams
+        self.max_length = max_length
+        self.model = None
+        self.tokenizer = None
+        self.processor = None
+        self.load_error: Optional[str] = None
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, str, str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {"sentences": 0, "batches": 0, "failures": 0}
+
+    def supports(self, src_code: str, tgt_code: str) -> bool:
+        # The en-indic model translates out of English only
+        return src_code == "en" and tgt_code != "en" and tgt_code in self.FLORES_CODES
+
+    def load(self) -> bool:
+        """Load the model (once) and keep it resident; False if it cannot be loaded"""
+        with self._load_lock:
+            if self.model is not None:
+                return True
+            if self.load_error is not None:
+                return False
+            try:
+                import torch
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+                torch.set_num_threads(self.num_threads)
+                if (self.model_dir / "config.json").exists():
+                    source, options = str(self.model_dir), {}
+                else:
+                    source, options = self.model_name, {"cache_dir": str(self.model_dir)}
+                started = time.perf_counter()
+                # local_files_only: never reach for the network from the offline backend
+                self.tokenizer = AutoTokenizer.from_pretrained(
+                    source, trust_remote_code=True, local_files_only=True, **options
+                )
+                self.model = AutoModelForSeq2SeqLM.from_pretrained(
+                    source, trust_remote_code=True, local_files_only=True, **options
+                )
+                self.model.eval()
+                try:
+                    from IndicTransToolkit import IndicProcessor
+                    self.processor = IndicProcessor(inference=True)
+                except ImportError:
+                    logger.info("IndicTransToolkit not installed; using plain language tags for IndicTrans2")
+            except Exception as e:
+                self.load_error = str(e)
+                logger.error(f"Local translation model could not be loaded from {self.model_dir}: {e}")
+                return False
+
+            logger.info(
+                f"IndicTrans2 loaded in {time.perf_counter() - started:.1f}s "
+                f"({self.num_threads} CPU threads, batches of up to {self.max_batch_size})"
+            )
+            return True
+
+    def translate_batch(self, segments: List[str], src_code: str, tgt_code: str) -> List[Optional[str]]:
+        if not self.load():
+            return [None] * len(segments)
+        self._start_worker()
+
+        # The model works sentence by sentence; long segments are split and rejoined
+        pieces = [[s for s in _SENTENCE_END.split(segment.strip()) if s] for segment in segments]
+        futures = [[self._submit(sentence, src_code, tgt_code) for sentence in sentences] for sentences in pieces]
+        results: List[Optional[str]] = []
+        for sentence_futures in futures:
+            translated = [future.result() for future in sentence_futures]
+            results.append(None if any(t is None for t in translated) else " ".join(translated))
+        return results
+
+    def _start_worker(self):
+        with self._load_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._batch_loop, name="indictrans2-batcher", daemon=True)
+                self._worker.start()
+
+    def _submit(self, sentence: str, src_code: str, tgt_code: str) -> Future:
+        future: Future = Future()
+        self._queue.put((sentence, self.FLORES_CODES[src_code], self.FLORES_CODES[tgt_code], future))
+        return future
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            groups: Dict[Tuple[str, str], List[Tuple[str, Future]]] = {}
+            for sentence, src, tgt, future in batch:
+                groups.setdefault((src, tgt), []).append((sentence, future))
+            for (src, tgt), items in groups.items():
+                try:
+                    outputs = self._generate([sentence for sentence, _ in items], src, tgt)
+                except Exception as e:
+                    logger.error(f"Local translation batch failed: {e}")
+                    self.stats["failures"] += 1
+                    outputs = [None] * len(items)
+                self.stats["batches"] += 1
+                self.stats["sentences"] += len(items)
+                for (_, future), output in zip(items, outputs):
+                    future.set_result(output)
+
+    def _generate(self, sentences: List[str], src: str, tgt: str) -> List[str]:
+        import torch
+
+        if self.processor is not None:
+            inputs = self.processor.preprocess_batch(sentences, src_lang=src, tgt_lang=tgt)
+        else:
+            inputs = [f"{src} {tgt} {sentence}" for sentence in sentences]
+        encoded = self.tokenizer(
+            inputs, padding="longest", truncation=True, max_length=self.max_length, return_tensors="pt"
+        )
+        with torch.inference_mode():
+            generated = self.model.generate(
+                **encoded, num_beams=self.num_beams, max_length=self.max_length, use_cache=True
+            )
+        outputs = self.tokenizer.batch_decode(generated, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+        if self.processor is not None:
+            outputs = self.processor.postprocess_batch(outputs, lang=tgt)
+        return [output.strip() for output in outputs]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "loaded": self.model is not None,
+            "load_error": self.load_error,
+            "queued": self._queue.qsize(),
+        }
+
+
+class DictionaryBackend(TranslationBackend):
+    """
+    Deterministic translations for tests and development
+
+    Known segments come from entries; anything else is returned tagged with
+    the target code ("[hi] Ask questions") so it is visibly "translated".
+
+    Args:
+        entries: {(src_code, tgt_code): {segment: translation}}
+    """
+
+    name = "dictionary"
+    fallback = False
+
+    def __init__(self, entries: Optional[Dict[Tuple[str, str], Dict[str, str]]] = None):
+        self.entries = entries or {}
+        self.stats = {"segments": 0}
+
+    def translate_batch(self, segments: List[str], src_code: str, tgt_code: str) -> List[Optional[str]]:
+        self.stats["segments"] += len(segments)
+        known = self.entries.get((src_code, tgt_code), {})
+        return [known.get(segment, f"[{tgt_code}] {segment}") for segment in segments]
@@ -0,0 +1,246 @@
+"""
+Concurrent translation executor
+Runs independent translation requests side by side while keeping each
+provider within its concurrency and requests-per-second limits. Throttling
+responses (HTTP 429) pause every caller of that provider, then the request is
+retried with exponential backoff.
+
+Provider clients (the pooled Google Translate client) are blocking, so requests run on a small
+thread pool; async code reaches it through asyncio.to_thread as before.
+
+Each provider has a circuit breaker (core.resilience): after repeated failures
+or slow calls, requests fail fast with CircuitOpen and the translation service
+falls back, instead of every caller waiting out the timeout. Requests are
+idempotent, so one that has not answered within the provider's recent p95
+latency is hedged with a second copy when a slot and rate budget are free.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+import logging
+
+from core.resilience import CircuitBreaker, LatencyWindow, get_circuit_breaker, hedged_call
+from services.llm_scheduler import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TranslationThrottled(Exception):
+    """Raised when a provider keeps throttling after all retries"""
+
+
+def is_throttled(error: Exception) -> bool:
+    """
+    Whether a provider error means "slow down": an HTTP 429 status (on the
+    error or its response) or a TooManyRequests error. The message is not
+    searched, so a "429" inside a URL or an ID is an ordinary failure.
+    """
+    if type(error).__name__ == "TooManyRequests":
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+class TranslationExecutor:
+    """
+    Concurrency and rate limits for one translation provider
+
+    Args:
+        provider: Provider name (for logs and stats)
+        max_concurrency: Requests in flight at once
+        requests_per_second: Sustained request rate (bursts up to one second's worth)
+        max_retries: Retries of a throttled request before giving up
+        backoff_seconds: First backoff delay; doubles on each retry
+        breaker: Circuit breaker for the provider (default: a private one)
+        hedge_min_seconds: Shortest wait before hedging; None disables hedging
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_concurrency: int = 4,
+        requests_per_second: float = 5.0,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_min_seconds: Optional[float] = None
+    ):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(capacity=max(1.0, requests_per_second), rate=requests_per_second)
+        self._bucket_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"translate-{provider}")
+        self._worker = threading.local()
+        self._in_flight = 0
+        self.breaker = breaker or CircuitBreaker(provider)
+        self.hedge_min_seconds = hedge_min_seconds
+        self.latency = LatencyWindow()
+        # Every request in flight plus one hedge each
+        self._hedge_pool = ThreadPoolExecutor(max_workers=2 * max_concurrency, thread_name_prefix=f"hedge-{provider}")
+        self.stats = {"requests": 0, "throttled": 0, "failures": 0, "peak_in_flight": 0, "hedges": 0, "hedge_wins": 0}
+
+    def _wait_for_rate(self):
+        while True:
+            with self._bucket_lock:
+                wait = self._bucket.time_until(1)
+                if wait == 0:
+                    self._bucket.take(1)
+                    return
+            time.sleep(wait)
+
+    def call(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Make one provider request within the limits, retrying on throttling
+
+        Args:
+            fn: Blocking, idempotent function that makes the request
+            *args: Arguments for fn
+
+        Returns:
+            fn's return value (other exceptions propagate unchanged)
+
+        Raises:
+            CircuitOpen: The provider's breaker is open
+        """
+        for attempt in range(self.max_retries + 1):
+            self.breaker.allow()
+            self._wait_for_rate()
+            with self._slots:
+                self._started()
+                started = time.perf_counter()
+                try:
+                    result = self._attempt(fn, args)
+                except Exception as e:
+                    if not is_throttled(e):
+                        self.breaker.record_failure(e)
+                        with self._bucket_lock:
+                            self.stats["failures"] += 1
+                        raise
+                    # Throttling is the provider pacing us, not failing
+                    self.breaker.release()
+                    delay = self.backoff_seconds * (2 ** attempt) * random.uniform(1.0, 1.5)
+                    with self._bucket_lock:
+                        self.stats["throttled"] += 1
+                        # Hold back every caller of this provider, not just this one
+                        self._bucket.empty(penalty_seconds=delay)
+                    logger.warning(f"{self.provider} throttled translation request; retrying in {delay:.1f}s")
+                else:
+                    self.breaker.record_success(time.perf_counter() - started)
+                    return result
+                finally:
+                    self._finished()
+        with self._bucket_lock:
+            self.stats["failures"] += 1
+        raise TranslationThrottled(f"{self.provider} kept throttling after {self.max_retries} retries")
+
+    def _started(self):
+        with self._bucket_lock:
+            self._in_flight += 1
+            self.stats["requests"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self._in_flight)
+
+    def _finished(self):
+        with self._bucket_lock:
+            self._in_flight -= 1
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long a request may run before it is hedged (None: no hedging yet)"""
+        if self.hedge_min_seconds is None:
+            return None
+        p95 = self.latency.percentile(0.95)
+        return None if p95 is None else max(self.hedge_min_seconds, p95)
+
+    def _attempt(self, fn: Callable[..., T], args: tuple) -> T:
+        def timed(*call_args: Any) -> T:
+            started = time.perf_counter()
+            result = fn(*call_args)
+            self.latency.record(time.perf_counter() - started)
+            return result
+
+        return hedged_call(self._hedge_pool, timed, args, self.hedge_delay(), self._reserve_hedge, self._hedge_sent)
+
+    def _reserve_hedge(self) -> bool:
+        """A slot and a rate token for a hedge, only if both are free right now"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._bucket_lock:
+            if self._bucket.time_until(1) == 0:
+                self._bucket.take(1)
+                return True
+        self._slots.release()
+        return False
+
+    def _hedge_sent(self, primary, hedge):
+        self._started()
+        with self._bucket_lock:
+            self.stats["hedges"] += 1
+
+        def done(future):
+            self._finished()
+            self._slots.release()
+            primary_lost = not primary.done() or primary.exception() is not None
+            if future.exception() is None and primary_lost:
+                with self._bucket_lock:
+                    self.stats["hedge_wins"] += 1
+
+        hedge.add_done_callback(done)
+
+    def map(self, fn: Callable[[Any], T], items: Iterable[Any]) -> List[T]:
+        """
+        Apply fn to every item concurrently; results come back in input order
+
+        fn should reach the provider through call(). Calls made from inside a
+        worker thread run inline so nested batches cannot exhaust the pool.
+        """
+        items = list(items)
+        if len(items) <= 1 or getattr(self._worker, "active", False):
+            return [fn(item) for item in items]
+        return list(self._pool.map(lambda item: self._run_in_worker(fn, item), items))
+
+    def _run_in_worker(self, fn: Callable[[Any], T], item: Any) -> T:
+        self._worker.active = True
+        try:
+            return fn(item)
+        finally:
+            self._worker.active = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._bucket_lock:
+            return {
+                **self.stats,
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "requests_per_second": self._bucket.rate,
+                "hedge_delay": self.hedge_delay(),
+                "breaker": self.breaker.get_stats(),
+            }
+
+
+# Service instance
+_translation_executors: Dict[str, TranslationExecutor] = {}
+_executors_lock = threading.Lock()
+
+def get_translation_executor(provider: str = "google") -> TranslationExecutor:
+    """Get the shared executor for a translation provider"""
+    with _executors_lock:
+        if provider not in _translation_executors:
+            from core.config import settings
+            _translation_executors[provider] = TranslationExecutor(
+                provider,
+                max_concurrency=settings.translation_max_concurrency,
+                requests_per_second=settings.translation_requests_per_second,
+                max_retries=settings.translation_max_retries,
+                breaker=get_circuit_breaker(provider, slow_call_seconds=settings.translation_slow_call_seconds),
+                hedge_min_seconds=settings.translation_hedge_min_seconds if settings.translation_hedging else None
+            )
+        return _translation_executors[provider]
@@ -0,0 +1,234 @@
+"""
+Translation memory
+Stores every segment translation keyed by (source language, target language,
+hash of the NFC-normalized segment) in a local SQLite file shared by all worker
+processes, with a bounded in-process LRU in front. Module headings and stock
+phrases are translated once per language instead of on every module.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lookups buffer last_used times and hit/miss counters; they are written with
+# the next put_many, a stats read, or at most this often
+FLUSH_INTERVAL_SECONDS = 30.0
+
+
+def segment_hash(text: str) -> str:
+    return hashlib.sha256(unicodedata.normalize("NFC", text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    SQLite translation memory with an in-process LRU front
+
+    Args:
+        path: SQLite file path
+        lru_size: Entries kept in memory per process
+    """
+
+    def __init__(self, path: str, lru_size: int = 10000):
+        self.path = path
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-pair counters of this process's lookups served from the LRU
+        self._lru_hits: Dict[str, int] = {}
+        # Buffered lookup bookkeeping: last_used per entry, counter deltas per (pair, name)
+        self._pending_used: Dict[Tuple[str, str, str], float] = {}
+        self._pending_counters: Dict[Tuple[str, str], int] = {}
+        self._flushed_at = time.monotonic()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS translation_memory (
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                segment TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (source, target, hash)
+            );
+            CREATE TABLE IF NOT EXISTS translation_memory_counters (
+                pair TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (pair, name)
+            );
+        """)
+        self._conn.commit()
+
+    def _remember(self, key: Tuple[str, str, str], translation: str):
+        """Add to the LRU (caller holds the lock)"""
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, source: str, target: str, segments: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up segments
+
+        Args:
+            source: Source language code
+            target: Target language code
+            segments: Segments to look up
+
+        Returns:
+            {segment: translation} for the segments found
+        """
+        pair = f"{source}-{target}"
+        found: Dict[str, str] = {}
+        pending: Dict[str, str] = {}
+        with self._lock:
+            for segment in segments:
+                key = (source, target, segment_hash(segment))
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[segment] = self._lru[key]
+                else:
+                    pending[key[2]] = segment
+            lru_hits = len(found)
+            self._lru_hits[pair] = self._lru_hits.get(pair, 0) + lru_hits
+
+            disk_hits = 0
+            if pending:
+                hashes = list(pending)
+                rows = []
+                # Stay under SQLite's bound-parameter limit
+                for i in range(0, len(hashes), 500):
+                    chunk = hashes[i:i + 500]
+                    rows += self._conn.execute(
+                        f"SELECT hash, translation FROM translation_memory "
+                        f"WHERE source = ? AND target = ? AND hash IN ({','.join('?' * len(chunk))})",
+                        (source, target, *chunk)
+                    ).fetchall()
+                now = time.time()
+                for hash_, translation in rows:
+                    found[pending[hash_]] = translation
+                    self._remember((source, target, hash_), translation)
+                    self._pending_used[(source, target, hash_)] = now
+                disk_hits = len(rows)
+
+            self._count(pair, "hits", lru_hits + disk_hits)
+            self._count(pair, "misses", len(pending) - disk_hits)
+            if time.monotonic() - self._flushed_at >= FLUSH_INTERVAL_SECONDS:
+                self._flush()
+                self._conn.commit()
+        return found
+
+    def put_many(self, source: str, target: str, translations: Dict[str, str]):
+        """Store {segment: translation} pairs"""
+        if not translations:
+            return
+        now = time.time()
+        with self._lock:
+            rows = []
+            for segment, translation in translations.items():
+                hash_ = segment_hash(segment)
+                rows.append((source, target, hash_, segment, translation, now, now))
+                self._remember((source, target, hash_), translation)
+            self._conn.executemany(
+                """INSERT OR REPLACE INTO translation_memory
+                   (source, target, hash, segment, translation, created_at, last_used)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+            self._bump(f"{source}-{target}", "stored", len(rows))
+            self._flush()
+            self._conn.commit()
+
+    def flush(self):
+        """Write buffered last_used times and counters"""
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+
+    def _flush(self):
+        """Caller holds the lock and commits"""
+        if self._pending_used:
+            self._conn.executemany(
+                "UPDATE translation_memory SET last_used = MAX(last_used, ?) WHERE source = ? AND target = ? AND hash = ?",
+                [(last_used, *key) for key, last_used in self._pending_used.items()]
+            )
+            self._pending_used.clear()
+        for (pair, name), amount in self._pending_counters.items():
+            self._bump(pair, name, amount)
+        self._pending_counters.clear()
+        self._flushed_at = time.monotonic()
+
+    def _count(self, pair: str, name: str, amount: int):
+        if amount:
+            self._pending_counters[(pair, name)] = self._pending_counters.get((pair, name), 0) + amount
+
+    def _bump(self, pair: str, name: str, amount: int):
+        if amount:
+            self._conn.execute(
+                "INSERT INTO translation_memory_counters (pair, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT(pair, name) DO UPDATE SET value = value + excluded.value",
+                (pair, name, amount)
+            )
+
+    def get_stats(self) -> Dict:
+        """Hit rates per language pair across all processes sharing the file"""
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+            counters = self._conn.execute("SELECT pair, name, value FROM translation_memory_counters").fetchall()
+            entries = dict(self._conn.execute(
+                "SELECT source || '-' || target, COUNT(*) FROM translation_memory GROUP BY source, target"
+            ).fetchall())
+            lru_entries = len(self._lru)
+            lru_hits = dict(self._lru_hits)
+
+        pairs: Dict[str, Dict] = {}
+        for pair, name, value in counters:
+            pairs.setdefault(pair, {})[name] = value
+        for pair in entries:
+            pairs.setdefault(pair, {})
+
+        result = {}
+        for pair, values in sorted(pairs.items()):
+            hits, misses = values.get("hits", 0), values.get("misses", 0)
+            result[pair] = {
+                "entries": entries.get(pair, 0),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "memory_hits": lru_hits.get(pair, 0),
+            }
+        return {
+            "pairs": result,
+            "entries": sum(entries.values()),
+            "lru_entries": lru_entries,
+            "lru_size": self.lru_size,
+        }
+
+
+# Service instance
+_translation_memory = None
+
+def get_translation_memory() -> TranslationMemory:
+    """Get singleton instance of the translation memory"""
+    global _translation_memory
+    if _translation_memory is None:
+        from core.config import settings
+        _translation_memory = TranslationMemory(
+            settings.translation_memory_path,
+            lru_size=settings.translation_memory_lru_size
+        )
+    return _translation_memory
@@ -1,23 +1,46 @@
 """
-Translation service using Google Translate (via deep-translator)
-Simple, reliable, and supports all Indian languages
-With proper Unicode normalization for Devanagari and other scripts
+Translation service for Indian languages
+Routes each language pair to a translation backend (Google Translate over the
+network, IndicTrans2 on the local CPU, or a dictionary stub for tests; see
+services.translation_backends), with proper Unicode normalization for
+Devanagari and other scripts.
+
+With a translation memory attached, only segments it has not seen are sent
+to a backend.
 """
 
-from deep_translator import GoogleTranslator
-from typing import List, Dict
-import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import logging
 
+from services.translation_backends import (
+    MAX_REQUEST_CHARS,
+    DictionaryBackend,
+    GoogleTranslateBackend,
+    IndicTrans2Backend,
+    TranslationBackend,
+)
+from services.language_detection import detect_language
+from services.text_normalizer import normalize_indic_text
+from services.translation_executor import get_translation_executor
+from services.translation_memory import TranslationMemory, get_translation_memory
+
 logger = logging.getLogger(__name__)
 
 class TranslationService:
     """
-    Translation service using Google Translate
+    Translation service with per-language-pair backend routing
     Supports all Indian languages and more
+    
+    Args:
+        memory: Optional translation memory consulted before any backend
+        backends: Backends by name (default: Google Translate only)
+        routes: Backend name per "src-tgt" pair, target code or "*"
+        stream_concurrency: Chunks translated at once by iter_batch_translate
+        stream_chunk_chars: Characters per chunk (about one provider request)
     """
     
-    # Language mappings for Google Translate
+    # Language codes (ISO 639-1) used by the backends
     LANGUAGE_CODES = {
         "english": "en",
         "hindi": "hi",
@@ -33,36 +56,69 @@ class TranslationService:
         "odia": "or"
     }
     
-    def __init__(self):
+    def __init__(
+        self,
+        memory: Optional[TranslationMemory] = None,
+        backends: Optional[Dict[str, TranslationBackend]] = None,
+        routes: Optional[Dict[str, str]] = None,
+        stream_concurrency: int = 4,
+        stream_chunk_chars: int = MAX_REQUEST_CHARS
+    ):
+        self.memory = memory
+        self.backends = backends or {"google": GoogleTranslateBackend()}
+        self.routes = routes or {}
+        self.stream_concurrency = max(1, stream_concurrency)
+        self.stream_chunk_chars = stream_chunk_chars
         self.supported_languages = list(self.LANGUAGE_CODES.keys())
-        logger.info("Translation service initialized with Google Translate")
+        self._segments = 0
+        logger.info(f"Translation service initialized with backends: {', '.join(self.backends)}")
     
-    def _normalize_indic_text(self, text: str) -> str:
-        """
-        Normalize Indian language text to prevent character splitting.
-        Uses NFC normalization to keep combined characters together.
+    @property
+    def stats(self) -> Dict:
+        return {
+            "segments": self._segments,
+            "requests": sum(backend.get_stats().get("requests", 0) for backend in self.backends.values()),
+            "backends": {name: backend.get_stats() for name, backend in self.backends.items()},
+        }
+    
+    def route(self, src_code: str, tgt_code: str) -> str:
         """
-        if not text:
-            return text
+        Backend name for a language pair
         
-        # Normalize to NFC (Canonical Composition) - keeps Devanagari/other scripts together
-        normalized = unicodedata.normalize('NFC', text)
-        
-        # Clean up any problematic zero-width characters
-        # Keep ZWJ (needed for conjuncts) but remove others
-        cleaned = ""
-        for char in normalized:
-            code_point = ord(char)
-            # Keep Zero Width Joiner (0x200D) for proper conjuncts
-            if code_point == 0x200D:
-                cleaned += char
-            # Remove problematic zero-width chars
-            elif code_point in (0x200B, 0x200C, 0xFEFF):
-                continue
-            else:
-                cleaned += char
-        
-        return cleaned
+        Routes are matched most specific first: "en-hi", then the target
+        code "hi", then "*"; without a match the first backend is used.
+        """
+        for key in (f"{src_code}-{tgt_code}", tgt_code, "*"):
+            if key in self.routes:
+                return self.routes[key]
+        return next(iter(self.backends))
+    
+    def _backends_for(self, codes: Tuple[str, str]) -> List[TranslationBackend]:
+        """The routed backend, then the other backends able to take over when it fails"""
+        routed = self.backends.get(self.route(*codes))
+        ordered = [routed] if routed is not None and routed.supports(*codes) else []
+        ordered += [
+            backend for backend in self.backends.values()
+            if backend is not routed and backend.fallback and backend.supports(*codes)
+        ]
+        return ordered
+    
+    def _codes(self, target_language: str, source_language: str) -> Optional[Tuple[str, str]]:
+        """Provider codes for a supported, non-trivial language pair (None: return text unchanged)"""
+        target_language = target_language.lower()
+        if target_language == "english" or target_language not in self.supported_languages:
+            return None
+        src_code = self.LANGUAGE_CODES.get(source_language.lower(), "en")
+        tgt_code = self.LANGUAGE_CODES[target_language]
+        return None if src_code == tgt_code else (src_code, tgt_code)
+    
+    def _source_language(self, texts: List[str], source_language: str) -> str:
+        """Resolve source_language "auto" by detecting the script of the texts"""
+        if source_language.lower() != "auto":
+            return source_language
+        guess = detect_language("\n".join(texts))
+        logger.info(f"Detected translation source language: {guess.language} (confidence {guess.confidence:.2f})")
+        return guess.language
     
     def translate(
         self, 
@@ -76,7 +132,7 @@ class TranslationService:
         Args:
             text: Text to translate
             target_language: Target language (hindi, marathi, etc.)
-            source_language: Source language (default: english)
+            source_language: Source language (default: english; "auto" detects it)
         
         Returns:
             Translated text or original text if translation fails
@@ -95,29 +151,54 @@ class TranslationService:
             logger.warning(f"Language '{target_language}' not supported. Returning original text.")
             return text
         
-        try:
-            # Get language codes
-            src_code = self.LANGUAGE_CODES.get(source_language, "en")
-            tgt_code = self.LANGUAGE_CODES.get(target_language)
-            
-            if not tgt_code:
-                logger.error(f"Unsupported target language: {target_language}")
-                return text
-            
-            # Translate using Google Translate
-            translator = GoogleTranslator(source=src_code, target=tgt_code)
-            translated = translator.translate(text)
-            
-            # Normalize the translated text to prevent character splitting
-            normalized = self._normalize_indic_text(translated)
-            
-            logger.info(f"Successfully translated text from {source_language} to {target_language}")
-            return normalized
-            
-        except Exception as e:
-            logger.error(f"Translation failed: {str(e)}")
+        codes = self._codes(target_language, self._source_language([text], source_language))
+        if codes is None:
+            return text
+        remembered = self._recall(codes, [text])
+        if text in remembered:
+            return remembered[text]
+        
+        translated = self._translate_segments([text], codes)[0]
+        if translated is None:
             logger.warning("Returning original text")
             return text
+        
+        self._remember(codes, {text: translated})
+        logger.info(f"Successfully translated text from {source_language} to {target_language}")
+        return translated
+    
+    def _translate_segments(self, segments: List[str], codes: Tuple[str, str]) -> List[Optional[str]]:
+        """Translate on the routed backend, handing failed segments to the next one (None: all failed)"""
+        results: List[Optional[str]] = [None] * len(segments)
+        pending = list(range(len(segments)))
+        for backend in self._backends_for(codes):
+            if not pending:
+                break
+            try:
+                outputs = backend.translate_batch([segments[i] for i in pending], *codes)
+            except Exception as e:
+                logger.error(f"{backend.name} translation backend failed: {e}")
+                outputs = [None] * len(pending)
+            failed = []
+            for i, output in zip(pending, outputs):
+                if output is None:
+                    failed.append(i)
+                else:
+                    # Normalize the translated text to prevent character splitting
+                    results[i] = normalize_indic_text(output)
+            if failed:
+                logger.warning(f"{len(failed)} segments failed on the {backend.name} translation backend")
+            pending = failed
+        return results
+    
+    def _remember(self, codes: Tuple[str, str], translations: Dict[str, str]):
+        if self.memory is None or not translations:
+            return
+        try:
+            self.memory.put_many(*codes, translations)
+        except Exception as e:
+            # The memory is an optimization; never fail a translation over it
+            logger.warning(f"Could not store translations in translation memory: {e}")
     
     def batch_translate(
         self,
@@ -126,20 +207,165 @@ class TranslationService:
         source_language: str = "english"
     ) -> List[str]:
         """
-        Translate multiple texts
+        Translate multiple texts with as few requests as possible
+        
+        Identical texts are translated once, and texts already in the
+        translation memory are answered from it. The rest go to the backend
+        routed for the language pair in one call (see services.translation_backends);
+        texts it fails on are handed to the next backend. Texts that still
+        fail keep their original text and are not remembered.
         
         Args:
             texts: List of texts to translate
             target_language: Target language
-            source_language: Source language
+            source_language: Source language ("auto" detects it from the texts)
         
         Returns:
-            List of translated texts
+            List of translated texts, in input order
         """
-        return [
-            self.translate(text, target_language, source_language)
-            for text in texts
-        ]
+        codes = self._batch_codes(texts, target_language, source_language)
+        if codes is None:
+            return list(texts)
+        
+        results = list(texts)
+        unique = self._unique(texts)
+        segments = list(unique)
+        self._segments += len(segments)
+        remembered = self._recall(codes, segments)
+        for text, translated in remembered.items():
+            for i in unique[text]:
+                results[i] = translated
+        
+        misses = [text for text in segments if text not in remembered]
+        learned = {}
+        for text, translated in zip(misses, self._translate_segments(misses, codes) if misses else []):
+            if translated is None:
+                continue
+            learned[text] = translated
+            for i in unique[text]:
+                results[i] = translated
+        self._remember(codes, learned)
+        return results
+    
+    def iter_batch_translate(
+        self,
+        texts: List[str],
+        target_language: str = "hindi",
+        source_language: str = "english"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Translate multiple texts, yielding each result once it and every text
+        before it are ready
+        
+        Identical texts are translated once and translation memory hits are
+        yielded straight away. The misses are split into chunks of about
+        stream_chunk_chars characters that are translated concurrently (the
+        provider limits in services.translation_executor still apply), so
+        the first results arrive long before a large batch is finished.
+        
+        Args:
+            texts: List of texts to translate
+            target_language: Target language
+            source_language: Source language ("auto" detects it from the texts)
+        
+        Yields:
+            {"index", "text", "status"} in input order. status is "translated",
+            "cached" (translation memory), "unchanged" (blank text or nothing
+            to translate) or "failed" (text is the original)
+        """
+        codes = self._batch_codes(texts, target_language, source_language)
+        if codes is None:
+            for i, text in enumerate(texts):
+                yield {"index": i, "text": text, "status": "unchanged"}
+            return
+        
+        unique = self._unique(texts)
+        segments = list(unique)
+        self._segments += len(segments)
+        done = {text: (translated, "cached") for text, translated in self._recall(codes, segments).items()}
+        misses = [text for text in segments if text not in done]
+        position = 0
+        
+        def ready() -> Iterator[Dict[str, Any]]:
+            nonlocal position
+            while position < len(texts):
+                text = texts[position]
+                if text not in unique:
+                    result = (text, "unchanged")
+                elif text in done:
+                    result = done[text]
+                else:
+                    return
+                yield {"index": position, "text": result[0], "status": result[1]}
+                position += 1
+        
+        yield from ready()
+        if not misses:
+            return
+        
+        chunks = self._chunks(misses)
+        pool = ThreadPoolExecutor(
+            max_workers=min(self.stream_concurrency, len(chunks)),
+            thread_name_prefix="translate-stream"
+        )
+        try:
+            # Submitted in input order, so the chunk holding the next result runs first
+            futures = {pool.submit(self._translate_segments, chunk, codes): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    outputs = future.result()
+                except Exception as e:
+                    logger.error(f"Translation chunk failed: {e}")
+                    outputs = [None] * len(chunk)
+                learned = {}
+                for text, translated in zip(chunk, outputs):
+                    if translated is None:
+                        done[text] = (text, "failed")
+                    else:
+                        done[text] = (translated, "translated")
+                        learned[text] = translated
+                self._remember(codes, learned)
+                yield from ready()
+        finally:
+            # The consumer may stop early (client disconnected)
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _batch_codes(self, texts: List[str], target_language: str, source_language: str) -> Optional[Tuple[str, str]]:
+        codes = self._codes(target_language, self._source_language(texts, source_language))
+        if codes is None and not self.is_language_supported(target_language):
+            logger.warning(f"Language '{target_language}' not supported. Returning original text.")
+        return codes
+    
+    def _unique(self, texts: List[str]) -> Dict[str, List[int]]:
+        """Input positions of each distinct non-blank text"""
+        # Identical segments (repeated headings, bullets) are translated once
+        unique: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                unique.setdefault(text, []).append(i)
+        return unique
+    
+    def _chunks(self, segments: List[str]) -> List[List[str]]:
+        """Consecutive segments grouped up to stream_chunk_chars characters"""
+        chunks: List[List[str]] = []
+        size = 0
+        for segment in segments:
+            if not chunks or size + len(segment) > self.stream_chunk_chars:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(segment)
+            size += len(segment)
+        return chunks
+    
+    def _recall(self, codes: Tuple[str, str], segments: List[str]) -> Dict[str, str]:
+        if self.memory is None or not segments:
+            return {}
+        try:
+            return self.memory.get_many(*codes, segments)
+        except Exception as e:
+            logger.warning(f"Translation memory lookup failed: {e}")
+            return {}
     
     def get_supported_languages(self) -> Dict[str, str]:
         """
@@ -170,5 +396,25 @@ def get_translation_service() -> TranslationService:
     """Get singleton instance of translation service"""
     global _translation_service
     if _translation_service is None:
-        _translation_service = TranslationService()
+        from core.config import settings
+        memory = get_translation_memory() if settings.translation_memory_enabled else None
+        backends: Dict[str, TranslationBackend] = {
+            "google": GoogleTranslateBackend(get_translation_executor("google"))
+        }
+        if settings.local_translation_enabled:
+            backends["local"] = IndicTrans2Backend(
+                settings.indictrans2_model_dir,
+                model_name=settings.indictrans2_model_name,
+                num_threads=settings.local_translation_threads,
+                max_batch_size=settings.local_translation_batch_size,
+                batch_window_ms=settings.local_translation_batch_window_ms
+            )
+        if "dictionary" in settings.translation_routes.values():
+            backends["dictionary"] = DictionaryBackend()
+        _translation_service = TranslationService(
+            memory=memory,
+            backends=backends,
+            routes=settings.translation_routes,
+            stream_concurrency=settings.translation_max_concurrency
+        )
     return _translation_service
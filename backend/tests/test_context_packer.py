@@ -0,0 +1,63 @@
+"""
+Test token-budgeted context packing
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.context_packer import ContextPacker, estimate_tokens
+
+
+def _result(content, distance=0.3):
+    return {"content": content, "metadata": {}, "distance": distance}
+
+
+def test_fits_budget_and_keeps_relevance_order():
+    results = [
+        _result("First point about phonics. " * 10),
+        _result("Second point about reading circles. " * 10),
+        _result("Third point about storytelling. " * 10),
+    ]
+    packed = ContextPacker().pack(results, token_budget=80)
+    assert packed.tokens <= 80
+    assert packed.text.startswith("First point")
+    assert packed.truncated
+
+
+def test_drops_off_topic_and_duplicate_chunks():
+    results = [
+        _result("Use local stones for counting activities. Pair students for practice."),
+        _result("Use local stones for counting activities. Pair students for practice."),
+        _result("Unrelated content about fire drills.", distance=1.4),
+        _result("Keyword-only hit without a distance.", distance=None),
+    ]
+    packed = ContextPacker(max_distance=0.75).pack(results, token_budget=500)
+    assert packed.dropped_duplicate == 1
+    assert packed.dropped_distance == 1
+    assert "fire drills" not in packed.text
+    assert "Keyword-only hit" in packed.text
+
+
+def test_overlapping_sentences_are_not_repeated():
+    results = [
+        _result("कक्षा में समूह कार्य करें। बच्चों से प्रश्न पूछें।"),
+        _result("बच्चों से प्रश्न पूछें। उत्तरों को बोर्ड पर लिखें।"),
+    ]
+    packed = ContextPacker().pack(results, token_budget=500)
+    assert packed.text.count("बच्चों से प्रश्न पूछें") == 1
+    assert "उत्तरों को बोर्ड पर लिखें" in packed.text
+
+
+def test_indic_text_costs_more_tokens_than_english():
+    assert estimate_tokens("शिक्षक प्रशिक्षण") > estimate_tokens("teacher training")
+
+
+def test_keeps_best_chunk_when_everything_is_far():
+    packed = ContextPacker(max_distance=0.2).pack([_result("Only match.", distance=0.9)], token_budget=100)
+    assert packed.text == "Only match."
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
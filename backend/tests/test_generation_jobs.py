@@ -0,0 +1,62 @@
+"""
+Test batch generation jobs: bounded concurrency, per-cluster results and event replay
+"""
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.generation_jobs import GenerationJobRegistry
+
+
+def test_job_runs_clusters_concurrently_within_limit():
+    registry = GenerationJobRegistry(concurrency=3)
+    in_flight = {"now": 0, "max": 0}
+
+    async def generate(cluster_id):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        if cluster_id == 4:
+            raise RuntimeError("Groq timeout")
+        return {"module_id": 100 + cluster_id}
+
+    async def run():
+        job = registry.start(7, "Group work", [1, 2, 3, 4, 5, 6, 2], generate)
+        events = [event async for event in registry.follow(job)]
+        return job, events
+
+    job, events = asyncio.run(run())
+    snapshot = job.snapshot()
+
+    assert in_flight["max"] == 3
+    assert snapshot["status"] == "completed"
+    assert snapshot["total"] == 6
+    assert (snapshot["completed"], snapshot["failed"]) == (5, 1)
+    assert snapshot["results"][0] == {"cluster_id": 1, "status": "completed", "module_id": 101}
+    assert snapshot["results"][3]["error"] == "Groq timeout"
+
+    assert [e["event"] for e in events] == ["status"] + ["result"] * 6 + ["done"]
+
+
+def test_late_subscriber_gets_full_history():
+    registry = GenerationJobRegistry()
+
+    async def generate(cluster_id):
+        return {"module_id": cluster_id}
+
+    async def run():
+        job = registry.start(1, "Phonics", [1, 2], generate)
+        await job._task
+        return [event async for event in registry.follow(job)]
+
+    events = asyncio.run(run())
+    assert events[-1]["event"] == "done"
+    assert events[-1]["data"]["completed"] == 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
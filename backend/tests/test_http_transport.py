@@ -0,0 +1,178 @@
+"""
+Test the shared outbound HTTP transport: connection reuse, retries, host caps and the Google client
+"""
+import sys
+import asyncio
+import threading
+import time
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import pytest
+
+from core import http_transport
+from core.http_transport import HttpTransport, RetryPolicy
+from services.llm_gateway import GROQ_RETRY
+from services.translation_backends import GoogleWebTranslator
+from services.translation_executor import is_throttled
+
+NO_WAIT = RetryPolicy(max_retries=2, backoff_seconds=0)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _mock(transport: HttpTransport, handler):
+    transport._sync_pool = httpx.MockTransport(handler)
+    return transport.client(retry=NO_WAIT)
+
+
+def test_consecutive_requests_reuse_one_connection(server):
+    transport = HttpTransport(http2=False)
+    client = transport.client()
+    for _ in range(5):
+        assert client.get(f"{server}/translate").text == "ok"
+    # A second client shares the same pool
+    assert transport.client().get(server).status_code == 200
+    stats = transport.get_stats()["hosts"]["127.0.0.1"]
+    assert stats["requests"] == 6
+    assert stats["new_connections"] == 1
+    assert stats["connection_reuse_rate"] == pytest.approx(5 / 6, abs=0.001)
+    transport.close()
+
+
+def test_unavailable_responses_are_retried_for_idempotent_methods():
+    statuses = iter([503, 503, 200, 503])
+
+    def handler(request):
+        return httpx.Response(next(statuses), headers={"Retry-After": "0"})
+
+    transport = HttpTransport()
+    client = _mock(transport, handler)
+    assert client.get("https://translate.google.com/m").status_code == 200
+    # POST is not resent by default once the server has seen it
+    assert client.post("https://translate.google.com/m").status_code == 503
+    stats = transport.get_stats()["hosts"]["translate.google.com"]
+    assert (stats["requests"], stats["retries"]) == (4, 2)
+
+
+def test_connection_failures_are_retried_for_any_method():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.method)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200)
+
+    transport = HttpTransport()
+    assert _mock(transport, handler).post("https://api.groq.com/v1").status_code == 200
+    assert attempts == ["POST", "POST"]
+    assert transport.get_stats()["hosts"]["api.groq.com"]["errors"] == 1
+
+
+def test_groq_posts_are_not_resent_after_a_read_timeout():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.method)
+        if request.url.path == "/slow":
+            raise httpx.ReadTimeout("timed out")
+        return httpx.Response(503 if len(attempts) < 3 else 200)
+
+    transport = HttpTransport()
+    transport._sync_pool = httpx.MockTransport(handler)
+    client = transport.client(retry=replace(GROQ_RETRY, backoff_seconds=0))
+    with pytest.raises(httpx.ReadTimeout):
+        client.post("https://api.groq.com/slow")
+    assert len(attempts) == 1
+    # Groq answering that it did not handle the request is still retried
+    assert client.post("https://api.groq.com/v1").status_code == 200
+    assert len(attempts) == 3
+
+
+def test_jittered_delay_stays_within_the_exponential_bound():
+    policy = RetryPolicy(backoff_seconds=1.0, max_backoff_seconds=3.0)
+    assert all(0 <= policy.delay(0) <= 1.0 for _ in range(50))
+    assert all(0 <= policy.delay(5) <= 3.0 for _ in range(50))
+    assert policy.delay(0, retry_after=30) == 3.0
+
+
+def test_concurrent_requests_per_host_are_capped():
+    def handler(request):
+        time.sleep(0.05)
+        return httpx.Response(200)
+
+    transport = HttpTransport(host_concurrency=2)
+    client = _mock(transport, handler)
+    threads = [threading.Thread(target=client.get, args=("https://translate.google.com/m",)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = transport.get_stats()["hosts"]["translate.google.com"]
+    assert stats["requests"] == 6
+    assert stats["peak_in_flight"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_async_client_applies_the_same_policy(monkeypatch):
+    statuses = iter([502, 200])
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        return httpx.Response(next(statuses, 200))
+
+    monkeypatch.setattr(http_transport.httpx, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler))
+    transport = HttpTransport(host_limits={"api.groq.com": 1})
+    retry = RetryPolicy(backoff_seconds=0, status_retry_methods=frozenset({"POST"}))
+
+    async def run():
+        async with transport.async_client(retry=retry) as client:
+            return await asyncio.gather(*(client.post("https://api.groq.com/v1") for _ in range(3)))
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert in_flight["max"] == 1
+    assert transport.get_stats()["hosts"]["api.groq.com"]["retries"] == 1
+
+
+def test_google_client_parses_the_translation_and_flags_throttling():
+    def handler(request):
+        if request.url.params["q"] == "busy":
+            return httpx.Response(429)
+        assert (request.url.params["sl"], request.url.params["tl"]) == ("en", "hi")
+        return httpx.Response(200, text='<div class="result-container">नमस्ते</div>')
+
+    translator = GoogleWebTranslator(httpx.Client(transport=httpx.MockTransport(handler)), "en", "hi")
+    assert translator.translate(" Hello ") == "नमस्ते"
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        translator.translate("busy")
+    assert is_throttled(error.value)
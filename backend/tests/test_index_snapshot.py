@@ -0,0 +1,106 @@
+"""
+Test vector index snapshot/restore round trips
+Uses an in-memory store so no ChromaDB install is required
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.index_snapshot import IndexSnapshotService, SnapshotReader, SnapshotError
+
+
+class InMemoryStore:
+    """Minimal stand-in exposing the ChromaVectorStore snapshot interface"""
+
+    def __init__(self):
+        self.records = {}
+
+    def add(self, manual_id, chunk_id, text, embedding):
+        record_id = f"manual_{manual_id}_chunk_{chunk_id}"
+        self.records[record_id] = (text, {"manual_id": str(manual_id), "chunk_id": chunk_id}, embedding)
+
+    def export_records(self, batch_size=2):
+        ids = sorted(self.records)
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            yield {
+                'ids': batch,
+                'documents': [self.records[i][0] for i in batch],
+                'metadatas': [self.records[i][1] for i in batch],
+                'embeddings': [self.records[i][2] for i in batch],
+            }
+
+    def import_records(self, ids, documents, metadatas, embeddings):
+        for i, record_id in enumerate(ids):
+            self.records[record_id] = (documents[i], metadatas[i], list(embeddings[i]))
+
+    def delete_collection(self, manual_id):
+        self.records = {k: v for k, v in self.records.items() if v[1]["manual_id"] != manual_id}
+
+
+def _store():
+    store = InMemoryStore()
+    store.add(1, 0, "शिक्षक प्रशिक्षण", [0.5, 0.25, -1.0])
+    store.add(1, 1, "Classroom management", [0.0, 1.0, 2.0])
+    store.add(2, 0, "Assessment", [1.5, -0.5, 0.125])
+    return store
+
+
+def test_full_round_trip(tmp_path):
+    source = _store()
+    path = tmp_path / "full.snap"
+    info = IndexSnapshotService(source).create_snapshot(str(path))
+    assert info["records"] == 3 and info["dimension"] == 3
+
+    target = InMemoryStore()
+    IndexSnapshotService(target).restore_snapshot([str(path)])
+    assert target.records == source.records
+
+
+def test_incremental_only_contains_changes(tmp_path):
+    source = _store()
+    service = IndexSnapshotService(source)
+    full = tmp_path / "full.snap"
+    service.create_snapshot(str(full))
+
+    source.add(3, 0, "New manual", [1.0, 1.0, 1.0])
+    source.delete_collection("2")
+    inc = tmp_path / "inc.snap"
+    info = service.create_snapshot(str(inc), since=str(full))
+    assert info["incremental"] and info["records"] == 1 and info["removed_manuals"] == 1
+
+    target = InMemoryStore()
+    IndexSnapshotService(target).restore_snapshot([str(full), str(inc)])
+    assert target.records == source.records
+
+
+def test_corruption_is_detected(tmp_path):
+    path = tmp_path / "full.snap"
+    IndexSnapshotService(_store()).create_snapshot(str(path))
+    data = bytearray(path.read_bytes())
+    data[-40] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(SnapshotError):
+        SnapshotReader(str(path))
+
+
+def test_incremental_chain_must_match(tmp_path):
+    store = _store()
+    service = IndexSnapshotService(store)
+    full_a = tmp_path / "a.snap"
+    full_b = tmp_path / "b.snap"
+    service.create_snapshot(str(full_a))
+    store.add(4, 0, "Other", [0.0, 0.0, 0.0])
+    service.create_snapshot(str(full_b))
+    inc = tmp_path / "inc.snap"
+    service.create_snapshot(str(inc), since=str(full_b))
+
+    with pytest.raises(SnapshotError):
+        IndexSnapshotService(InMemoryStore()).restore_snapshot([str(full_a), str(inc)])
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
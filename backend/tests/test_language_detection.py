@@ -0,0 +1,82 @@
+"""
+Test sampled script/language detection
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import language_detection
+from services.language_detection import (
+    SAMPLE_CHARS,
+    SAMPLE_STRATA,
+    detect_language,
+    ocr_languages,
+    sample_text,
+    script_counts,
+)
+from services.translation_backends import DictionaryBackend
+from services.translation_service import TranslationService
+
+HINDI = "शिक्षक बच्चों को छोटे समूहों में बाँटकर पढ़ने का अभ्यास कराते हैं और यह रोज़ होता है। "
+MARATHI = "शिक्षक मुलांना गटांमध्ये वाचनाचा सराव देतात आणि हे रोज होते असे दिसते. ते नाही थांबत. "
+TAMIL = "ஆசிரியர் குழந்தைகளை சிறு குழுக்களாக பிரித்து வாசிக்க பயிற்சி அளிக்கிறார். "
+ENGLISH = "Teachers divide children into small groups to practise reading every day. "
+
+
+def test_letters_are_counted_per_script():
+    counts = script_counts("Read पढ़ो 123 படி")
+    assert counts["latin"] == 4
+    assert counts["devanagari"] == 2  # vowel signs and nukta are not letters
+    assert counts["tamil"] == 2
+
+
+def test_translate_fallback_matches_numpy_counts(monkeypatch):
+    text = HINDI + TAMIL + ENGLISH
+    expected = script_counts(text)
+    monkeypatch.setattr(language_detection, "_NUMPY_TABLE", None)
+    assert script_counts(text) == expected
+
+
+def test_scripts_map_to_languages():
+    assert detect_language(TAMIL * 3).language == "tamil"
+    assert detect_language(ENGLISH * 3).language == "english"
+    assert detect_language("12345 ...").confidence == 0.0
+
+
+def test_hindi_and_marathi_use_whole_word_indicators():
+    assert detect_language(MARATHI * 3).language == "marathi"
+    assert detect_language(HINDI * 3).language == "hindi"
+    # Marathi indicators inside Hindi words (रहे, जाते, गया) must not count
+    assert detect_language("वे पढ़ते रहे और जाते रहे, गया कहे").language == "hindi"
+
+
+def test_long_documents_are_sampled_across_pages():
+    pages = [f"--- Page {i} ---\n" + HINDI * 40 for i in range(1, 201)]
+    text = "".join(pages)
+    samples = sample_text(text)
+    assert len(samples) == SAMPLE_STRATA
+    assert sum(len(sample) for sample in samples) <= SAMPLE_CHARS
+    guess = detect_language(text)
+    assert guess.language == "hindi"
+    assert guess.confidence > 0.9
+
+
+def test_mixed_documents_get_lower_confidence():
+    text = ENGLISH * 1000 + HINDI * 1000
+    guess = detect_language(text)
+    assert guess.samples == SAMPLE_STRATA
+    assert guess.confidence < 0.7
+
+
+def test_ocr_languages_follow_the_guess_and_installed_data():
+    assert ocr_languages() == "eng+hin"
+    assert ocr_languages(detect_language(TAMIL * 3)) == "eng+tam"
+    assert ocr_languages(detect_language(TAMIL * 3), available=["eng", "hin"]) == "eng"
+
+
+def test_auto_source_translation_detects_the_script():
+    backend = DictionaryBackend({("mr", "hi"): {MARATHI.strip(): "अनुवादित"}})
+    service = TranslationService(backends={"dictionary": backend})
+    assert service.batch_translate([MARATHI.strip()], "hindi", source_language="auto") == ["अनुवादित"]
+    # Already in the target language: returned unchanged
+    assert service.batch_translate([HINDI.strip()], "hindi", source_language="auto") == [HINDI.strip()]
@@ -0,0 +1,66 @@
+"""
+Test the BM25 lexical index used for hybrid retrieval
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.lexical_index import LexicalIndex, tokenize
+
+
+def test_tokenize_keeps_indic_words_whole():
+    # Vowel signs and viramas must stay inside the word; danda is punctuation
+    assert tokenize("कक्षा प्रबंधन।") == ["कक्षा", "प्रबंधन"]
+    # Zero-width spaces and inflections should not create distinct terms
+    assert tokenize("शिक्षकों​") == tokenize("शिक्षक")
+    assert tokenize("Teachers AND the Classroom") == ["teachers", "classroom"]
+
+
+def _index():
+    index = LexicalIndex()
+    index.add_documents(
+        ids=["m1_c0", "m1_c1", "m2_c0"],
+        texts=[
+            "शिक्षकों के लिए कक्षा प्रबंधन की रणनीतियाँ",
+            "Formative assessment with exit tickets",
+            "मराठी शाळेत शिक्षक प्रशिक्षण आहे",
+        ],
+        manual_ids=["1", "1", "2"],
+    )
+    return index
+
+
+def test_search_ranks_exact_terms():
+    index = _index()
+    results = index.search("कक्षा प्रबंधन", top_k=3)
+    assert results[0][0] == "m1_c0"
+
+    assert {doc for doc, _ in index.search("शिक्षक")} == {"m1_c0", "m2_c0"}
+
+
+def test_manual_filter_and_removal():
+    index = _index()
+    assert [doc for doc, _ in index.search("शिक्षक", manual_ids=["2"])] == ["m2_c0"]
+
+    index.remove_manual("2")
+    assert [doc for doc, _ in index.search("शिक्षक")] == ["m1_c0"]
+    assert len(index) == 2
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = _index()
+    index.remove_manual("1")
+    index.add_documents(["m3_c0"], ["exit tickets for assessment"], ["3"])
+    path = tmp_path / "lexical_index.bin"
+    index.save(str(path))
+
+    loaded = LexicalIndex.load(str(path))
+    assert loaded.get_stats() == index.get_stats()
+    assert loaded.search("assessment") == index.search("assessment")
+    assert loaded.search("प्रशिक्षण") == index.search("प्रशिक्षण")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,73 @@
+"""
+Test the content-addressed LLM response cache
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.llm_cache import LLMResponseCache, cache_key
+
+MESSAGES = [{"role": "system", "content": "Tag modules"}, {"role": "user", "content": "Group work"}]
+
+
+def test_key_covers_every_output_parameter():
+    base = cache_key("llama", MESSAGES, 0.2, 50)
+    assert base == cache_key("llama", [dict(m) for m in MESSAGES], 0.2, 50)
+    assert base != cache_key("llama", MESSAGES, 0.3, 50)
+    assert base != cache_key("llama", MESSAGES, 0.2, 60)
+    assert base != cache_key("other", MESSAGES, 0.2, 50)
+    assert base != cache_key("llama", MESSAGES, 0.2, 50, top_p=0.9)
+
+
+def test_hits_count_tokens_saved(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    key = cache_key("llama", MESSAGES, 0.2, 50)
+    assert cache.get(key) is None
+
+    cache.put(key, "llama", {"content": "Assessment & Feedback", "model": "llama", "total_tokens": 40}, 40)
+    assert cache.get(key)["content"] == "Assessment & Feedback"
+    assert cache.get(key) is not None
+
+    # Lookups only buffer their counters; another process sees them once flushed
+    assert LLMResponseCache(str(tmp_path / "cache.sqlite3")).get_stats()["hits"] == 0
+    cache.flush()
+    stats = LLMResponseCache(str(tmp_path / "cache.sqlite3")).get_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["tokens_saved"] == 80 and stats["entries"] == 1
+
+
+def test_lookups_do_not_write(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("a", "llama", {"content": "x"}, 10)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    for _ in range(5):
+        cache.get("a")
+        cache.get("missing")
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+    cache._conn.set_trace_callback(None)
+    cache.flush()
+    (hits,) = cache._conn.execute("SELECT hits FROM llm_responses WHERE key = 'a'").fetchone()
+    assert hits == 5
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05)
+    cache.put("a", "llama", {"content": "x"})
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+    cache = LLMResponseCache(str(tmp_path / "sized.sqlite3"), max_bytes=2000)
+    for i in range(60):
+        cache.put(f"k{i}", "llama", {"content": "y" * 100})
+    stats = cache.get_stats()
+    assert stats["size_bytes"] <= 2000 + 20 * 120
+    assert stats["evictions"] > 0
+    assert cache.get("k59") is not None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
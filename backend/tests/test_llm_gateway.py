@@ -0,0 +1,160 @@
+"""
+Test the async LLM gateway without calling Groq
+"""
+import sys
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.llm_cache import LLMResponseCache
+from services.llm_gateway import LLMGateway, ClientDisconnected, cancel_on_disconnect
+from services.llm_scheduler import LLMScheduler
+
+
+class FakeCompletions:
+    """Answers after a delay, like a slow generation"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, model, messages, temperature, max_tokens, stream, timeout, **options):
+        self.calls += 1
+        if stream:
+            return FakeStream(["**1. Classroom", " Challenge**", "\n\nText"])
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"), finish_reason="stop")],
+            usage=SimpleNamespace(total_tokens=12, prompt_tokens=10, completion_tokens=2)
+        )
+
+
+class FakeStream:
+    """Chunks shaped like Groq's streaming response"""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.closed = False
+
+    async def __aiter__(self):
+        for i, piece in enumerate(self.pieces):
+            last = i == len(self.pieces) - 1
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(
+                    delta=SimpleNamespace(content=piece),
+                    finish_reason="stop" if last else None
+                )],
+                x_groq=SimpleNamespace(usage=SimpleNamespace(
+                    total_tokens=30, prompt_tokens=20, completion_tokens=10
+                )) if last else None
+            )
+
+    async def close(self):
+        self.closed = True
+
+
+def _gateway(delay, cache=None):
+    gateway = LLMGateway(api_key="test", cache=cache)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(delay)))
+    gateway._get_client = lambda: client
+    return gateway
+
+
+def test_concurrent_calls_overlap():
+    gateway = _gateway(delay=0.2)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def run():
+        return await asyncio.gather(*(gateway.complete(messages) for _ in range(5)))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    assert time.perf_counter() - started < 0.6
+    assert [r.content for r in results] == ["ok"] * 5
+    assert results[0].total_tokens == 12 and results[0].finish_reason == "stop"
+
+
+def test_repeated_call_is_served_from_cache(tmp_path):
+    gateway = _gateway(delay=0, cache=LLMResponseCache(str(tmp_path / "cache.sqlite3")))
+    completions = gateway._get_client().chat.completions
+    messages = [{"role": "user", "content": "Tag this module"}]
+
+    async def run():
+        first = await gateway.complete(messages, temperature=0.2, max_tokens=50)
+        second = await gateway.complete(messages, temperature=0.2, max_tokens=50)
+        fresh = await gateway.complete(messages, temperature=0.2, max_tokens=50, cache=False)
+        return first, second, fresh
+
+    first, second, fresh = asyncio.run(run())
+    assert not first.cached and second.cached and not fresh.cached
+    assert second.content == first.content
+    assert completions.calls == 2
+    assert gateway.get_stats()["cache"]["tokens_saved"] == 12
+
+
+def test_stream_yields_deltas_and_usage():
+    gateway = _gateway(delay=0)
+
+    async def run():
+        stream = await gateway.stream([{"role": "user", "content": "hi"}])
+        deltas = [delta async for delta in stream]
+        return stream, deltas
+
+    stream, deltas = asyncio.run(run())
+    assert deltas == ["**1. Classroom", " Challenge**", "\n\nText"]
+    assert stream.result.content == "".join(deltas)
+    assert stream.result.total_tokens == 30 and stream.result.finish_reason == "stop"
+    assert stream._response.closed
+
+
+def test_failed_calls_refund_their_token_reservation():
+    class BadRequest(Exception):
+        status_code = 400
+
+    errors = iter([BadRequest("context too long"), asyncio.TimeoutError()])
+
+    async def create(**kwargs):
+        raise next(errors)
+
+    gateway = LLMGateway(api_key="test", scheduler=LLMScheduler(requests_per_minute=60, tokens_per_minute=10000))
+    gateway._get_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def run():
+        with pytest.raises(BadRequest):
+            await gateway.complete(messages, max_tokens=2000, cache=False)
+        refunded = gateway.scheduler.get_stats()["available_tokens"]
+        # A timed-out call may have been billed, so its estimate stays charged
+        with pytest.raises(asyncio.TimeoutError):
+            await gateway.complete(messages, max_tokens=2000, cache=False)
+        return refunded, gateway.scheduler.get_stats()["available_tokens"]
+
+    refunded, after_timeout = asyncio.run(run())
+    assert refunded >= 9999
+    assert after_timeout < 8100
+
+
+def test_disconnect_cancels_call():
+    gateway = _gateway(delay=5)
+
+    class GoneRequest:
+        async def is_disconnected(self):
+            return True
+
+    async def run():
+        return await cancel_on_disconnect(
+            GoneRequest(), gateway.complete([{"role": "user", "content": "hi"}]), poll_interval=0.01
+        )
+
+    started = time.perf_counter()
+    with pytest.raises(ClientDisconnected):
+        asyncio.run(run())
+    assert time.perf_counter() - started < 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
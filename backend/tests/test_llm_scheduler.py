@@ -0,0 +1,82 @@
+"""
+Test the LLM rate budget scheduler
+"""
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.llm_scheduler import LLMScheduler, Priority, SchedulerBusy
+
+
+def test_interactive_calls_jump_ahead_of_batch():
+    # 600 tokens/minute = 10 tokens/second, so each 5-token call waits ~0.5s
+    scheduler = LLMScheduler(requests_per_minute=600, tokens_per_minute=600)
+    order = []
+
+    async def call(name, priority):
+        await scheduler.acquire(5, priority)
+        order.append(name)
+
+    async def run():
+        await scheduler.acquire(600, Priority.BATCH)  # Use up the bucket
+        batch = [asyncio.create_task(call(f"batch{i}", Priority.BATCH)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        interactive = asyncio.create_task(call("teacher", Priority.INTERACTIVE))
+        await asyncio.gather(*batch, interactive)
+
+    asyncio.run(run())
+    assert order[0] == "teacher"
+    assert order[1:] == ["batch0", "batch1", "batch2"]
+
+
+def test_busy_queue_reports_position_and_wait():
+    scheduler = LLMScheduler(requests_per_minute=60, tokens_per_minute=600)
+
+    async def run():
+        await scheduler.acquire(600)
+        waiting = asyncio.create_task(scheduler.acquire(300))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(SchedulerBusy) as busy:
+                await scheduler.acquire(300, max_wait=5)
+        finally:
+            waiting.cancel()
+        return busy.value
+
+    busy = asyncio.run(run())
+    assert busy.queue_position == 2
+    assert 50 < busy.estimated_wait < 70
+
+
+def test_settle_returns_unused_estimate():
+    scheduler = LLMScheduler(requests_per_minute=60, tokens_per_minute=1000)
+
+    async def run():
+        reservation = await scheduler.acquire(800)
+        scheduler.settle(reservation, 200)
+
+    asyncio.run(run())
+    assert scheduler.get_stats()["available_tokens"] >= 800
+
+
+def test_release_refunds_a_failed_call_and_wakes_waiters():
+    scheduler = LLMScheduler(requests_per_minute=60, tokens_per_minute=1000)
+
+    async def run():
+        reservation = await scheduler.acquire(900)
+        waiter = asyncio.create_task(scheduler.acquire(900))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        scheduler.release(reservation)
+        scheduler.release(reservation)  # only refunded once
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(run()).tokens == 900
+    assert scheduler.get_stats()["released_tokens"] == 900
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
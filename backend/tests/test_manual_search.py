@@ -0,0 +1,89 @@
+"""
+Test manual search caching, cursor pagination and snippet highlighting
+Uses a fake RAG engine so no vector store is required
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.manual_search import ManualSearchService, InvalidCursorError, make_snippet
+
+
+class FakeRAGEngine:
+    def __init__(self, results=25, delay=0.0):
+        self.calls = []
+        self.results = results
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def search(self, query, top_k=5, manual_ids=None):
+        with self._lock:
+            self.calls.append((query, manual_ids))
+        time.sleep(self.delay)
+        return [
+            {
+                "id": f"manual_1_chunk_{i}",
+                "content": f"Chunk {i} about classroom management for {query}",
+                "metadata": {"manual_id": "1", "page_start": i + 1, "page_end": i + 1},
+                "distance": 0.1 * i,
+            }
+            for i in range(min(self.results, top_k))
+        ]
+
+
+def test_pages_follow_the_cursor_from_one_cached_search():
+    engine = FakeRAGEngine(results=25)
+    service = ManualSearchService(engine)
+
+    first = service.search("Classroom  Management", limit=10)
+    assert first["total"] == 25 and len(first["results"]) == 10
+    assert first["results"][0]["page_start"] == 1
+    assert first["results"][0]["manual_id"] == 1
+
+    second = service.search("classroom management", limit=10, cursor=first["next_cursor"])
+    third = service.search("classroom management", limit=10, cursor=second["next_cursor"])
+    assert second["results"][0]["chunk_id"] == "manual_1_chunk_10"
+    assert len(third["results"]) == 5 and third["next_cursor"] is None
+
+    assert len(engine.calls) == 1
+    assert second["cached"] and service.get_stats()["cache_hits"] == 2
+
+
+def test_cursor_from_another_query_is_rejected():
+    service = ManualSearchService(FakeRAGEngine())
+    page = service.search("phonics", limit=5)
+    with pytest.raises(InvalidCursorError):
+        service.search("group work", cursor=page["next_cursor"])
+    with pytest.raises(InvalidCursorError):
+        service.search("phonics", cursor="not-a-cursor")
+
+
+def test_concurrent_misses_share_one_search_and_invalidate_clears():
+    engine = FakeRAGEngine(delay=0.1)
+    service = ManualSearchService(engine)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        pages = list(pool.map(lambda _: service.search("assessment"), range(6)))
+    assert len(engine.calls) == 1
+    assert all(page["total"] == 25 for page in pages)
+
+    service.invalidate()
+    service.search("assessment")
+    assert len(engine.calls) == 2
+
+
+def test_snippet_marks_matches_and_escapes_html():
+    text = "Use <b>exit tickets</b> for assessment. शिक्षकों के लिए कक्षा प्रबंधन"
+    snippet = make_snippet(text, "assessment शिक्षक")
+    assert "<mark>assessment</mark>" in snippet
+    assert "<mark>शिक्षकों</mark>" in snippet
+    assert "&lt;b&gt;" in snippet and "<b>" not in snippet
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,100 @@
+"""
+Test task-based model routing and shadow comparison
+"""
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.llm_gateway import LLMResult
+from services.model_router import LARGE, SMALL, ModelRouter, Task
+
+
+class FakeGateway:
+    """Answers per model: the small model is fast, the large one slower"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    async def complete(self, messages, model=None, **kwargs):
+        self.calls.append((model, kwargs))
+        await asyncio.sleep(0.01 if model == "small-model" else 0.05)
+        return LLMResult(content=self.answers[model], model=model, total_tokens=20)
+
+
+MODELS = {LARGE: "large-model", SMALL: "small-model"}
+
+
+def test_tasks_route_to_their_tier_with_overrides():
+    router = ModelRouter(FakeGateway({}), MODELS, task_tiers={"safety_check": LARGE})
+    assert router.model_for(Task.MODULE_GENERATION) == "large-model"
+    assert router.model_for(Task.COMPETENCY_TAGGING) == "small-model"
+    assert router.model_for(Task.SAFETY_CHECK) == "large-model"
+
+
+def test_stats_track_latency_and_invalid_outputs():
+    gateway = FakeGateway({"small-model": "no verdict here"})
+    router = ModelRouter(gateway, MODELS)
+
+    async def run():
+        for _ in range(3):
+            await router.complete(Task.SAFETY_CHECK, [{"role": "user", "content": "x"}],
+                                  validate=lambda text: "SAFE" if "SAFE" in text else None)
+
+    asyncio.run(run())
+    stats = router.get_stats()["tasks"]["safety_check:small-model"]
+    assert stats["calls"] == 3
+    assert stats["invalid"] == 3
+    assert stats["latency_p50"] >= 0.01
+    assert gateway.calls[0][0] == "small-model"
+
+
+def test_shadow_mode_compares_tiers_without_delaying_the_caller():
+    gateway = FakeGateway({"small-model": "SAFE", "large-model": "SAFE, looks fine"})
+    router = ModelRouter(gateway, MODELS, shadow_fraction=1.0, shadow_tasks=["safety_check"])
+
+    async def run():
+        result = await router.complete(Task.SAFETY_CHECK, [{"role": "user", "content": "x"}],
+                                       validate=lambda text: text.split(",")[0])
+        assert result.model == "small-model"
+        await asyncio.gather(*router._shadow_tasks_running)
+
+    asyncio.run(run())
+    shadow = router.get_stats()["shadow"]["safety_check"]
+    assert shadow["shadow_model"] == "large-model"
+    assert shadow["runs"] == 1
+    assert shadow["agreement"] == 1.0
+    assert gateway.calls[1][1]["max_wait"] is not None
+
+
+def test_streamed_calls_are_recorded_when_the_stream_ends():
+    class FakeStream:
+        def __init__(self, model):
+            self.result = LLMResult(content="", model=model)
+
+        async def __aiter__(self):
+            for delta in ["Hello", " world"]:
+                await asyncio.sleep(0.01)
+                yield delta
+            self.result.content, self.result.total_tokens = "Hello world", 30
+
+    class StreamingGateway(FakeGateway):
+        async def stream(self, messages, model=None, **kwargs):
+            self.calls.append((model, kwargs))
+            return FakeStream(model)
+
+    gateway = StreamingGateway({})
+    router = ModelRouter(gateway, MODELS)
+
+    async def run():
+        stream = await router.stream(Task.MODULE_GENERATION, [{"role": "user", "content": "x"}])
+        assert router.get_stats()["tasks"]["module_generation:large-model"]["calls"] == 0
+        assert [delta async for delta in stream] == ["Hello", " world"]
+        return stream.result
+
+    assert asyncio.run(run()).content == "Hello world"
+    stats = router.get_stats()["tasks"]["module_generation:large-model"]
+    assert (stats["calls"], stats["tokens"]) == (1, 30)
+    assert stats["latency_p50"] >= 0.02
+    assert gateway.calls[0] == ("large-model", {"call_site": "module_generation"})
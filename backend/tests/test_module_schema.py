@@ -0,0 +1,56 @@
+"""
+Test structured module output validation
+"""
+import sys
+import json
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.module_schema import MODULE_COMPONENTS, parse_structured_module
+
+
+def _response(**overrides):
+    data = {
+        "components": {key: f"{heading} text" for key, heading in MODULE_COMPONENTS},
+        "safety": {"verdict": "SAFE", "concerns": []},
+        "competency_tags": ["Classroom Management"],
+    }
+    data.update(overrides)
+    return json.dumps(data)
+
+
+def test_valid_response_renders_seven_components_in_order():
+    module = parse_structured_module(_response())
+    markdown = module.to_markdown()
+    assert markdown.startswith("**1. Classroom Challenge**\nClassroom Challenge text")
+    assert "**7. Teacher Feedback Prompt**" in markdown
+    assert module.safety.verdict == "SAFE"
+
+
+def test_lists_tags_and_verdict_are_normalized():
+    components = {key: f"{heading} text" for key, heading in MODULE_COMPONENTS}
+    components["classroom_signals"] = ["Hands raised", "Pairs talking"]
+    module = parse_structured_module(_response(
+        components=components,
+        safety={"verdict": " unsafe ", "concerns": ["Uses a gas burner"]},
+        competency_tags=["inclusive education", "Time travel", "Language Pedagogy", "Conceptual Teaching"],
+    ))
+    assert module.components.classroom_signals == "- Hands raised\n- Pairs talking"
+    assert module.safety.verdict == "UNSAFE"
+    assert module.competency_tags == ["Inclusive Education", "Language Pedagogy"]
+
+
+@pytest.mark.parametrize("text", [
+    "**1. Classroom Challenge** plain markdown",
+    '{"components": {"classroom_challenge": "only one"}, "safety": {"verdict": "SAFE"}}',
+    _response(safety={"verdict": "MAYBE"}),
+    _response()[:-40],
+])
+def test_invalid_responses_are_rejected(text):
+    assert parse_structured_module(text) is None
+
+
+def test_code_fence_is_tolerated():
+    assert parse_structured_module(f"```json\n{_response()}\n```") is not None
@@ -0,0 +1,59 @@
+"""
+Test the script check used by native-language module generation
+"""
+import sys
+import asyncio
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.ai_engine import AIAdaptationEngine, script_share
+
+
+class FakeTranslation:
+    def __init__(self):
+        self.calls = []
+
+    def batch_translate(self, texts, target_language="hindi", source_language="english"):
+        self.calls.extend(texts)
+        return ["अनुवादित पाठ" for _ in texts]
+
+    def iter_batch_translate(self, texts, target_language="hindi", source_language="english"):
+        self.calls.extend(texts)
+        for i, text in enumerate(texts):
+            # The provider is down for the first batch only
+            failed = len(self.calls) <= len(texts)
+            yield {"index": i, "text": text if failed else "शीर्षक", "status": "failed" if failed else "translated"}
+
+
+def test_script_share_measures_letters_in_target_script():
+    assert script_share("बच्चों को कहानी सुनाएँ और फिर उनसे प्रश्न पूछें", "hindi") > 0.9
+    assert script_share("Tell the children a story and ask questions", "hindi") == 0.0
+    assert script_share("NEP 2020", "hindi") is None  # too few letters to judge
+
+
+def test_only_off_language_paragraphs_are_translated():
+    engine = AIAdaptationEngine.__new__(AIAdaptationEngine)
+    engine.translation_service = FakeTranslation()
+    content = "\n\n".join([
+        "**1. कक्षा की चुनौती**\nकई बच्चे पढ़ते समय शब्द पहचान नहीं पाते हैं।",
+        "Ask each group to read the story aloud and discuss it together.",
+        "**7. शिक्षक प्रतिक्रिया प्रश्न**\nक्या सभी बच्चों ने गतिविधि में भाग लिया?",
+    ])
+    fixed_content, fixed = asyncio.run(engine._ensure_language(content, "hindi"))
+    assert fixed == 1
+    assert engine.translation_service.calls == ["Ask each group to read the story aloud and discuss it together."]
+    assert fixed_content.split("\n\n")[1] == "अनुवादित पाठ"
+    assert fixed_content.split("\n\n")[0] == content.split("\n\n")[0]
+
+
+def test_failed_heading_translations_are_not_cached():
+    engine = AIAdaptationEngine.__new__(AIAdaptationEngine)
+    engine.translation_service = FakeTranslation()
+    engine._heading_cache = {}
+    english = asyncio.run(engine._component_headings("hindi"))
+    assert "hindi" not in engine._heading_cache
+    assert english == engine.translation_service.calls
+    translated = asyncio.run(engine._component_headings("hindi"))
+    assert set(translated) == {"शीर्षक"}
+    assert engine._heading_cache["hindi"] == translated
+    assert asyncio.run(engine._component_headings("hindi")) is translated
@@ -0,0 +1,94 @@
+"""
+Test pre-translation of approved modules: language choice from similar clusters and the background queue
+"""
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.pretranslation import PretranslationQueue, pretranslation_languages, profile_similarity
+
+SUPPORTED = ["hindi", "marathi", "tamil", "bengali"]
+
+
+def _cluster(id, language, region="Rural", infrastructure="Low", issues="no electricity, multigrade classes"):
+    return SimpleNamespace(
+        id=id, primary_language=language, geographic_type=region,
+        infrastructure_level=infrastructure, specific_challenges=issues
+    )
+
+
+def test_similarity_combines_region_infrastructure_and_issues():
+    rural = _cluster(1, "hindi")
+    assert profile_similarity(rural, _cluster(2, "marathi")) == 1.0
+    assert profile_similarity(rural, _cluster(3, "tamil", region="Urban", infrastructure="High", issues="overcrowding")) == 0.0
+
+
+def test_languages_come_from_similar_clusters_most_similar_first():
+    clusters = [
+        _cluster(1, "hindi"),
+        _cluster(2, "Hindi"),                                       # module's own language
+        _cluster(3, "bengali", issues="no electricity"),            # similar, weaker issue overlap
+        _cluster(4, "marathi"),                                     # identical profile
+        _cluster(5, "tamil", region="Urban", infrastructure="High"),  # not similar
+        _cluster(6, "klingon"),                                     # unsupported
+    ]
+    languages = pretranslation_languages(clusters[0], clusters, "hindi", SUPPORTED)
+    assert languages == ["marathi", "bengali"]
+    assert pretranslation_languages(clusters[0], clusters, "hindi", SUPPORTED, max_languages=1) == ["marathi"]
+
+
+def test_queue_localizes_each_language_within_the_concurrency_limit():
+    queue = PretranslationQueue(concurrency=2)
+    in_flight = {"now": 0, "max": 0}
+
+    async def localize(language):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        if language == "tamil":
+            raise RuntimeError("provider down")
+        return {"pdf_id": len(language)}
+
+    async def run():
+        job = queue.start(7, ["marathi", "bengali", "tamil", "marathi"], localize)
+        waited = await queue.wait(7, "bengali")
+        await asyncio.gather(*job._tasks.values())
+        return job, waited
+
+    job, waited = asyncio.run(run())
+    snapshot = job.snapshot()
+    assert in_flight["max"] == 2
+    assert waited == {"language": "bengali", "status": "completed", "pdf_id": 7}
+    assert snapshot["status"] == "completed" and snapshot["finished_at"] is not None
+    assert [r["status"] for r in snapshot["results"]] == ["completed", "completed", "failed"]
+    assert snapshot["results"][2]["error"] == "provider down"
+
+
+def test_reapproval_replaces_the_running_job():
+    queue = PretranslationQueue()
+    started = []
+
+    async def slow(language):
+        started.append(language)
+        await asyncio.sleep(10)
+        return {}
+
+    async def fast(language):
+        return {"pdf_id": 1}
+
+    async def run():
+        first = queue.start(3, ["marathi"], slow)
+        await asyncio.sleep(0)
+        second = queue.start(3, ["marathi"], fast)
+        result = await queue.wait(3, "marathi")
+        return first, second, result
+
+    first, second, result = asyncio.run(run())
+    assert started == ["marathi"]
+    assert first._tasks["marathi"].cancelled()
+    assert queue.get(3) is second
+    assert result["status"] == "completed"
+    assert asyncio.run(queue.wait(99, "marathi")) is None
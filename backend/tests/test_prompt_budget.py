@@ -0,0 +1,63 @@
+"""
+Test prompt token counting and trimming
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.prompt_budget import TokenCounter
+
+
+def test_indic_scripts_cost_more_tokens_per_character():
+    counter = TokenCounter()
+    english = counter.count("teacher training " * 20)
+    hindi = counter.count("शिक्षक प्रशिक्षण " * 20)
+    tamil = counter.count("ஆசிரியர் பயிற்சி " * 20)
+    assert hindi > english * 1.5
+    assert tamil > english * 1.5
+
+
+def test_trim_fits_budget_at_a_sentence_boundary():
+    counter = TokenCounter()
+    text = "बच्चों के साथ कहानी पढ़ें। " * 40 + "Group work helps every learner. " * 40
+    trimmed = counter.trim(text, 100)
+    assert counter.count(trimmed) <= 100
+    assert trimmed.endswith("।")
+    assert counter.trim("short text", 100) == "short text"
+    assert counter.trim("anything", 0) == ""
+
+
+def test_bulk_estimate_follows_the_per_script_ratios():
+    counter = TokenCounter()
+    assert counter.count("a" * 400) == 101                 # ASCII: 4 chars per token
+    assert counter.count("क" * 220) == 101                 # Devanagari: 2.2
+    assert counter.count("漢" * 150) == 101                 # outside the table: default 1.5
+    long_text = ("शिक्षक प्रशिक्षण. Teacher training. " * 20000).strip()
+    trimmed = counter.trim(long_text, 5000)
+    assert 4900 <= counter.count(trimmed) <= 5000
+    assert long_text.startswith(trimmed)
+
+
+def test_count_messages_includes_chat_overhead():
+    counter = TokenCounter()
+    messages = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Hello"}]
+    assert counter.count_messages(messages) > counter.count("Be brief.") + counter.count("Hello")
+
+
+def test_reported_usage_calibrates_the_estimate():
+    counter = TokenCounter()
+    text = "Inclusive classrooms " * 50
+    predicted = counter.count(text)
+    for _ in range(30):
+        counter.record_usage("test", counter.count(text), predicted * 1.5, predicted * 2)
+    assert counter.count(text) == pytest.approx(predicted * 1.5, rel=0.05)
+    assert counter.get_stats()["mode"] == "estimator"
+
+
+def test_usage_is_attributed_to_the_call_site():
+    counter = TokenCounter()
+    counter.record_usage("safety_check", 100, 125, 140, model="llama-3.1-8b-instant")
+    counter.record_usage("manual_summary", 100, 100, 900, model="llama-3.3-70b-versatile")
+    assert counter.get_stats()["prompt_error_by_call_site"] == {"safety_check": -0.2, "manual_summary": 0.0}
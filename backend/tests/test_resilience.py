@@ -0,0 +1,189 @@
+"""
+Test circuit breakers and hedged requests for Groq and translation providers
+"""
+import sys
+import asyncio
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import pytest
+
+from core.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from services.llm_gateway import LLMGateway
+from services.translation_backends import GoogleTranslateBackend
+from services.translation_executor import TranslationExecutor
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    breaker = CircuitBreaker("google", failure_threshold=3, reset_seconds=60)
+    for _ in range(2):
+        breaker.record_failure(TimeoutError())
+    breaker.record_success(0.1)  # a success resets the count
+    for _ in range(3):
+        breaker.record_failure(TimeoutError())
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen) as error:
+        breaker.allow()
+    assert error.value.name == "google" and 0 < error.value.retry_after <= 60
+    stats = breaker.get_stats()
+    assert (stats["opened"], stats["rejected"]) == (1, 1)
+    assert stats["transitions"][-1]["to"] == OPEN
+
+
+def test_half_open_admits_one_probe_whose_outcome_decides():
+    breaker = CircuitBreaker("groq", failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    breaker.allow()
+    with pytest.raises(CircuitOpen):
+        breaker.allow()  # the probe is still out
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert [t["to"] for t in breaker.get_stats()["transitions"]] == [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("google", failure_threshold=2, slow_call_seconds=1.0)
+    breaker.record_success(5.0)
+    breaker.record_success(5.0)
+    assert breaker.state == OPEN
+    assert breaker.get_stats()["slow_calls"] == 2
+
+
+def test_executor_stops_calling_a_failing_provider():
+    calls = []
+
+    def failing(text):
+        calls.append(text)
+        raise ConnectionError("timed out")
+
+    executor = TranslationExecutor("google", breaker=CircuitBreaker("google", failure_threshold=2, reset_seconds=60))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            executor.call(failing, "hello")
+    with pytest.raises(CircuitOpen):
+        executor.call(failing, "hello")
+    assert len(calls) == 2
+
+
+def test_throttling_does_not_trip_the_breaker():
+    attempts = iter([httpx.HTTPStatusError("throttled", request=None, response=httpx.Response(429)), "नमस्ते"])
+
+    def throttled_once(text):
+        outcome = next(attempts)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    breaker = CircuitBreaker("google", failure_threshold=1)
+    executor = TranslationExecutor("google", requests_per_second=100, backoff_seconds=0.01, breaker=breaker)
+    assert executor.call(throttled_once, "hello") == "नमस्ते"
+    assert breaker.state == CLOSED
+
+
+def test_slow_requests_are_hedged_after_the_p95_latency():
+    first = threading.Event()
+
+    def translate(text):
+        if not first.is_set():
+            first.set()
+            time.sleep(1.0)  # the stalled primary
+            return "slow"
+        return "fast"
+
+    executor = TranslationExecutor("google", requests_per_second=100, hedge_min_seconds=0.05)
+    for _ in range(20):
+        executor.latency.record(0.01)
+    started = time.perf_counter()
+    assert executor.call(translate, "hello") == "fast"
+    assert time.perf_counter() - started < 0.5
+    stats = executor.get_stats()
+    assert (stats["hedges"], stats["hedge_delay"]) == (1, 0.05)
+
+
+def test_open_google_breaker_hands_segments_to_the_next_backend():
+    breaker = CircuitBreaker("google", failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    backend = GoogleTranslateBackend(TranslationExecutor("google", breaker=breaker), client=object())
+    assert backend.translate_batch(["one", "two"], "en", "hi") == [None, None]
+    assert backend.get_stats()["requests"] == 0
+
+
+def test_gateway_fails_fast_while_groq_is_down():
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        raise ConnectionError("timed out")
+
+    gateway = LLMGateway(api_key="test", breaker=CircuitBreaker("groq", failure_threshold=2, reset_seconds=60))
+    gateway._get_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await gateway.complete(messages, cache=False)
+        with pytest.raises(CircuitOpen):
+            await gateway.complete(messages, cache=False)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert gateway.get_stats()["breaker"]["state"] == OPEN
+
+
+def test_stream_outcome_is_decided_by_its_body():
+    def chunk(text):
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=None)])
+
+    async def body(fail):
+        yield chunk("Hel")
+        if fail:
+            raise httpx.ReadError("connection dropped")
+        yield chunk("lo")
+
+    breaker = CircuitBreaker("groq", failure_threshold=1, reset_seconds=0.05)
+    gateway = LLMGateway(api_key="test", breaker=breaker)
+    fail = True
+
+    async def create(**kwargs):
+        return body(fail)
+
+    gateway._get_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def run():
+        nonlocal fail
+        # A half-open probe whose body drops re-opens the breaker
+        breaker.record_failure()
+        time.sleep(0.06)
+        stream = await gateway.stream(messages)
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(httpx.ReadError):
+            async for _ in stream:
+                pass
+        assert breaker.state == OPEN
+
+        # A consumer that stops early hands the probe back
+        time.sleep(0.06)
+        fail = False
+        deltas = (await gateway.stream(messages)).__aiter__()
+        assert await deltas.__anext__() == "Hel"
+        await deltas.aclose()
+        assert breaker.state == HALF_OPEN
+
+        # Reading the body to the end closes it
+        assert [delta async for delta in await gateway.stream(messages)] == ["Hel", "lo"]
+        assert breaker.state == CLOSED
+
+    asyncio.run(run())
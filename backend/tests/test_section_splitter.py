@@ -0,0 +1,75 @@
+"""
+Test content-defined sectioning used for map-reduce manual summaries
+"""
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.context_packer import estimate_tokens
+from services.manual_adapter import ManualAdapterService
+from services.section_splitter import split_sections, section_hash
+
+
+def _manual(paragraphs=200, edit=None):
+    text = []
+    for i in range(paragraphs):
+        words = " ".join(f"word{(i * 7 + j) % 97}" for j in range(40 + i % 30))
+        text.append(f"Paragraph {i}: {words}.")
+    if edit is not None:
+        text[edit] += " A newly added sentence about formative assessment."
+    return "\n\n".join(text)
+
+
+def test_sections_respect_budget_and_keep_all_text():
+    text = _manual()
+    sections = split_sections(text, target_tokens=600, max_tokens=800)
+    assert len(sections) > 5
+    assert all(estimate_tokens(section) <= 800 for section in sections)
+    assert "\n\n".join(sections) == text
+
+
+def test_edit_only_changes_nearby_sections():
+    before = {section_hash(s) for s in split_sections(_manual(), 600, 800)}
+    after = split_sections(_manual(edit=120), 600, 800)
+    changed = [s for s in after if section_hash(s) not in before]
+    assert 1 <= len(changed) <= 2
+
+
+def test_oversized_paragraph_is_broken_up():
+    blob = "अध्याय " * 3000  # OCR output without paragraph breaks
+    sections = split_sections(blob, target_tokens=500, max_tokens=700)
+    assert len(sections) > 1
+    assert all(estimate_tokens(section) <= 700 for section in sections)
+
+
+def test_editing_one_section_keeps_the_other_section_prompts():
+    prompts = []
+
+    async def complete(task, messages, **kwargs):
+        prompts.append(messages[-1]["content"])
+        return SimpleNamespace(content="summary")
+
+    adapter = ManualAdapterService.__new__(ManualAdapterService)
+    adapter.router = SimpleNamespace(complete=complete)
+
+    def map_prompts(text):
+        prompts.clear()
+        asyncio.run(adapter._map_reduce(text, "English", "Manual", content_budget=2000))
+        return set(prompts)
+
+    paragraphs = _manual().split("\n\n")
+    added = [f"New activity {i}: " + "pair students for peer reading practice. " * 12 for i in range(12)]
+    revised = "\n\n".join(paragraphs[:120] + added + paragraphs[120:])
+    before = map_prompts(_manual())
+    after = map_prompts(revised)
+    # Prompts are the response-cache key: a new section must not re-key the others
+    assert len(before) > 5
+    assert len(before - after) <= 2
+    assert len(after - before) <= 4
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
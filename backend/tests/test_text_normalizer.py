@@ -0,0 +1,32 @@
+"""
+Test the shared Indic text normalizer
+"""
+import sys
+import unicodedata
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.text_normalizer import normalize_indic_text
+
+
+def test_decomposed_text_is_composed():
+    decomposed = unicodedata.normalize("NFD", "क़िताब पढ़ो")
+    assert normalize_indic_text(decomposed) == unicodedata.normalize("NFC", "क़िताब पढ़ो")
+
+
+def test_zero_width_characters_are_removed_except_zwj():
+    text = "\ufeffकक्षा\u200b में\u200c क्\u200dष"
+    assert normalize_indic_text(text) == "कक्षा में क्\u200dष"
+
+
+def test_ascii_and_clean_text_come_back_unchanged():
+    ascii_text = "Use local examples"
+    clean = "बच्चों को समूहों में बाँटें" * 200
+    assert normalize_indic_text(ascii_text) is ascii_text
+    assert normalize_indic_text(clean) == clean
+    assert normalize_indic_text("") == ""
+
+
+def test_long_and_short_text_give_the_same_result():
+    paragraph = unicodedata.normalize("NFD", "शिक्षक\u200b कक्षा में पढ़ाएँ। ")
+    assert normalize_indic_text(paragraph * 500) == normalize_indic_text(paragraph) * 500
@@ -0,0 +1,98 @@
+"""
+Test translation backend routing, fallback and local batching without real models
+"""
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.translation_backends import DictionaryBackend, IndicTrans2Backend, TranslationBackend
+from services.translation_service import TranslationService
+
+
+class FailingBackend(TranslationBackend):
+    """Stands in for Google Translate with the network down"""
+
+    name = "google"
+
+    def __init__(self):
+        self.calls = 0
+
+    def translate_batch(self, segments, src_code, tgt_code):
+        self.calls += 1
+        return [None] * len(segments)
+
+
+class FakeLocalBackend(IndicTrans2Backend):
+    """IndicTrans2 batching with a stand-in for the model"""
+
+    def __init__(self, **kwargs):
+        super().__init__("unused", **kwargs)
+        self.model = object()
+        self.batches = []
+
+    def _generate(self, sentences, src, tgt):
+        self.batches.append((list(sentences), src, tgt))
+        return [f"{tgt}:{sentence}" for sentence in sentences]
+
+
+def test_routes_match_most_specific_first():
+    service = TranslationService(
+        backends={"google": DictionaryBackend(), "local": DictionaryBackend()},
+        routes={"en-hi": "local", "mr": "local", "*": "google"}
+    )
+    assert service.route("en", "hi") == "local"
+    assert service.route("en", "mr") == "local"
+    assert service.route("en", "ta") == "google"
+
+
+def test_dictionary_backend_is_deterministic():
+    backend = DictionaryBackend({("en", "hi"): {"Hello": "नमस्ते"}})
+    service = TranslationService(backends={"dictionary": backend})
+    assert service.batch_translate(["Hello", "Ask questions"], "hindi") == ["नमस्ते", "[hi] Ask questions"]
+    assert service.translate("Hello", "hindi") == "नमस्ते"
+
+
+def test_failed_segments_fall_back_to_the_local_backend():
+    remote = FailingBackend()
+    local = FakeLocalBackend()
+    service = TranslationService(backends={"google": remote, "local": local}, routes={"*": "google"})
+    assert service.batch_translate(["Use local examples."], "hindi") == ["hin_Deva:Use local examples."]
+    assert remote.calls == 1
+
+
+def test_local_backend_only_translates_out_of_english():
+    local = FakeLocalBackend()
+    assert local.supports("en", "ta")
+    assert not local.supports("hi", "en")
+    service = TranslationService(backends={"local": local})
+    assert service.batch_translate(["नमस्ते"], "tamil", source_language="hindi") == ["नमस्ते"]
+    assert local.batches == []
+
+
+def test_local_backend_batches_concurrent_callers_and_splits_sentences():
+    local = FakeLocalBackend(max_batch_size=16, batch_window_ms=50)
+    results = {}
+
+    def call(name, segments):
+        results[name] = local.translate_batch(segments, "en", "hi")
+
+    threads = [
+        threading.Thread(target=call, args=("a", ["Ask questions. Use examples."])),
+        threading.Thread(target=call, args=("b", ["Form groups."])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["a"] == ["hin_Deva:Ask questions. hin_Deva:Use examples."]
+    assert results["b"] == ["hin_Deva:Form groups."]
+    assert len(local.batches) == 1
+    assert local.stats["sentences"] == 3
+
+
+def test_unloadable_model_reports_failure_instead_of_raising(tmp_path):
+    local = IndicTrans2Backend(str(tmp_path / "missing"))
+    assert local.translate_batch(["Hello"], "en", "hi") == [None]
+    assert local.get_stats()["load_error"]
@@ -0,0 +1,88 @@
+"""
+Test the translation executor's concurrency, rate limit and throttling backoff
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.translation_executor import TranslationExecutor, TranslationThrottled
+
+
+class TooManyRequests(Exception):
+    """Same name as deep-translator's throttling error"""
+
+
+def test_map_runs_concurrently_and_keeps_order():
+    executor = TranslationExecutor("test", max_concurrency=4, requests_per_second=100)
+
+    def slow(item):
+        return executor.call(lambda: time.sleep(0.1) or item * 2)
+
+    started = time.perf_counter()
+    assert executor.map(slow, [1, 2, 3, 4]) == [2, 4, 6, 8]
+    assert time.perf_counter() - started < 0.3
+    assert executor.get_stats()["peak_in_flight"] > 1
+
+
+def test_concurrency_limit_is_respected():
+    executor = TranslationExecutor("test", max_concurrency=2, requests_per_second=100)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def request():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    threads = [threading.Thread(target=executor.call, args=(request,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_request_rate_is_limited():
+    executor = TranslationExecutor("test", max_concurrency=4, requests_per_second=10)
+    started = time.perf_counter()
+    executor.map(lambda item: executor.call(lambda: item), range(15))
+    # 10 go out in the first burst, the other 5 at 10 per second
+    assert time.perf_counter() - started >= 0.4
+
+
+def test_throttled_requests_back_off_and_retry():
+    executor = TranslationExecutor("test", requests_per_second=100, backoff_seconds=0.05)
+    attempts = []
+
+    def flaky():
+        attempts.append(time.perf_counter())
+        if len(attempts) < 3:
+            raise TooManyRequests("Too many requests")
+        return "ok"
+
+    assert executor.call(flaky) == "ok"
+    assert executor.stats["throttled"] == 2
+    assert attempts[2] - attempts[1] >= attempts[1] - attempts[0] >= 0.05
+
+
+def test_gives_up_after_max_retries_and_passes_other_errors_through():
+    executor = TranslationExecutor("test", requests_per_second=100, max_retries=1, backoff_seconds=0.01)
+
+    def fail(error):
+        raise error
+
+    with pytest.raises(TranslationThrottled):
+        executor.call(fail, TooManyRequests("429"))
+    with pytest.raises(ValueError):
+        executor.call(fail, ValueError("bad input"))
+    # A "429" in the message (a URL, a length, an ID) is not throttling
+    with pytest.raises(ValueError):
+        executor.call(fail, ValueError("segment 4291 not found at /v1/429"))
+    assert executor.stats["failures"] == 3
+    assert executor.stats["throttled"] == 2
@@ -0,0 +1,98 @@
+"""
+Test the translation memory and its use by batch translation
+"""
+import sys
+import unicodedata
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.translation_backends import GoogleTranslateBackend
+from services.translation_memory import TranslationMemory
+from services.translation_service import TranslationService
+
+
+class FakeTranslator:
+    """Marks each line as translated; fails on lines containing "FAIL" """
+
+    def __init__(self):
+        self.requests = []
+
+    def translate(self, text):
+        self.requests.append(text)
+        if "FAIL" in text:
+            raise RuntimeError("provider error")
+        return "\n".join(f"<{line.strip()}>" if line.strip() and "§§" not in line else line
+                         for line in text.split("\n"))
+
+
+def _memory(tmp_path, lru_size=100):
+    return TranslationMemory(str(tmp_path / "tm.sqlite3"), lru_size=lru_size)
+
+
+def test_lookup_ignores_unicode_normalization_form(tmp_path):
+    memory = _memory(tmp_path)
+    composed = unicodedata.normalize("NFC", "café")
+    memory.put_many("en", "hi", {composed: "कैफ़े"})
+    assert memory.get_many("en", "hi", [unicodedata.normalize("NFD", "café")])
+    assert memory.get_many("en", "mr", [composed]) == {}
+
+
+def test_entries_outlive_the_lru_and_the_process(tmp_path):
+    memory = _memory(tmp_path, lru_size=2)
+    memory.put_many("en", "hi", {"One": "एक", "Two": "दो", "Three": "तीन"})
+    assert len(memory._lru) == 2
+    assert memory.get_many("en", "hi", ["One"]) == {"One": "एक"}
+
+    reopened = _memory(tmp_path)
+    assert reopened.get_many("en", "hi", ["Two", "Four"]) == {"Two": "दो"}
+
+
+def test_hit_rates_are_reported_per_language_pair(tmp_path):
+    memory = _memory(tmp_path)
+    memory.put_many("en", "hi", {"One": "एक"})
+    memory.get_many("en", "hi", ["One", "Two"])
+    memory.get_many("en", "ta", ["One"])
+    stats = memory.get_stats()
+    assert stats["pairs"]["en-hi"]["hit_rate"] == 0.5
+    assert stats["pairs"]["en-hi"]["memory_hits"] == 1
+    assert stats["pairs"]["en-ta"]["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_batch_sends_only_misses_and_skips_failures(tmp_path):
+    translator = FakeTranslator()
+    backend = GoogleTranslateBackend()
+    backend._translator = lambda src_code, tgt_code: translator
+    service = TranslationService(memory=_memory(tmp_path), backends={"google": backend})
+
+    assert service.batch_translate(["Classroom Challenge", "Ask questions"], "hindi") == [
+        "<Classroom Challenge>", "<Ask questions>"
+    ]
+    translator.requests.clear()
+    result = service.batch_translate(["Classroom Challenge", "Use local examples", "FAIL"], "hindi")
+    assert result == ["<Classroom Challenge>", "<Use local examples>", "FAIL"]
+    assert all("Classroom Challenge" not in request for request in translator.requests)
+
+    # The failed segment was not remembered, so it is retried
+    translator.requests.clear()
+    service.batch_translate(["Use local examples", "FAIL"], "hindi")
+    assert translator.requests == ["FAIL"]
+
+
+def test_lookups_do_not_write(tmp_path):
+    memory = _memory(tmp_path, lru_size=1)
+    memory.put_many("en", "hi", {"One": "एक", "Two": "दो"})
+    statements = []
+    memory._conn.set_trace_callback(statements.append)
+    for _ in range(3):
+        memory.get_many("en", "hi", ["One", "Two", "Three"])
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+    memory._conn.set_trace_callback(None)
+
+    # Buffered counters reach the shared file with the next write
+    memory.put_many("en", "hi", {"Four": "चार"})
+    reopened = _memory(tmp_path)
+    (hits,) = reopened._conn.execute(
+        "SELECT value FROM translation_memory_counters WHERE pair = 'en-hi' AND name = 'hits'"
+    ).fetchone()
+    assert hits == 6
@@ -0,0 +1,73 @@
+"""
+Test packed batch translation without calling Google Translate
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.translation_backends import MAX_REQUEST_CHARS, GoogleTranslateBackend
+from services.translation_service import TranslationService
+
+DEVANAGARI_DIGITS = str.maketrans("0123456789", "०१२३४५६७८९")
+
+
+class FakeTranslator:
+    """Marks each segment as translated; optionally mangles sentinels like a real provider can"""
+
+    def __init__(self, drop_sentinels=False):
+        self.requests = []
+        self.drop_sentinels = drop_sentinels
+
+    def translate(self, text):
+        self.requests.append(text)
+        if self.drop_sentinels:
+            text = text.replace("§§", "")
+        lines = []
+        for line in text.split("\n"):
+            if line.startswith("§§"):
+                # Providers add spaces around markers and may localize digits
+                lines.append(line.translate(DEVANAGARI_DIGITS).replace("§§", " §§ "))
+            elif line.strip():
+                lines.append(f"<{line.strip()}>")
+            else:
+                lines.append(line)
+        return "\n".join(lines)
+
+
+def _service(translator):
+    backend = GoogleTranslateBackend()
+    backend._translator = lambda src_code, tgt_code: translator
+    return TranslationService(backends={"google": backend})
+
+
+def test_segments_share_requests_and_come_back_in_order():
+    translator = FakeTranslator()
+    service = _service(translator)
+    texts = ["Classroom Challenge", "", "Ask questions", "Classroom Challenge", "Use local examples"]
+    result = service.batch_translate(texts, "hindi")
+    assert result == ["<Classroom Challenge>", "", "<Ask questions>", "<Classroom Challenge>", "<Use local examples>"]
+    assert len(translator.requests) == 1
+
+
+def test_requests_stay_under_the_provider_limit():
+    translator = FakeTranslator()
+    service = _service(translator)
+    texts = [f"Sentence number {i} about group reading. " * 10 for i in range(60)]
+    result = service.batch_translate(texts, "hindi")
+    assert result == [f"<{text.strip()}>" for text in texts]
+    assert len(translator.requests) > 1
+    assert all(len(request) <= MAX_REQUEST_CHARS for request in translator.requests)
+
+
+def test_misaligned_response_falls_back_to_single_calls():
+    translator = FakeTranslator(drop_sentinels=True)
+    service = _service(translator)
+    result = service.batch_translate(["One", "Two", "Three"], "hindi")
+    assert len(result) == 3
+    assert len(translator.requests) == 4  # one packed attempt, then one per segment
+    assert service.backends["google"].stats["packed_fallbacks"] == 1
+
+
+def test_english_target_is_returned_unchanged():
+    service = _service(FakeTranslator())
+    assert service.batch_translate(["Hello"], "english") == ["Hello"]
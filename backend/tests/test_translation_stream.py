@@ -0,0 +1,86 @@
+"""
+Test streamed batch translation: deduplication, input order and per-item status
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.translation_backends import DictionaryBackend, TranslationBackend
+from services.translation_memory import TranslationMemory
+from services.translation_service import TranslationService
+
+
+class GatedBackend(TranslationBackend):
+    """Tags segments as translated; segments containing "SLOW" wait for the gate, "FAIL" fail"""
+
+    name = "gated"
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.segments = []
+        self.lock = threading.Lock()
+
+    def translate_batch(self, segments, src_code, tgt_code):
+        with self.lock:
+            self.segments.extend(segments)
+        if any("SLOW" in segment for segment in segments):
+            assert self.gate.wait(5)
+        return [None if "FAIL" in segment else f"<{segment}>" for segment in segments]
+
+
+def test_duplicates_are_translated_once_and_results_keep_input_order():
+    backend = GatedBackend()
+    backend.gate.set()
+    service = TranslationService(backends={"gated": backend}, stream_chunk_chars=10)
+    texts = ["Greet", "Count stones", "Greet", "", "Sing", "Greet"]
+    items = list(service.iter_batch_translate(texts, "hindi"))
+    assert [item["index"] for item in items] == list(range(len(texts)))
+    assert [item["text"] for item in items] == ["<Greet>", "<Count stones>", "<Greet>", "", "<Sing>", "<Greet>"]
+    assert items[3]["status"] == "unchanged"
+    assert sorted(backend.segments) == ["Count stones", "Greet", "Sing"]
+
+
+def test_memory_hits_are_yielded_before_misses_finish(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"), lru_size=10)
+    memory.put_many("en", "hi", {"Greet": "नमस्ते"})
+    backend = GatedBackend()
+    service = TranslationService(memory=memory, backends={"gated": backend}, stream_chunk_chars=1)
+    stream = service.iter_batch_translate(["Greet", "Read SLOW"], "hindi")
+    assert next(stream) == {"index": 0, "text": "नमस्ते", "status": "cached"}
+    backend.gate.set()
+    assert next(stream) == {"index": 1, "text": "<Read SLOW>", "status": "translated"}
+    assert memory.get_many("en", "hi", ["Read SLOW"]) == {"Read SLOW": "<Read SLOW>"}
+
+
+def test_chunks_run_concurrently():
+    backend = GatedBackend()
+    service = TranslationService(backends={"gated": backend}, stream_concurrency=2, stream_chunk_chars=1)
+    results = []
+    consumer = threading.Thread(
+        target=lambda: results.extend(service.iter_batch_translate(["Draw SLOW", "Play"], "hindi"))
+    )
+    consumer.start()
+    # "Play" reaches the backend while the first chunk is still waiting
+    deadline = time.monotonic() + 5
+    while "Play" not in backend.segments and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "Play" in backend.segments and results == []
+    backend.gate.set()
+    consumer.join(5)
+    assert [item["text"] for item in results] == ["<Draw SLOW>", "<Play>"]
+
+
+def test_failed_items_keep_their_text_and_are_flagged():
+    service = TranslationService(backends={"gated": GatedBackend()})
+    items = list(service.iter_batch_translate(["Read", "FAIL here"], "hindi"))
+    assert items[1] == {"index": 1, "text": "FAIL here", "status": "failed"}
+    assert items[0]["status"] == "translated"
+
+
+def test_nothing_to_translate_is_unchanged():
+    service = TranslationService(backends={"dictionary": DictionaryBackend()})
+    items = list(service.iter_batch_translate(["Hello", "World"], "english"))
+    assert [item["status"] for item in items] == ["unchanged", "unchanged"]
+    assert [item["text"] for item in items] == ["Hello", "World"]
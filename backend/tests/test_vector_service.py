@@ -0,0 +1,115 @@
+"""
+Test the single-writer vector service over a real Unix socket
+Uses an in-memory store so no ChromaDB install is required
+"""
+import sys
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from core.vector_service import VectorServiceServer, RemoteVectorStore, VectorServiceError
+
+
+class RecordingStore:
+    """Records calls so the test can see how requests were batched"""
+
+    def __init__(self):
+        self.docs = {}
+        self.query_calls = []
+        self.add_calls = 0
+        self.threads = set()
+
+    def add_documents(self, texts, metadatas, ids):
+        self.threads.add(threading.get_ident())
+        self.add_calls += 1
+        for text, metadata, doc_id in zip(texts, metadatas, ids):
+            self.docs[doc_id] = (text, metadata)
+
+    def search_many(self, queries, n_results=5, filter_metadata=None):
+        self.threads.add(threading.get_ident())
+        self.query_calls.append(len(queries))
+        results = []
+        for query in queries:
+            hits = [(i, d) for i, d in sorted(self.docs.items()) if query in d[0]][:n_results]
+            results.append({
+                'documents': [[d[0] for _, d in hits]],
+                'metadatas': [[d[1] for _, d in hits]],
+                'distances': [[0.0 for _ in hits]],
+            })
+        return results
+
+    def search(self, query, n_results=5, filter_metadata=None):
+        return self.search_many([query], n_results, filter_metadata)[0]
+
+    def get_collection_size(self):
+        return len(self.docs)
+
+    def delete_collection(self, manual_id):
+        self.docs = {k: v for k, v in self.docs.items() if v[1]["manual_id"] != manual_id}
+
+
+@pytest.fixture
+def service():
+    store = RecordingStore()
+    socket_path = str(Path(tempfile.mkdtemp()) / "vectors.sock")
+    server = VectorServiceServer(store, socket_path, batch_window_ms=50)
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    serving = asyncio.run_coroutine_threadsafe(server.serve_forever(), loop)
+    for _ in range(100):
+        if Path(socket_path).exists():
+            break
+        time.sleep(0.01)
+
+    client = RemoteVectorStore(socket_path, timeout=5)
+    yield store, server, client
+
+    client.close()
+    time.sleep(0.1)
+    serving.cancel()
+    time.sleep(0.1)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+def test_round_trip(service):
+    store, _, client = service
+    client.add_documents(["chalk and talk", "group work"], [{"manual_id": "1"}, {"manual_id": "1"}], ["a", "b"])
+    assert client.get_collection_size() == 2
+
+    results = client.search("group", n_results=3)
+    assert results['documents'][0] == ["group work"]
+
+    client.delete_collection("1")
+    assert client.get_collection_size() == 0
+
+
+def test_concurrent_searches_are_merged_on_one_thread(service):
+    store, server, client = service
+    client.add_documents(["phonics drill"], [{"manual_id": "2"}], ["p"])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: client.search("phonics", n_results=1), range(8)))
+
+    assert all(r['documents'][0] == ["phonics drill"] for r in results)
+    assert sum(store.query_calls) == 8
+    assert len(store.query_calls) < 8
+    assert len(store.threads) == 1
+
+
+def test_errors_are_reported(service):
+    _, _, client = service
+    with pytest.raises(VectorServiceError):
+        client._call("drop_everything")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -11,11 +11,14 @@
  * - /api/manuals/{id}/index - POST
  * - /api/modules/           - GET (with query params: cluster_id, manual_id)
  * - /api/modules/generate   - POST
+ * - /api/modules/generate/stream - POST (text/event-stream)
  * - /api/modules/{id}       - GET, DELETE
  * - /api/modules/{id}/approve - PATCH
+ * - /api/modules/{id}/pdf   - GET (query param: language)
  * - /api/modules/{id}/feedback - POST
  * - /api/translation/translate - POST
  * - /api/translation/translate/batch - POST
+ * - /api/translation/translate/batch/stream - POST (application/x-ndjson)
  */
 
 import axios from 'axios';
@@ -53,7 +56,10 @@ apiClient.interceptors.response.use(
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
-    const message = error.response?.data?.detail || 
+    // 429s from module generation carry { message, queue_position, estimated_wait_seconds }
+    const detail = error.response?.data?.detail;
+    const message = detail?.message ||
+                    detail || 
                     error.message || 
                     'An unexpected error occurred';
     console.error(`API Error:`, message);
@@ -194,6 +200,54 @@ export const generateModule = (data) => {
   return apiClient.post('/api/modules/generate', payload);
 };
 
+/**
+ * Generate a module with streamed output (Server-Sent Events over POST).
+ * onDelta(text) is called with each new piece of module text as it arrives;
+ * resolves with the saved module.
+ */
+export const generateModuleStream = async (data, onDelta) => {
+  const token = localStorage.getItem('token');
+  const response = await fetch(`${API_BASE_URL}/api/modules/generate/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify({
+      manual_id: parseInt(data.manual_id),
+      cluster_id: parseInt(data.cluster_id),
+      topic: data.topic,
+      target_language: data.target_language || null,
+    }),
+  });
+
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.detail?.message || body.detail || `Request failed (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const payload = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+      if (event === 'delta') onDelta?.(payload.text);
+      else if (event === 'module') return payload;
+      else if (event === 'error') throw new Error(payload.detail);
+    }
+  }
+  throw new Error('Module stream ended unexpectedly');
+};
+
 export const approveModule = (id) => apiClient.patch(`/api/modules/${id}/approve`);
 
 export const deleteModule = (id) => apiClient.delete(`/api/modules/${id}`);
@@ -213,6 +267,14 @@ export const downloadPDF = (pdfId) => {
   });
 };
 
+// Approved modules are pre-rendered in the languages of similar clusters
+export const downloadModulePDF = (moduleId, language) => {
+  return apiClient.get(`/api/modules/${moduleId}/pdf`, {
+    params: language ? { language } : {},
+    responseType: 'blob'
+  });
+};
+
 // ================== TRANSLATION ==================
 export const translate = (text, targetLanguage, sourceLanguage = 'english') => {
   return apiClient.post('/api/translation/translate', {
@@ -230,6 +292,54 @@ export const batchTranslate = (texts, targetLanguage, sourceLanguage = 'english'
   });
 };
 
+/**
+ * Batch translate with results streamed as NDJSON, in input order.
+ * onItem({ index, translated_text, status }) is called for each text as it
+ * arrives (status: translated, cached, unchanged or failed); resolves with
+ * the per-status counts.
+ */
+export const batchTranslateStream = async (texts, targetLanguage, onItem, sourceLanguage = 'english') => {
+  const token = localStorage.getItem('token');
+  const response = await fetch(`${API_BASE_URL}/api/translation/translate/batch/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify({
+      texts,
+      target_language: targetLanguage,
+      source_language: sourceLanguage,
+    }),
+  });
+
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.detail || `Request failed (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n')) !== -1) {
+      const line = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 1);
+      if (!line.trim()) continue;
+      const item = JSON.parse(line);
+      if (item.done) return item.counts;
+      if (item.error) throw new Error(item.error);
+      onItem?.(item);
+    }
+  }
+  throw new Error('Translation stream ended unexpectedly');
+};
+
 // ================== DASHBOARD STATS ==================
 export const getDashboardStats = async () => {
   const [clusters, manuals, modules] = await Promise.all([
@@ -300,13 +410,16 @@ const api = {
   getModules,
   getModule,
   generateModule,
+  generateModuleStream,
   approveModule,
   deleteModule,
   submitFeedback,
   translate,
   batchTranslate,
+  batchTranslateStream,
   exportModulePDF,
   downloadPDF,
+  downloadModulePDF,
   getDashboardStats,
   // Decision Intelligence
   analyzeCluster,